@@ -0,0 +1,241 @@
+"""
+数据库在线热备份
+
+使用 sqlite3.Connection.backup 按页分步复制数据库，每复制一批页面暂停片刻让出数据库锁，
+备份期间其他会话仍可正常读写，也不会得到复制到一半被修改的损坏文件。
+备份先写入临时文件，通过 PRAGMA integrity_check 校验后才改名为正式备份并清理旧备份。
+"""
+
+import datetime
+import os
+import sqlite3
+import threading
+import time
+from db_connection import BASE_DIR, DB_PATH, engine
+
+BACKUP_DIR = os.path.join(BASE_DIR, 'backups')
+
+# 每步复制的页数（默认页大小 4KB，即每步约 1MB）和每步之间的暂停时间（秒）
+PAGES_PER_STEP = 256
+STEP_PAUSE = 0.005
+
+# 分步复制期间其他连接写入数据库会让备份从头开始；重新开始超过这个次数后改为一步复制完
+MAX_RESTARTS = 3
+
+
+class _BackupRestarted(Exception):
+    pass
+
+
+class BackupJob:
+    """一次备份任务的进度和结果，供页面轮询显示"""
+
+    def __init__(self, backup_path):
+        self.backup_path = backup_path
+        self.status = "等待中"  # 等待中 / 备份中 / 校验中 / 完成 / 失败
+        self.total_pages = 0
+        self.remaining_pages = 0
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self._finished = threading.Event()
+
+    @property
+    def progress(self):
+        """备份进度，0 到 1 之间"""
+        if self.status == "完成":
+            return 1.0
+        if not self.total_pages:
+            return 0.0
+        return (self.total_pages - self.remaining_pages) / self.total_pages
+
+    @property
+    def done(self):
+        return self._finished.is_set()
+
+    @property
+    def succeeded(self):
+        return self.status == "完成"
+
+    def wait(self, timeout=None):
+        """等待备份结束，返回是否已结束"""
+        return self._finished.wait(timeout)
+
+    def run(self, max_backups=None):
+        """执行备份（在调用线程中），成功后按 max_backups 清理旧备份"""
+        self.started_at = datetime.datetime.now()
+        try:
+            self.status = "备份中"
+            run_backup(self.backup_path, progress=self._on_progress)
+            self.status = "完成"
+            print(f"数据库备份成功: {self.backup_path}")
+            if max_backups:
+                cleanup_old_backups(max_backups)
+        except Exception as e:
+            self.status = "失败"
+            self.error = str(e)
+            print(f"数据库备份失败: {e}")
+        finally:
+            self.finished_at = datetime.datetime.now()
+            self._finished.set()
+
+    def _on_progress(self, status, remaining, total):
+        self.remaining_pages = remaining
+        self.total_pages = total
+        if remaining == 0:
+            self.status = "校验中"
+
+
+_current_job = None
+_job_lock = threading.Lock()
+
+
+def new_backup_path():
+    """按当前时间生成备份文件路径"""
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(BACKUP_DIR, f"backup_{timestamp}.db")
+
+
+def verify_backup(path):
+    """对备份文件执行 PRAGMA integrity_check，返回 (是否通过, 检查结果)"""
+    conn = sqlite3.connect(path)
+    try:
+        rows = [row[0] for row in conn.execute("PRAGMA integrity_check")]
+    finally:
+        conn.close()
+    return rows == ["ok"], "; ".join(rows)
+
+
+def run_backup(backup_path=None, progress=None, pages=PAGES_PER_STEP, pause=STEP_PAUSE):
+    """
+    在线备份数据库并校验，返回备份文件路径；校验不通过时抛出异常
+
+    progress(status, remaining, total) 在每复制一批页面后调用
+    """
+    if not os.path.exists(DB_PATH):
+        raise FileNotFoundError(f"数据库文件不存在: {DB_PATH}")
+
+    backup_path = backup_path or new_backup_path()
+    os.makedirs(os.path.dirname(backup_path), exist_ok=True)
+    partial_path = backup_path + ".partial"
+
+    restarts = 0
+    last_remaining = None
+
+    def on_step(status, remaining, total):
+        nonlocal restarts, last_remaining
+        if last_remaining is not None and remaining > last_remaining:
+            restarts += 1
+            if restarts > MAX_RESTARTS:
+                raise _BackupRestarted()
+        last_remaining = remaining
+
+        if progress:
+            progress(status, remaining, total)
+        # 让出数据库锁，避免长时间阻塞写入
+        if remaining:
+            time.sleep(pause)
+
+    source = sqlite3.connect(DB_PATH)
+    target = sqlite3.connect(partial_path)
+    try:
+        try:
+            source.backup(target, pages=pages, progress=on_step)
+        except _BackupRestarted:
+            # 写入频繁时分步复制无法完成，改为一步复制，只在复制期间持有读锁
+            source.backup(target, pages=-1)
+            if progress:
+                progress(sqlite3.SQLITE_OK, 0, last_remaining or 0)
+    finally:
+        target.close()
+        source.close()
+
+    ok, result = verify_backup(partial_path)
+    if not ok:
+        os.remove(partial_path)
+        raise RuntimeError(f"备份文件完整性检查未通过: {result}")
+
+    os.replace(partial_path, backup_path)
+    return backup_path
+
+
+def restore_backup_file(backup_file):
+    """
+    用备份文件恢复数据库
+
+    通过 sqlite3.Connection.backup 把备份逐页写入当前数据库，由 SQLite 负责 WAL 日志和锁，
+    不直接覆盖正在使用的数据库文件；恢复前先校验备份文件并为当前数据库做一次备份。返回安全备份的路径
+    """
+    ok, result = verify_backup(backup_file)
+    if not ok:
+        raise RuntimeError(f"备份文件完整性检查未通过: {result}")
+
+    safety_path = None
+    if os.path.exists(DB_PATH):
+        timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+        safety_path = run_backup(f"{DB_PATH}.bak_{timestamp}")
+
+    source = sqlite3.connect(backup_file)
+    target = sqlite3.connect(DB_PATH)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+    # 连接池中的连接可能缓存了旧的数据库结构，全部关闭，之后按需重新建立
+    engine.dispose()
+    return safety_path
+
+
+def start_backup(max_backups=None):
+    """在后台线程中开始备份并返回 BackupJob；已有备份在进行时直接返回该任务"""
+    global _current_job
+    with _job_lock:
+        if _current_job is not None and not _current_job.done:
+            return _current_job
+        job = BackupJob(new_backup_path())
+        threading.Thread(target=job.run, args=(max_backups,), name="database-backup", daemon=True).start()
+        _current_job = job
+        return job
+
+
+def current_backup():
+    """最近一次后台备份任务，没有时返回 None"""
+    return _current_job
+
+
+def cleanup_old_backups(max_backups=10):
+    """
+    清理旧的备份文件，只保留最近的几个备份
+
+    参数:
+        max_backups: 要保留的最大备份数量
+    """
+    try:
+        if not os.path.exists(BACKUP_DIR):
+            return
+
+        # 获取备份目录中的所有备份文件
+        backup_files = []
+        for file in os.listdir(BACKUP_DIR):
+            if file.startswith("backup_") and file.endswith(".db"):
+                file_path = os.path.join(BACKUP_DIR, file)
+                backup_files.append((file_path, os.path.getmtime(file_path)))
+
+        # 按修改时间排序
+        backup_files.sort(key=lambda x: x[1], reverse=True)
+
+        # 删除多余的旧备份
+        if len(backup_files) > max_backups:
+            for file_path, _ in backup_files[max_backups:]:
+                try:
+                    os.remove(file_path)
+                    print(f"已删除旧备份: {file_path}")
+                except Exception as e:
+                    print(f"删除旧备份失败: {file_path}, 错误: {str(e)}")
+
+        return True
+    except Exception as e:
+        print(f"清理旧备份失败: {str(e)}")
+        return False
@@ -0,0 +1,66 @@
+"""
+按内容寻址的图片文件存储
+
+上传的图片按 SHA-256 哈希命名，存放在 static/images/blobs/<前2位>/<3-4位>/<哈希>.<扩展名>，
+同一张照片无论关联到多少条记录都只存一份。哈希在分块写入临时文件的同时计算，不必把整个文件读入内存。
+引用计数保存在数据库的 image_blobs 表中，由 database.py 维护。
+"""
+
+import hashlib
+import os
+import uuid
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BLOB_DIR = os.path.join(BASE_DIR, 'static/images/blobs')
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def blob_path(blob_hash, extension):
+    """内容哈希对应的文件路径"""
+    return os.path.join(BLOB_DIR, blob_hash[:2], blob_hash[2:4], f"{blob_hash}.{extension.lower()}")
+
+
+def write_temp(file):
+    """把文件分块写入临时文件并同时计算 SHA-256，返回 (哈希, 字节数, 临时文件路径)"""
+    os.makedirs(BLOB_DIR, exist_ok=True)
+    tmp_path = os.path.join(BLOB_DIR, f".upload-{uuid.uuid4().hex}.tmp")
+
+    if hasattr(file, 'seek'):
+        file.seek(0)
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(tmp_path, 'wb') as out:
+            while True:
+                chunk = file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+    except Exception:
+        discard_temp(tmp_path)
+        raise
+    return digest.hexdigest(), size, tmp_path
+
+
+def commit_temp(tmp_path, path):
+    """把临时文件放到内容地址上；相同内容的文件已存在时丢弃临时文件。返回是否新写入了文件"""
+    if os.path.exists(path):
+        discard_temp(tmp_path)
+        return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(tmp_path, path)
+    return True
+
+
+def discard_temp(tmp_path):
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+
+def is_blob(path):
+    """路径是否位于内容寻址存储中"""
+    return bool(path) and os.path.abspath(path).startswith(BLOB_DIR + os.sep)
@@ -0,0 +1,113 @@
+"""
+进程启动初始化
+
+Streamlit 每次交互都会重新运行整个脚本，数据库结构检查、存储目录创建、中文字体配置和
+系统设置读取却只需要做一次。bootstrap() 用 st.cache_resource 缓存，每个进程只执行一次，
+并记下每一步的耗时；系统设置在进程内缓存，保存设置时重新读取。
+"""
+
+import json
+import os
+import threading
+import time
+import streamlit as st
+from database import init_db
+
+SETTINGS_FILE = "settings.json"
+
+DEFAULT_SETTINGS = {
+    "database_path": "plant_database.db",
+    "backup_folder": "backups",
+    "theme": "light",
+    "language": "zh_CN",
+    "auto_backup": True,
+    "backup_interval_days": 7,
+    "last_backup_date": None,
+    "default_view": "card",
+    "items_per_page": 10,
+    "export_format": "xlsx"
+}
+
+# 已读取的系统设置；为 None 时下次 get_settings 重新读取设置文件
+_settings = None
+_settings_lock = threading.RLock()
+
+
+def setup_matplotlib_chinese():
+    """使用 matplotlib 内置的简体中文支持"""
+    import matplotlib
+    matplotlib.rcParams['font.sans-serif'] = ['SimHei', 'DejaVu Sans', 'Arial Unicode MS', 'sans-serif']
+    matplotlib.rcParams['axes.unicode_minus'] = False
+    matplotlib.rcParams['font.family'] = 'sans-serif'
+
+
+def _load_settings():
+    try:
+        if os.path.exists(SETTINGS_FILE):
+            with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
+                settings = json.load(f)
+            # 确保所有默认设置字段都存在
+            for key, value in DEFAULT_SETTINGS.items():
+                if key not in settings:
+                    settings[key] = value
+        else:
+            settings = dict(DEFAULT_SETTINGS)
+            save_settings(settings)
+        return settings
+    except Exception as e:
+        print(f"Error loading settings: {e}")
+        return dict(DEFAULT_SETTINGS)
+
+
+def get_settings():
+    """
+    获取应用程序设置（进程内缓存，返回副本）
+    如果设置文件不存在，则创建默认设置
+    """
+    global _settings
+    with _settings_lock:
+        if _settings is None:
+            _settings = _load_settings()
+        return dict(_settings)
+
+
+def save_settings(settings):
+    """
+    保存应用程序设置到文件
+    """
+    global _settings
+    try:
+        with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
+            json.dump(settings, f, indent=4, ensure_ascii=False)
+        with _settings_lock:
+            _settings = None
+        return True
+    except Exception as e:
+        print(f"Error saving settings: {e}")
+        return False
+
+
+def _create_directories():
+    image_path = get_settings().get("image_storage_path", "./images")
+    os.makedirs(image_path, exist_ok=True)
+
+
+# 启动步骤: (名称, 函数)，按顺序执行
+STEPS = [
+    ("中文字体", setup_matplotlib_chinese),
+    ("数据库结构", init_db),
+    ("系统设置", get_settings),
+    ("存储目录", _create_directories),
+]
+
+
+@st.cache_resource(show_spinner=False)
+def bootstrap():
+    """执行全部启动步骤（每个进程一次），返回各步骤耗时 [(步骤, 秒)]"""
+    timings = []
+    for name, step in STEPS:
+        start = time.perf_counter()
+        step()
+        timings.append((name, time.perf_counter() - start))
+    print("启动完成: " + ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in timings))
+    return timings
@@ -0,0 +1,99 @@
+"""
+数据变化检测
+
+table_versions 表记录每张表最近一次被修改时的版本号，由各表的 AFTER INSERT/UPDATE/DELETE
+触发器维护。版本号在全库范围内递增，所以“某个版本之后哪些表变了”只需一次很小的查询，
+其他进程的写入同样可见。
+
+poll_changes() 先用 PRAGMA data_version 判断数据库是否被其他连接修改过，
+只有变化时才读取 table_versions，平时每次检查只是一个 PRAGMA。
+"""
+
+import sqlite3
+import threading
+from db_connection import DB_PATH, engine
+
+TABLE = 'table_versions'
+
+_poll_lock = threading.Lock()
+_poll_conn = None
+_last_data_version = None
+_last_versions = None
+
+
+def _bump_statement(table):
+    return (f"UPDATE {TABLE} SET version = (SELECT MAX(version) FROM {TABLE}) + 1 "
+            f"WHERE table_name = '{table}';")
+
+
+def _trigger_statements(table):
+    bump = _bump_statement(table)
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {TABLE}_{table}_{suffix} AFTER {action} ON {table} BEGIN {bump} END"
+        for suffix, action in (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE"))
+    ]
+
+
+def install(conn, tables):
+    """为各表登记版本号并创建递增版本号的触发器（已存在的跳过）"""
+    for table in tables:
+        if table == TABLE:
+            continue
+        conn.exec_driver_sql(f"INSERT OR IGNORE INTO {TABLE}(table_name, version) VALUES (?, 0)", (table,))
+        for statement in _trigger_statements(table):
+            conn.exec_driver_sql(statement)
+
+
+def bump(conn, table):
+    """在 conn 的事务中递增一张表的版本号（绕过触发器批量写入后调用，效果与触发器相同）"""
+    conn.exec_driver_sql(_bump_statement(table))
+
+
+def current_version():
+    """全库当前的版本号"""
+    with engine.connect() as conn:
+        return conn.exec_driver_sql(f"SELECT COALESCE(MAX(version), 0) FROM {TABLE}").scalar()
+
+
+def changed_since(version, tables=None):
+    """返回 version 之后被修改过的表 {表名: 版本号}，可用 tables 限定只检查哪些表"""
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(
+            f"SELECT table_name, version FROM {TABLE} WHERE version > ?", (version,)
+        ).all()
+    return {name: v for name, v in rows if tables is None or name in tables}
+
+
+def _poll_connection():
+    # PRAGMA data_version 只反映其他连接的提交，必须始终用同一个连接查询
+    global _poll_conn
+    if _poll_conn is None:
+        _poll_conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+    return _poll_conn
+
+
+def poll_changes():
+    """
+    返回自上次调用以来版本号有变化的表名列表
+
+    第一次调用只记录当前状态，返回空列表；table_versions 尚未建立时也返回空列表
+    """
+    global _last_data_version, _last_versions
+    with _poll_lock:
+        try:
+            conn = _poll_connection()
+            data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == _last_data_version:
+                return []
+            _last_data_version = data_version
+
+            versions = dict(conn.execute(f"SELECT table_name, version FROM {TABLE}").fetchall())
+        except sqlite3.Error:
+            return []
+
+        if _last_versions is None:
+            changed = []
+        else:
+            changed = [name for name, v in versions.items() if _last_versions.get(name) != v]
+        _last_versions = versions
+        return changed
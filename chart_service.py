@@ -0,0 +1,87 @@
+"""
+图表渲染
+
+图表用 matplotlib 的面向对象接口（Figure）绘制，不经过 pyplot 的全局图形管理器：
+渲染为 PNG 后图形即被释放，长时间运行的服务不会积累图形，多个会话同时绘图也互不干扰。
+PNG 按 (绘图函数, 图形尺寸, 数据) 的哈希缓存在进程内，数据不变时重新运行只需一次字典查找。
+"""
+
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+# 最多缓存的图表数
+MAX_CHARTS = 64
+
+# 与 st.pyplot 相同的输出分辨率
+DPI = 200
+
+_charts = OrderedDict()
+_lock = threading.Lock()
+
+
+def _update_hash(digest, value):
+    """把数据逐项写入哈希：DataFrame / Series 按内容哈希，容器逐个元素，其余按 repr"""
+    if type(value).__module__.startswith("pandas") and type(value).__name__ in ("DataFrame", "Series"):
+        import pandas as pd
+        digest.update(repr(getattr(value, "columns", None)).encode())
+        digest.update(repr(getattr(value, "name", None)).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}[{len(value)}]".encode())
+        for item in value:
+            _update_hash(digest, item)
+    elif isinstance(value, dict):
+        digest.update(f"dict[{len(value)}]".encode())
+        for key, item in sorted(value.items(), key=lambda entry: repr(entry[0])):
+            _update_hash(digest, key)
+            _update_hash(digest, item)
+    else:
+        digest.update(repr(value).encode())
+    digest.update(b"\0")
+
+
+def chart_key(draw, data, figsize=None):
+    """图表的缓存键：绘图函数的完整名称、图形尺寸和数据内容的哈希"""
+    digest = hashlib.sha1(f"{draw.__module__}.{draw.__qualname__}|{figsize}".encode())
+    _update_hash(digest, data)
+    return digest.hexdigest()
+
+
+def render_png(draw, data, figsize=None):
+    """
+    调用 draw(ax, data) 绘制图表，返回 PNG 字节
+
+    同一绘图函数、尺寸和数据的图表直接返回缓存的 PNG，不再绘制
+    """
+    key = chart_key(draw, data, figsize)
+    with _lock:
+        if key in _charts:
+            _charts.move_to_end(key)
+            return _charts[key]
+
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    try:
+        ax = fig.subplots()
+        draw(ax, data)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=DPI, bbox_inches="tight")
+    finally:
+        # 图形没有注册到 pyplot，清空后随引用一起释放
+        fig.clear()
+    png = buffer.getvalue()
+
+    with _lock:
+        _charts[key] = png
+        if len(_charts) > MAX_CHARTS:
+            _charts.popitem(last=False)
+    return png
+
+
+def clear():
+    """清空图表缓存"""
+    with _lock:
+        _charts.clear()
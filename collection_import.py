@@ -0,0 +1,240 @@
+"""
+采集记录批量导入
+
+野外调查带回的 CSV / Excel 表格按列对应到采集记录字段后整表导入：日期、数值、是否已鉴定等列
+在 pandas 中按列统一转换和校验（不逐行调用 add_collection），每行出错的列和原因汇总成错误报告；
+通过校验的行一次性分配采集编号，由 database.bulk_insert 在同一个事务中用一条批量 INSERT（executemany）写入。
+"""
+
+import uuid
+from collections import namedtuple
+from sqlalchemy import select
+from database import bulk_insert
+from models import Collection
+from query_cache import invalidates
+
+# 可导入的字段: (中文列名, 类型)，中文列名与添加采集记录表单一致
+IMPORT_FIELDS = {
+    "collection_date": ("采集日期", "date"),
+    "location": ("采集地点", "text"),
+    "latitude": ("纬度", "float"),
+    "longitude": ("经度", "float"),
+    "altitude": ("海拔(米)", "float"),
+    "collector": ("采集人", "text"),
+    "country": ("国家", "text"),
+    "terrain": ("地形", "text"),
+    "land_use": ("土地利用", "text"),
+    "original_id": ("原始编号", "text"),
+    "specimen_number": ("标本号", "text"),
+    "habitat": ("生境描述", "text"),
+    "soil_parent_material": ("土壤母质", "text"),
+    "soil_texture": ("土壤质地", "text"),
+    "seed_harvest_period": ("收获种子时期", "text"),
+    "seed_quantity": ("种子数量", "int"),
+    "collection_part": ("采集部位", "text"),
+    "seed_condition": ("种子状况", "text"),
+    "fruit_size": ("果实大小", "text"),
+    "fruit_color": ("果实颜色", "text"),
+    "notes": ("备注", "text"),
+    "species_chinese": ("中文种名", "text"),
+    "species_latin": ("拉丁学名", "text"),
+    "common_name": ("俗名", "text"),
+    "family_chinese": ("科中文名", "text"),
+    "family": ("科", "text"),
+    "genus_chinese": ("属中文名", "text"),
+    "genus": ("属", "text"),
+    "identified": ("已鉴定", "bool"),
+    "identified_by": ("鉴定人", "text"),
+}
+
+# 必须填写的字段（与添加表单的要求一致）
+REQUIRED_FIELDS = ("collection_date", "location", "collector")
+
+# 数值字段的取值范围: (最小值, 最大值)
+VALUE_RANGES = {
+    "latitude": (-90, 90),
+    "longitude": (-180, 180),
+}
+
+TRUE_VALUES = {"是", "已鉴定", "true", "yes", "y", "1", "t"}
+FALSE_VALUES = {"否", "未鉴定", "false", "no", "n", "0", "f"}
+
+# 查询已有编号时每条 IN 语句的参数个数（低于 SQLite 的参数上限）
+ID_CHECK_CHUNK = 500
+
+# 校验错误：表格行号（含表头，与 Excel 中看到的行号一致）、列名、原值、原因
+RowError = namedtuple('RowError', ['row', 'column', 'value', 'message'])
+
+# 导入结果：新建的采集编号列表、错误列表
+ImportResult = namedtuple('ImportResult', ['imported', 'errors'])
+
+
+def read_table(file, filename):
+    """读取上传的 CSV / Excel 文件，所有列按文本读入，类型在 prepare_rows 中统一转换"""
+    import pandas as pd
+    if filename.lower().endswith((".xlsx", ".xls")):
+        frame = pd.read_excel(file, dtype=str)
+    else:
+        frame = pd.read_csv(file, dtype=str, encoding="utf-8-sig")
+    frame.columns = [str(column).strip() for column in frame.columns]
+    return frame
+
+
+def _normalize(name):
+    return name.strip().lower().replace(" ", "").replace("（可选）", "").replace("(可选)", "")
+
+
+def suggest_mapping(columns):
+    """
+    按列名猜测对应关系 {字段: 表格列}
+
+    表格列名可以是字段名（如导出文件中的 collection_date）或中文列名（如 采集日期）
+    """
+    lookup = {}
+    for field, (label, _) in IMPORT_FIELDS.items():
+        lookup[_normalize(field)] = field
+        lookup[_normalize(label)] = field
+    mapping = {}
+    for column in columns:
+        field = lookup.get(_normalize(str(column)))
+        if field and field not in mapping:
+            mapping[field] = column
+    return mapping
+
+
+def _coerce(values, kind):
+    """按类型转换一列文本，返回 (转换后的列, 无法转换的行的掩码)"""
+    import pandas as pd
+    present = values.notna()
+    if kind == "date":
+        converted = pd.to_datetime(values, errors="coerce", format="mixed").dt.date
+        converted = converted.where(converted.notna(), None)
+    elif kind in ("float", "int"):
+        # 含逗号的数值（小数逗号 1,5 或千分位 1,200）无法可靠区分，作为无法识别的值报告，不猜测
+        converted = pd.to_numeric(values.mask(values.str.contains(",", regex=False).fillna(False).astype(bool)), errors="coerce")
+        if kind == "int":
+            invalid = present & (converted.isna() | (converted % 1 != 0))
+            converted = converted.where(~invalid)
+            return converted.astype("Int64"), invalid
+    elif kind == "bool":
+        lowered = values.str.lower()
+        converted = pd.Series(pd.NA, index=values.index, dtype="boolean")
+        converted[lowered.isin(TRUE_VALUES)] = True
+        converted[lowered.isin(FALSE_VALUES)] = False
+    else:
+        return values, present & False
+    return converted, present & converted.isna()
+
+
+def prepare_rows(frame, mapping):
+    """
+    按对应关系转换和校验整张表
+
+    返回 (通过校验的记录列表, 错误列表)。每条记录是包含全部导入字段的字典，
+    有错误的行不会出现在记录列表中
+    """
+    import pandas as pd
+    columns = {}
+    bad_rows = pd.Series(False, index=frame.index)
+    errors = []
+
+    def add_errors(mask, field, raw, message):
+        nonlocal bad_rows
+        if not mask.any():
+            return
+        bad_rows = bad_rows | mask
+        column = mapping.get(field, IMPORT_FIELDS[field][0])
+        for index in mask[mask].index:
+            value = raw[index] if raw is not None else None
+            errors.append(RowError(int(index) + 2, column, None if pd.isna(value) else value, message))
+
+    for field, (label, kind) in IMPORT_FIELDS.items():
+        column = mapping.get(field)
+        if column is None or column not in frame.columns:
+            raw = pd.Series(None, index=frame.index, dtype=object)
+        else:
+            raw = frame[column].astype("string").str.strip()
+            raw = raw.mask(raw == "")
+        converted, invalid = _coerce(raw, kind)
+        add_errors(invalid, field, raw, f"无法识别的{label}")
+        if field in REQUIRED_FIELDS:
+            add_errors(raw.isna(), field, None, f"缺少{label}")
+        if field in VALUE_RANGES:
+            low, high = VALUE_RANGES[field]
+            add_errors(converted.notna() & ((converted < low) | (converted > high)), field, raw,
+                       f"{label}超出范围 {low} ~ {high}")
+        columns[field] = converted
+
+    errors.sort(key=lambda error: error.row)
+    valid = ~bad_rows
+    columns["identified"] = columns["identified"].fillna(False)
+    fields = list(columns)
+    # 逐列转换为 Python 原生类型（缺失值为 None）再组合成记录，比 DataFrame.to_dict 快一个数量级
+    values = [
+        columns[field][valid].astype(object).where(columns[field][valid].notna(), None).tolist()
+        for field in fields
+    ]
+    return [dict(zip(fields, row)) for row in zip(*values)], errors
+
+
+def _existing_ids(conn, candidates):
+    """返回候选编号中数据库里已经存在的部分"""
+    candidates = list(candidates)
+    existing = set()
+    for start in range(0, len(candidates), ID_CHECK_CHUNK):
+        chunk = candidates[start:start + ID_CHECK_CHUNK]
+        existing.update(conn.execute(
+            select(Collection.collection_id).where(Collection.collection_id.in_(chunk))
+        ).scalars())
+    return existing
+
+
+def _allocate_ids(conn, records):
+    """
+    按采集日期为每条记录分配采集编号，格式与 generate_id 相同（COL-日期-6位随机码）
+
+    同一天的记录很多时随机码可能重复，与本批或数据库中已有编号重复的重新生成
+    """
+    pending = list(range(len(records)))
+    taken = set()
+    while pending:
+        candidates = {}
+        for index in pending:
+            date_str = records[index]["collection_date"].strftime('%Y%m%d')
+            candidate = f"COL-{date_str}-{uuid.uuid4().hex[:6].upper()}"
+            if candidate not in taken and candidate not in candidates:
+                candidates[candidate] = index
+        conflicts = _existing_ids(conn, candidates)
+        retry = set(pending)
+        for candidate, index in candidates.items():
+            if candidate not in conflicts:
+                records[index]["collection_id"] = candidate
+                taken.add(candidate)
+                retry.discard(index)
+        pending = sorted(retry)
+
+
+@invalidates('collections')
+def import_collections(frame, mapping, skip_invalid=True):
+    """
+    批量导入采集记录
+
+    frame 为 read_table 读入的表格，mapping 为 {字段: 表格列}。skip_invalid 为 True 时跳过有错误的行、
+    导入其余行；为 False 时只要有错误就不导入任何行。全部记录在一个事务中写入，失败时整体回滚
+    """
+    records, errors = prepare_rows(frame, mapping)
+    if not records or (errors and not skip_invalid):
+        return ImportResult([], errors)
+    try:
+        bulk_insert(Collection, records, before_insert=_allocate_ids)
+        return ImportResult([record["collection_id"] for record in records], errors)
+    except Exception as e:
+        print(f"批量导入采集记录失败: {e}")
+        return ImportResult([], errors + [RowError(None, None, None, f"写入数据库失败: {e}")])
+
+
+def error_report(errors):
+    """把错误列表整理成 DataFrame，供页面显示和下载"""
+    import pandas as pd
+    return pd.DataFrame(errors, columns=list(RowError._fields)).rename(columns={
+        "row": "行号", "column": "列", "value": "原值", "message": "错误"})
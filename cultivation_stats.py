@@ -0,0 +1,115 @@
+"""
+栽培统计
+
+所有统计都用少量 SQL 语句（GROUP BY / JOIN / COALESCE）计算，不逐条读取栽培记录，
+返回可直接用于绘图的 pandas 对象。结果按相关表的版本号缓存。
+"""
+
+import datetime
+import pandas as pd
+from db_connection import engine
+from query_cache import cached_read
+
+# 月度事件统计中单独列出的事件类型，其余归入“其他”
+EVENT_TYPES = ["浇水", "施肥", "修剪", "观察", "开花", "结果", "死亡", "其他"]
+
+
+def established_cutoff(established_days=90, today=None):
+    """种植超过 established_days 天的记录的开始日期上限（不含）"""
+    return (today or datetime.date.today()) - datetime.timedelta(days=established_days)
+
+
+# 截止日期由调用方计算后传入，成为缓存键的一部分：日期变化后不会继续使用前一天的结果
+@cached_read('cultivation_records')
+def status_summary(cutoff):
+    """
+    栽培记录概况，返回 Series：total 总数、alive 存活、flowering 开花、fruiting 结果、dead 死亡、
+    established 开始日期早于 cutoff 的记录数（见 established_cutoff）
+    """
+    with engine.connect() as conn:
+        frame = pd.read_sql_query("""
+            SELECT
+                COUNT(*) AS total,
+                COALESCE(SUM(status = '活'), 0) AS alive,
+                COALESCE(SUM(flowering = 1), 0) AS flowering,
+                COALESCE(SUM(fruiting = 1), 0) AS fruiting,
+                COALESCE(SUM(status = '死亡'), 0) AS dead,
+                COALESCE(SUM(start_date < ?), 0) AS established
+            FROM cultivation_records
+        """, conn.connection, params=(cutoff.isoformat(),))
+    return frame.iloc[0].astype(int)
+
+
+@cached_read('cultivation_records', 'seed_batches', 'collections')
+def taxon_counts(rank, limit=10):
+    """
+    按科（rank='family'）或属（rank='genus'）统计栽培记录数，返回前 limit 名的 DataFrame [名称, 数量]
+
+    栽培记录本身没有填写科属时，取其种子批次所属采集记录的科属
+    """
+    if rank not in ('family', 'genus'):
+        raise ValueError(f"不支持的分类等级: {rank}")
+
+    with engine.connect() as conn:
+        return pd.read_sql_query(f"""
+            SELECT name AS 名称, COUNT(*) AS 数量
+            FROM (
+                SELECT COALESCE(NULLIF(cr.{rank}, ''), NULLIF(c.{rank}, '')) AS name
+                FROM cultivation_records cr
+                LEFT JOIN seed_batches sb ON sb.id = cr.seed_batch_id
+                LEFT JOIN collections c ON c.id = sb.collection_id
+            )
+            WHERE name IS NOT NULL
+            GROUP BY name
+            ORDER BY 数量 DESC, name
+            LIMIT ?
+        """, conn.connection, params=(limit,))
+
+
+@cached_read('cultivation_event_rollup')
+def monthly_event_matrix(location=None):
+    """
+    按月份和事件类型统计栽培事件数，返回 DataFrame：月份列加 EVENT_TYPES 各列
+
+    读取写入事件时维护的月度汇总表 cultivation_event_rollup，不扫描事件表；location 不为空时只统计该位置
+    """
+    known = ", ".join(f"'{event_type}'" for event_type in EVENT_TYPES)
+    where, params = "", ()
+    if location is not None:
+        where, params = "WHERE location = ?", (location,)
+
+    with engine.connect() as conn:
+        counts = pd.read_sql_query(f"""
+            SELECT month,
+                   CASE WHEN event_type IN ({known}) THEN event_type ELSE '其他' END AS event_type,
+                   SUM(count) AS n
+            FROM cultivation_event_rollup
+            {where}
+            GROUP BY month, 2
+        """, conn.connection, params=params)
+
+    matrix = (counts.pivot_table(index="month", columns="event_type", values="n", aggfunc="sum", fill_value=0)
+              .reindex(columns=EVENT_TYPES, fill_value=0)
+              .sort_index())
+    matrix = matrix.rename_axis(index="月份", columns=None).reset_index()
+    return matrix
+
+
+@cached_read('cultivation_records')
+def survival_by_location(cutoff, min_records=5):
+    """
+    开始日期早于 cutoff 的栽培记录按地点统计存活率，只包括记录数不少于 min_records 的地点，
+    返回 DataFrame [栽培位置, 总数, 存活数, 存活率]（存活率为百分比）
+    """
+    with engine.connect() as conn:
+        frame = pd.read_sql_query("""
+            SELECT location AS 栽培位置,
+                   COUNT(*) AS 总数,
+                   SUM(CASE WHEN status = '活' THEN 1 ELSE 0 END) AS 存活数
+            FROM cultivation_records
+            WHERE start_date < ?
+            GROUP BY location
+            HAVING COUNT(*) >= ?
+        """, conn.connection, params=(cutoff.isoformat(), min_records))
+    frame["存活率"] = frame["存活数"] / frame["总数"] * 100
+    return frame
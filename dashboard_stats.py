@@ -0,0 +1,141 @@
+"""
+首页统计
+
+各表的记录数、待鉴定数、科分布和发芽率分组计数保存在 dashboard_counters 表中，由触发器在
+增删改时增减（与检索索引、表版本号一样在写入的同一事务中完成，其他进程的写入同样计入）。
+首页读取时只查这张小表，耗时与数据量无关，也不需要在读取时重新统计。
+
+批量写入绕过触发器时调用 count_rows 补计新记录；rebuild 按现有数据重新统计。
+"""
+
+from db_connection import engine
+
+TABLE = 'dashboard_counters'
+
+# 发芽率直方图的分组数（0~1 等分）
+RATE_BINS = 10
+
+# 科分布显示的科数
+TOP_FAMILIES = 10
+
+# 统计规则: 表 -> [(统计项, 键表达式, 计入条件, 影响该项的列)]，{row} 为 new / old 或表名；
+# 影响列为空的项只随增删变化
+COUNTERS = {
+    'collections': [
+        ('counts', "'collections'", "1", ()),
+        ('counts', "'unidentified'", "{row}.identified = 0", ('identified',)),
+        ('family', "TRIM({row}.family)", "TRIM({row}.family) != ''", ('family',)),
+    ],
+    'seed_batches': [
+        ('counts', "'seed_batches'", "1", ()),
+    ],
+    'germination_records': [
+        ('counts', "'germination_records'", "1", ()),
+        # 与 matplotlib 的 hist(range=(0, 1)) 一致：最后一组包含 1.0，范围以外的发芽率不计入
+        ('rate_bin', f"MIN(CAST({{row}}.germination_rate * {RATE_BINS} AS INTEGER), {RATE_BINS - 1})",
+         "{row}.germination_rate >= 0 AND {row}.germination_rate <= 1", ('germination_rate',)),
+    ],
+    'cultivation_records': [
+        ('counts', "'cultivation_records'", "1", ()),
+    ],
+}
+
+COUNT_KEYS = ("collections", "seed_batches", "germination_records", "cultivation_records", "unidentified")
+
+
+def _add_statement(section, key, condition, row, delta):
+    """把一行记录计入（delta=1）或移出（delta=-1）统计"""
+    return (f"INSERT INTO {TABLE}(section, key, n) "
+            f"SELECT '{section}', {key.format(row=row)}, {delta} WHERE {condition.format(row=row)} "
+            f"ON CONFLICT(section, key) DO UPDATE SET n = n + excluded.n;")
+
+
+def _trigger_statements(table):
+    counters = COUNTERS[table]
+    insert_new = " ".join(_add_statement(s, k, c, 'new', 1) for s, k, c, _ in counters)
+    delete_old = " ".join(_add_statement(s, k, c, 'old', -1) for s, k, c, _ in counters)
+    statements = [
+        f"CREATE TRIGGER IF NOT EXISTS {TABLE}_{table}_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {TABLE}_{table}_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+    ]
+    updated = [counter for counter in counters if counter[3]]
+    if updated:
+        columns = sorted({column for counter in updated for column in counter[3]})
+        move = " ".join(_add_statement(s, k, c, 'old', -1) + " " + _add_statement(s, k, c, 'new', 1)
+                        for s, k, c, _ in updated)
+        statements.append(f"CREATE TRIGGER IF NOT EXISTS {TABLE}_{table}_au AFTER UPDATE OF {', '.join(columns)} "
+                          f"ON {table} BEGIN {move} END")
+    return statements
+
+
+def count_rows(conn, table, after_id=None):
+    """把表中的记录（给出 after_id 时只取主键大于它的）计入统计，用于重建和绕过触发器的批量插入"""
+    where = f" AND id > {int(after_id)}" if after_id is not None else ""
+    for section, key, condition, _ in COUNTERS[table]:
+        conn.exec_driver_sql(
+            f"INSERT INTO {TABLE}(section, key, n) "
+            f"SELECT '{section}', {key.format(row=table)} AS k, COUNT(*) FROM {table} "
+            f"WHERE {condition.format(row=table)}{where} GROUP BY k "
+            f"ON CONFLICT(section, key) DO UPDATE SET n = n + excluded.n"
+        )
+
+
+def rebuild(conn):
+    """清空并按现有数据重新统计"""
+    conn.exec_driver_sql(f"DELETE FROM {TABLE}")
+    for table in COUNTERS:
+        count_rows(conn, table)
+
+
+def install(conn):
+    """创建维护统计的触发器；触发器是新建的则同时按现有数据统计。返回是否新建"""
+    exists = conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = ?", (f"{TABLE}_collections_ai",)
+    ).first()
+    for table in COUNTERS:
+        for statement in _trigger_statements(table):
+            conn.exec_driver_sql(statement)
+    # 旧版本读取时重新计算的统计快照表
+    conn.exec_driver_sql("DROP TABLE IF EXISTS dashboard_snapshot")
+    if not exists:
+        rebuild(conn)
+    return not exists
+
+
+def _read_counts(conn):
+    rows = dict(conn.exec_driver_sql(f"SELECT key, n FROM {TABLE} WHERE section = 'counts'").all())
+    return {key: rows.get(key, 0) for key in COUNT_KEYS}
+
+
+def _read_family_counts(conn):
+    rows = conn.exec_driver_sql(
+        f"SELECT key, n FROM {TABLE} WHERE section = 'family' AND n > 0 ORDER BY n DESC, key LIMIT ?",
+        (TOP_FAMILIES,)
+    ).all()
+    return [[name, n] for name, n in rows]
+
+
+def _read_rate_bins(conn):
+    bins = [0] * RATE_BINS
+    for key, n in conn.exec_driver_sql(f"SELECT key, n FROM {TABLE} WHERE section = 'rate_bin'"):
+        bins[int(key)] = n
+    return bins
+
+
+SECTIONS = {
+    "counts": _read_counts,
+    "family_counts": _read_family_counts,
+    "germination_rate_bins": _read_rate_bins,
+}
+
+
+def get_section(name):
+    """取一项统计"""
+    with engine.connect() as conn:
+        return SECTIONS[name](conn)
+
+
+def get_dashboard_stats():
+    """首页全部统计 {统计项: 结果}"""
+    with engine.connect() as conn:
+        return {name: read(conn) for name, read in SECTIONS.items()}
@@ -1,33 +1,71 @@
-from sqlalchemy import create_engine, or_, and_
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import or_, and_, update, delete, insert, select, text, true, literal, null, Integer, Float
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from models import (
     Base, Collection, GerminationRecord, GerminationEvent,
     CultivationRecord, CultivationEvent, BaseImage, PlantImage, CollectionImage,
-    SeedImage, GerminationImage, CultivationImage, SeedBatch, CultivationSubgroup
+    SeedImage, GerminationImage, CultivationImage, SeedBatch, CultivationSubgroup,
+    SeedStockLedger, IdentifierRegistry, ImageRecord, ImageBlob, CultivationEventRollup
 )
+import argparse
 import datetime
+from collections import namedtuple
+import blob_store
+from query_cache import cached_read, invalidates, invalidate_all, set_sync_hook
+import change_tracking
+import dashboard_stats
+from db_connection import BASE_DIR, DB_PATH, engine, Session, ScopedSession, connection_settings
+import search_index
+import thumbnails
 import uuid
 import os
-import qrcode
-import barcode
-from barcode.writer import ImageWriter
-from PIL import Image
 from sqlalchemy.sql import func
 
+# 种子批次库存（含发芽、栽培用量）查询涉及的表
+INVENTORY_TABLES = ('seed_batches', 'seed_stock_ledger', 'germination_records', 'cultivation_records')
 
-# 获取当前脚本所在目录的绝对路径
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_PATH = os.path.join(BASE_DIR, 'plant_conservation.db')
-
-# 创建数据库连接
-engine = create_engine(f'sqlite:///{DB_PATH}')
-Session = sessionmaker(bind=engine)
+# 读缓存前检查其他进程是否修改过数据
+set_sync_hook(change_tracking.poll_changes)
 
 
 def init_db():
     """初始化数据库"""
     Base.metadata.create_all(engine)
 
+    # create_all 不会修改已存在的表，新增的列和索引单独补上
+    added = migrate_columns()
+    if added:
+        print(f"已补建 {len(added)} 个字段: {', '.join(added)}")
+    migrate_indexes(report=True)
+
+    # 各表的修改版本号（触发器维护），用于判断缓存是否过期
+    with engine.begin() as conn:
+        change_tracking.install(conn, [table.name for table in Base.metadata.sorted_tables])
+
+    # 全文检索索引（FTS5 虚拟表不在 Base.metadata 中，单独创建）
+    install_search_index()
+
+    # 业务编号索引（扫码查询用）
+    install_identifier_registry()
+
+    # 首页统计计数（触发器维护）
+    with engine.begin() as conn:
+        if dashboard_stats.install(conn):
+            print("已建立首页统计")
+
+    # 旧数据库中各图片表的记录移入统一的图片表
+    migrated = migrate_legacy_images()
+    if migrated:
+        print(f"已将 {migrated} 张图片迁移到统一图片表")
+
+    # 为还没有库存台账的种子批次（如旧数据库中的批次）补建台账
+    rebuild_seed_stock_ledger(missing_only=True)
+
+    # 旧数据库中的栽培事件补建月度汇总
+    install_cultivation_event_rollup()
+    counted = rebuild_cultivation_event_rollup(missing_only=True)
+    if counted:
+        print(f"已补建栽培事件月度汇总，共 {counted} 行")
+
     # 创建图片存储目录
     os.makedirs('static/images/plants', exist_ok=True)
     os.makedirs('static/images/collections', exist_ok=True)
@@ -40,6 +78,319 @@ def init_db():
     os.makedirs('static/qrcodes', exist_ok=True)
 
 
+# 常用筛选条件对应的典型查询，用于对比建索引前后的查询计划
+HOT_QUERIES = {
+    "未鉴定采集记录": "SELECT * FROM collections WHERE identified = 0",
+    "按科查询采集记录": "SELECT * FROM collections WHERE family = 'Rosaceae'",
+    "按科属查询采集记录": "SELECT * FROM collections WHERE family = 'Rosaceae' AND genus = 'Rosa'",
+    "科列表": "SELECT DISTINCT family FROM collections WHERE family IS NOT NULL ORDER BY family",
+    "按日期查询采集记录": "SELECT * FROM collections WHERE collection_date >= '2024-01-01' AND collection_date <= '2024-12-31'",
+    "采集记录的种子批次": "SELECT * FROM seed_batches WHERE collection_id = 1",
+    "栽培收获的种子批次": "SELECT * FROM seed_batches WHERE parent_cultivation_id = 1",
+    "种子批次列表": "SELECT * FROM seed_batches ORDER BY storage_date DESC",
+    "批次的发芽记录": "SELECT * FROM germination_records WHERE seed_batch_id = 1",
+    "进行中的发芽实验": "SELECT * FROM germination_records WHERE status = '进行中' ORDER BY start_date DESC",
+    "发芽事件": "SELECT * FROM germination_events WHERE germination_record_id = 1 ORDER BY event_date",
+    "已结果的栽培记录": "SELECT * FROM cultivation_records WHERE fruiting = 1 AND status = '活'",
+    "批次的栽培记录": "SELECT * FROM cultivation_records WHERE seed_batch_id = 1",
+    "栽培事件": "SELECT * FROM cultivation_events WHERE cultivation_record_id = 1 ORDER BY event_date",
+    "栽培子分组": "SELECT * FROM cultivation_subgroups WHERE cultivation_id = 1 ORDER BY status_date",
+    "采集图片": "SELECT * FROM images WHERE entity_type = 'collection' AND entity_id = 1",
+    "种子图片": "SELECT * FROM images WHERE entity_type = 'seed' AND entity_id = 1",
+    "栽培图片": "SELECT * FROM images WHERE entity_type = 'cultivation' AND entity_id = 1",
+}
+
+
+def explain_query_plans(queries=None):
+    """返回典型查询的执行计划 {查询名称: [计划步骤]}"""
+    plans = {}
+    with engine.connect() as conn:
+        for name, sql in (queries or HOT_QUERIES).items():
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+            plans[name] = [row[-1] for row in rows]
+    return plans
+
+
+def print_query_plan_report(before, after):
+    """打印建索引前后的查询计划对比"""
+    for name, steps in after.items():
+        print(f"[{name}]")
+        if before is not None:
+            print(f"  之前: {'; '.join(before.get(name, []))}")
+        print(f"  现在: {'; '.join(steps)}")
+
+
+def migrate_columns():
+    """
+    为已有数据库补上 models.py 中新增的字段
+
+    只执行 ALTER TABLE ADD COLUMN，新字段均为可空字段，不设默认值和约束。返回补上的 表.字段 列表
+    """
+    added = []
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({table.name})")}
+            if not existing:
+                continue
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+                    added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def migrate_indexes(report=False):
+    """
+    为已有数据库补建 models.py 中声明的索引
+
+    只执行 CREATE INDEX IF NOT EXISTS，不重建表也不迁移数据。返回新建的索引名列表；
+    report=True 且确有新建索引时打印建索引前后的查询计划
+    """
+    with engine.connect() as conn:
+        existing = {
+            name for (name,) in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'")
+        }
+
+    missing = [
+        index
+        for table in Base.metadata.sorted_tables
+        for index in table.indexes
+        if index.name not in existing
+    ]
+    if not missing:
+        return []
+
+    before = explain_query_plans() if report else None
+
+    for index in missing:
+        index.create(bind=engine, checkfirst=True)
+
+    # 更新查询优化器的统计信息
+    with engine.begin() as conn:
+        conn.exec_driver_sql("PRAGMA optimize")
+
+    created = [index.name for index in missing]
+    if report:
+        print(f"已补建 {len(created)} 个索引: {', '.join(created)}")
+        print_query_plan_report(before, explain_query_plans())
+    return created
+
+
+# 可全文检索的模型及其在检索索引中的实体类型
+SEARCHABLE_MODELS = {
+    Collection: 'collection',
+    SeedBatch: 'seed_batch',
+    CultivationRecord: 'cultivation',
+}
+
+
+def install_search_index():
+    """创建全文检索索引和同步触发器，新建索引时导入现有数据"""
+    with engine.begin() as conn:
+        if search_index.install(conn):
+            print("已建立全文检索索引")
+
+
+def rebuild_search_index():
+    """清空并重建全文检索索引，返回索引中的记录数"""
+    with engine.begin() as conn:
+        search_index.install(conn)
+        search_index.populate(conn)
+        return conn.exec_driver_sql(f"SELECT count(*) FROM {search_index.FTS_TABLE}").scalar()
+
+
+def _search_hits(groups, entity_type=None):
+    """
+    全文检索命中结果子查询 (entity_type_no, entity_id, rank)，rank 越小越相关
+
+    groups 为 [(检索词, 限定列或 None), ...]，各组之间为“或”；没有有效检索词时返回 None
+    """
+    sql, params = search_index.build_search_sql(groups, entity_type)
+    if sql is None:
+        return None
+    return (text(sql).bindparams(**params)
+            .columns(entity_type_no=Integer, entity_id=Integer, rank=Float)
+            .subquery('search_hits'))
+
+
+def fulltext_filter(model, search_term, columns=None):
+    """把全文检索转成查询条件 model.id IN (命中记录)，可与其他筛选条件组合"""
+    hits = _search_hits([(search_term, columns)], SEARCHABLE_MODELS[model])
+    if hits is None:
+        return true()
+    return model.id.in_(select(hits.c.entity_id))
+
+
+def search_records(search_term, entity_types=None, limit=50):
+    """
+    统一的全文检索入口：在采集记录、种子批次和栽培记录中检索
+
+    entity_types 可限定为 'collection'、'seed_batch'、'cultivation' 中的若干个，
+    返回按相关度排序的 [(实体类型, 记录对象), ...]
+    """
+    hits = _search_hits([(search_term, None)])
+    if hits is None:
+        return []
+
+    session = Session()
+    try:
+        query = select(hits.c.entity_type_no, hits.c.entity_id)
+        if entity_types:
+            type_numbers = [search_index.ENTITY_SOURCES[t][0] for t in entity_types]
+            query = query.where(hits.c.entity_type_no.in_(type_numbers))
+        rows = session.execute(query.order_by(hits.c.rank).limit(limit)).all()
+
+        # 按实体类型批量取出记录，再按检索结果的顺序排列
+        ids_by_type = {}
+        for type_no, entity_id in rows:
+            ids_by_type.setdefault(search_index.entity_type_of(type_no), []).append(entity_id)
+
+        records = {}
+        for model, entity_type in SEARCHABLE_MODELS.items():
+            ids = ids_by_type.get(entity_type)
+            if ids:
+                for record in session.query(model).filter(model.id.in_(ids)).all():
+                    records[(entity_type, record.id)] = record
+
+        results = []
+        for type_no, entity_id in rows:
+            key = (search_index.entity_type_of(type_no), entity_id)
+            if key in records:
+                results.append((key[0], records[key]))
+        return results
+    except Exception as e:
+        print(f"全文检索失败: {e}")
+        return []
+    finally:
+        session.close()
+
+
+# 各实体的业务编号字段，标签上的二维码/条形码编码的就是这些编号
+IDENTIFIER_SOURCES = {
+    'collection': (Collection, 'collection_id'),
+    'seed_batch': (SeedBatch, 'batch_id'),
+    'germination': (GerminationRecord, 'germination_id'),
+    'cultivation': (CultivationRecord, 'cultivation_id'),
+}
+
+
+def _populate_identifier_registry(conn, entity_type, after_id=None):
+    """把表中的编号写入业务编号索引；给出 after_id 时只写入主键大于它的记录"""
+    model, column = IDENTIFIER_SOURCES[entity_type]
+    where = f" WHERE id > {int(after_id)}" if after_id is not None else ""
+    conn.exec_driver_sql(
+        f"INSERT OR REPLACE INTO identifier_registry(code, entity_type, entity_id) "
+        f"SELECT {column}, '{entity_type}', id FROM {model.__tablename__}{where}"
+    )
+
+
+def install_identifier_registry():
+    """创建维护业务编号索引的触发器，触发器是新建的则同时导入该表的现有记录"""
+    with engine.begin() as conn:
+        for entity_type, (model, column) in IDENTIFIER_SOURCES.items():
+            table = model.__tablename__
+            trigger = f"identifier_registry_{table}"
+            insert_new = (f"INSERT OR REPLACE INTO identifier_registry(code, entity_type, entity_id) "
+                          f"VALUES (new.{column}, '{entity_type}', new.id);")
+            delete_old = f"DELETE FROM identifier_registry WHERE code = old.{column} AND entity_type = '{entity_type}';"
+
+            exists = conn.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = ?", (f"{trigger}_ai",)
+            ).first()
+            conn.exec_driver_sql(f"CREATE TRIGGER IF NOT EXISTS {trigger}_ai AFTER INSERT ON {table} "
+                                 f"BEGIN {insert_new} END")
+            conn.exec_driver_sql(f"CREATE TRIGGER IF NOT EXISTS {trigger}_au AFTER UPDATE OF {column}, id ON {table} "
+                                 f"BEGIN {delete_old} {insert_new} END")
+            conn.exec_driver_sql(f"CREATE TRIGGER IF NOT EXISTS {trigger}_ad AFTER DELETE ON {table} "
+                                 f"BEGIN {delete_old} END")
+            if not exists:
+                _populate_identifier_registry(conn, entity_type)
+
+
+def rebuild_identifier_registry():
+    """清空并重建业务编号索引，返回索引中的编号数"""
+    install_identifier_registry()
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DELETE FROM identifier_registry")
+        for entity_type in IDENTIFIER_SOURCES:
+            _populate_identifier_registry(conn, entity_type)
+        return conn.exec_driver_sql("SELECT count(*) FROM identifier_registry").scalar()
+
+
+def rebuild_dashboard_stats():
+    """按现有数据重新统计首页计数，返回统计表的行数"""
+    with engine.begin() as conn:
+        dashboard_stats.install(conn)
+        dashboard_stats.rebuild(conn)
+        return conn.exec_driver_sql(f"SELECT count(*) FROM {dashboard_stats.TABLE}").scalar()
+
+
+def bulk_insert(model, records, before_insert=None):
+    """
+    在一个事务中批量插入记录（一条 executemany），返回插入的行数
+
+    检索索引、业务编号索引、首页统计和表版本号的 AFTER INSERT 触发器每插入一行执行一次，几万行时比插入本身还慢。
+    这里在写事务中暂时删除这些触发器，插入后用 INSERT ... SELECT 补写新记录的索引和统计、递增一次版本号，
+    再重建触发器；SQLite 的 DDL 也在事务中，出错时连同触发器一起回滚，其他连接始终看不到缺少触发器的状态。
+    before_insert(conn, records) 在同一事务中、插入前调用（例如分配编号）
+    """
+    table = model.__tablename__
+    triggers = [f"{search_index.FTS_TABLE}_{table}_ai", f"identifier_registry_{table}_ai",
+                f"{dashboard_stats.TABLE}_{table}_ai", f"{change_tracking.TABLE}_{table}_ai"]
+    with engine.begin() as conn:
+        # 立即取得写锁：pysqlite 只在 DML 前自动开始事务，DDL 需要显式的事务
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        if before_insert:
+            before_insert(conn, records)
+        after_id = conn.exec_driver_sql(f"SELECT COALESCE(MAX(id), 0) FROM {table}").scalar()
+        saved = conn.exec_driver_sql(
+            f"SELECT name, sql FROM sqlite_master WHERE type = 'trigger' "
+            f"AND name IN ({', '.join('?' * len(triggers))})", tuple(triggers)
+        ).all()
+        for name, _ in saved:
+            conn.exec_driver_sql(f"DROP TRIGGER {name}")
+
+        conn.execute(insert(model.__table__), records)
+
+        for entity_type, (_, source_table, _) in search_index.ENTITY_SOURCES.items():
+            if source_table == table:
+                search_index.index_rows(conn, entity_type, after_id)
+        for entity_type, (source_model, _) in IDENTIFIER_SOURCES.items():
+            if source_model is model:
+                _populate_identifier_registry(conn, entity_type, after_id)
+        if table in dashboard_stats.COUNTERS:
+            dashboard_stats.count_rows(conn, table, after_id)
+        change_tracking.bump(conn, table)
+        for _, sql in saved:
+            conn.exec_driver_sql(sql)
+    return len(records)
+
+
+def resolve_identifier(code):
+    """
+    根据扫描到的标签内容查找记录，返回 (实体类型, 记录对象)，找不到时返回 None
+
+    标签内容可能带有附加信息（“编号 - 附加信息”），只取编号部分
+    """
+    if not code:
+        return None
+    code = code.split(' - ')[0].strip()
+
+    session = Session()
+    try:
+        entry = session.get(IdentifierRegistry, code)
+        if entry is None:
+            return None
+        record = session.get(IDENTIFIER_SOURCES[entry.entity_type][0], entry.entity_id)
+        return (entry.entity_type, record) if record else None
+    except Exception as e:
+        print(f"查找编号失败: {e}")
+        return None
+    finally:
+        session.close()
+
+
 def generate_id(prefix, date=None):
     """生成唯一ID：前缀+日期+随机码"""
     if date is None:
@@ -51,6 +402,7 @@ def generate_id(prefix, date=None):
 
 # 原有的添加植物、添加采集和添加种子批次函数保持不变，以下是新增函数
 
+@invalidates('germination_records', 'seed_stock_ledger')
 def add_germination_record(seed_batch_id, start_date, treatment, quantity_used, notes=None):
     """添加发芽记录"""
     session = Session()
@@ -70,12 +422,21 @@ def add_germination_record(seed_batch_id, start_date, treatment, quantity_used,
     )
 
     session.add(germination_record)
+
+    # 在同一事务中扣减库存，可用数量不足时整个记录不写入
+    if not _draw_seed_stock(session, seed_batch_id, quantity_used):
+        session.rollback()
+        session.close()
+        print(f"种子批次 {seed_batch_id} 可用数量不足 {quantity_used}，未创建发芽记录")
+        return None
+
     session.commit()
     record_id = germination_record.id
     session.close()
     return record_id
 
 
+@invalidates('germination_events', 'germination_records')
 def add_germination_event(germination_record_id, event_date, count, notes=None):
     """添加发芽事件"""
     session = Session()
@@ -117,6 +478,7 @@ def add_germination_event(germination_record_id, event_date, count, notes=None):
     return event_id
 
 
+@invalidates('germination_records')
 def complete_germination_record(germination_record_id):
     """
     完成发芽记录
@@ -148,6 +510,7 @@ def complete_germination_record(germination_record_id):
 
 # Add to database.py
 
+@invalidates('cultivation_records', 'seed_stock_ledger')
 def add_cultivation_record(seed_batch_id=None, start_date=None, location=None, quantity=None,
                            notes=None, origin=None, origin_details=None, collection_id=None,
                            parent_cultivation_id=None, family=None, family_chinese=None,
@@ -181,12 +544,21 @@ def add_cultivation_record(seed_batch_id=None, start_date=None, location=None, q
     )
 
     session.add(cultivation_record)
+
+    # 从种子批次栽培时，在同一事务中扣减库存
+    if seed_batch_id and not _draw_seed_stock(session, seed_batch_id, quantity):
+        session.rollback()
+        session.close()
+        print(f"种子批次 {seed_batch_id} 可用数量不足 {quantity}，未创建栽培记录")
+        return None
+
     session.commit()
     record_id = cultivation_record.id
     session.close()
     return record_id
 
 
+@invalidates('cultivation_subgroups', 'cultivation_events', 'cultivation_records', 'cultivation_event_rollup')
 def add_cultivation_subgroup(cultivation_record_id, status, quantity, status_date=None, notes=None):
     """添加栽培子分组记录"""
     session = Session()
@@ -216,6 +588,7 @@ def add_cultivation_subgroup(cultivation_record_id, status, quantity, status_dat
     )
 
     session.add(event)
+    _count_cultivation_event(session, event)
 
     # Update the main record if needed
     record = session.query(CultivationRecord).filter(CultivationRecord.id == cultivation_record_id).first()
@@ -234,6 +607,7 @@ def add_cultivation_subgroup(cultivation_record_id, status, quantity, status_dat
     return subgroup_id
 
 
+@cached_read('cultivation_subgroups')
 def get_cultivation_subgroups(cultivation_id):
     """获取栽培记录的子分组"""
     session = Session()
@@ -244,6 +618,7 @@ def get_cultivation_subgroups(cultivation_id):
     return subgroups
 
 
+@cached_read('cultivation_records')
 def get_fruiting_cultivations():
     """获取已结果的栽培记录"""
     session = Session()
@@ -255,6 +630,7 @@ def get_fruiting_cultivations():
     return records
 
 
+@invalidates('seed_batches', 'seed_stock_ledger', 'cultivation_records')
 def add_seed_batch_from_cultivation(cultivation_id, quantity, storage_location,
                                    storage_date=None, viability=None, notes=None):
     """从栽培记录添加种子批次"""
@@ -291,6 +667,7 @@ def add_seed_batch_from_cultivation(cultivation_id, quantity, storage_location,
     )
 
     session.add(seed_batch)
+    _open_seed_stock_ledger(session, seed_batch)
     session.commit()
     batch_id = seed_batch.id
     session.close()
@@ -298,6 +675,90 @@ def add_seed_batch_from_cultivation(cultivation_id, quantity, storage_location,
 
 
 
+def _count_cultivation_event(session, event):
+    """
+    把新增的栽培事件累加到月度汇总表，与事件在同一事务中提交；没有日期的事件不计入
+
+    与 rebuild_cultivation_event_rollup 一样按栽培记录当前的位置计数，位置改变后由触发器移动计数
+    """
+    session.flush()
+    if event.event_date is None:
+        return
+    location = session.execute(
+        select(CultivationRecord.location).where(CultivationRecord.id == event.cultivation_record_id)
+    ).scalar()
+    session.execute(
+        sqlite_insert(CultivationEventRollup)
+        .values(month=event.event_date.strftime('%Y-%m'), event_type=event.event_type or '',
+                location=location or '', count=1)
+        .on_conflict_do_update(index_elements=['month', 'event_type', 'location'],
+                               set_={'count': CultivationEventRollup.count + 1})
+    )
+
+
+# 栽培记录的位置改变时（任何写入，包括其他进程），把该记录已计入汇总的事件从原位置移到新位置，
+# 汇总表始终与按当前位置重建的结果一致
+_ROLLUP_RELOCATE_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS cultivation_event_rollup_location_au
+AFTER UPDATE OF location ON cultivation_records
+WHEN COALESCE(old.location, '') != COALESCE(new.location, '')
+BEGIN
+    INSERT INTO cultivation_event_rollup (month, event_type, location, count)
+    SELECT strftime('%Y-%m', event_date), COALESCE(event_type, ''), COALESCE(old.location, ''), -COUNT(*)
+    FROM cultivation_events
+    WHERE cultivation_record_id = new.id AND event_date IS NOT NULL
+    GROUP BY 1, 2
+    ON CONFLICT (month, event_type, location) DO UPDATE SET count = count + excluded.count;
+    INSERT INTO cultivation_event_rollup (month, event_type, location, count)
+    SELECT strftime('%Y-%m', event_date), COALESCE(event_type, ''), COALESCE(new.location, ''), COUNT(*)
+    FROM cultivation_events
+    WHERE cultivation_record_id = new.id AND event_date IS NOT NULL
+    GROUP BY 1, 2
+    ON CONFLICT (month, event_type, location) DO UPDATE SET count = count + excluded.count;
+    DELETE FROM cultivation_event_rollup WHERE location = COALESCE(old.location, '') AND count <= 0;
+END
+"""
+
+
+def install_cultivation_event_rollup():
+    """创建栽培记录位置改变时调整月度汇总的触发器"""
+    with engine.begin() as conn:
+        conn.exec_driver_sql(_ROLLUP_RELOCATE_TRIGGER)
+
+
+@invalidates('cultivation_event_rollup')
+def rebuild_cultivation_event_rollup(missing_only=False):
+    """
+    根据全部栽培事件重建月度汇总表，位置取栽培记录当前的位置
+
+    missing_only=True 时只在汇总表为空而已有事件时重建（如旧数据库第一次启动）。返回写入的汇总行数
+    """
+    session = Session()
+    try:
+        if missing_only and (session.query(CultivationEventRollup.month).first()
+                             or not session.query(CultivationEvent.id).first()):
+            return 0
+
+        session.execute(delete(CultivationEventRollup))
+        result = session.execute(text("""
+            INSERT INTO cultivation_event_rollup (month, event_type, location, count)
+            SELECT strftime('%Y-%m', e.event_date), COALESCE(e.event_type, ''), COALESCE(r.location, ''), COUNT(*)
+            FROM cultivation_events e
+            JOIN cultivation_records r ON r.id = e.cultivation_record_id
+            WHERE e.event_date IS NOT NULL
+            GROUP BY 1, 2, 3
+        """))
+        session.commit()
+        return result.rowcount
+    except Exception as e:
+        session.rollback()
+        print(f"重建栽培事件月度汇总失败: {e}")
+        return 0
+    finally:
+        session.close()
+
+
+@invalidates('cultivation_events', 'cultivation_records', 'cultivation_event_rollup')
 def add_cultivation_event(cultivation_record_id, event_date, event_type, description=None):
     """添加栽培事件"""
     session = Session()
@@ -313,12 +774,14 @@ def add_cultivation_event(cultivation_record_id, event_date, event_type, descrip
     )
 
     session.add(cultivation_event)
+    _count_cultivation_event(session, cultivation_event)
     session.commit()
     event_id = cultivation_event.id
     session.close()
     return event_id
 
 
+@invalidates('cultivation_records', 'cultivation_events', 'cultivation_subgroups', 'cultivation_event_rollup')
 def update_cultivation_status(cultivation_record_id, status, date, reason=None):
     """
     更新栽培记录状态
@@ -370,6 +833,9 @@ def update_cultivation_status(cultivation_record_id, status, date, reason=None):
                 )
                 session.add(event)
 
+            if status in ("开花", "结果", "死亡"):
+                _count_cultivation_event(session, event)
+
             # 提交更改
             session.commit()
             return record_id
@@ -390,6 +856,7 @@ def batch_update_cultivation_status(cultivation_ids, status, date=None, reason=N
     return True
 
 
+@invalidates('collections')
 def update_plant_identification(collection_id, species_latin, family=None, genus=None, identified_by=None,
                                 identified_date=None):
     """更新植物鉴定信息"""
@@ -433,71 +900,167 @@ def save_image(file, table_type, record_id, description=""):
         return save_single_image(file, table_type, record_id, description)
 
 
+# 图片所属记录的类型，与 static/images 下的子目录对应
+IMAGE_ENTITY_TYPES = ("plant", "collection", "seed", "germination", "cultivation")
+
+# 旧图片表: (模型, 所属记录类型, 关联字段, 日期字段)
+LEGACY_IMAGE_TABLES = [
+    (CollectionImage, "collection", "collection_id", "upload_date"),
+    (SeedImage, "seed", "seed_batch_id", "upload_date"),
+    (GerminationImage, "germination", "germination_id", None),
+    (CultivationImage, "cultivation", "cultivation_id", "upload_date"),
+    (PlantImage, "plant", "plant_id", "image_date"),
+    (BaseImage, "base", "seed_batch_id", "image_date"),
+]
+
+
+@invalidates('images')
+def migrate_legacy_images():
+    """把旧的六张图片表中的记录移入统一图片表（移入后从旧表删除），返回迁移的图片数"""
+    migrated = 0
+    try:
+        with engine.begin() as conn:
+            for model, entity_type, owner_column, date_column in LEGACY_IMAGE_TABLES:
+                rows = select(
+                    literal(entity_type),
+                    getattr(model, owner_column),
+                    model.file_path,
+                    model.description,
+                    getattr(model, date_column) if date_column else null()
+                ).order_by(model.id)
+                result = conn.execute(insert(ImageRecord).from_select(
+                    ["entity_type", "entity_id", "file_path", "description", "upload_date"], rows))
+                if result.rowcount:
+                    conn.execute(delete(model))
+                    migrated += result.rowcount
+    except Exception as e:
+        print(f"迁移图片记录失败: {e}")
+        return 0
+    return migrated
+
+
+def _acquire_blob(session, blob_hash, extension, size, tmp_path):
+    """
+    登记一次对内容文件的引用并把临时文件放到内容地址上，返回 (文件路径, 是否新写入了文件)
+
+    文件在写事务内放置，与 _release_blob 中删除文件互斥
+    """
+    session.execute(
+        sqlite_insert(ImageBlob)
+        .values(hash=blob_hash, file_path=blob_store.blob_path(blob_hash, extension), size=size,
+                ref_count=1, created_at=datetime.datetime.now())
+        .on_conflict_do_update(index_elements=['hash'], set_={'ref_count': ImageBlob.ref_count + 1})
+    )
+    path = session.execute(select(ImageBlob.file_path).where(ImageBlob.hash == blob_hash)).scalar()
+    return path, blob_store.commit_temp(tmp_path, path)
+
+
+def _release_blob(session, blob_hash):
+    """
+    释放一次对内容文件的引用，最后一个引用释放时删除 image_blobs 行并返回文件路径，否则返回 None
+
+    文件由调用方在事务提交成功后删除：提交失败时引用行会回滚，文件必须仍然存在
+    """
+    released = session.execute(
+        update(ImageBlob)
+        .where(ImageBlob.hash == blob_hash)
+        .values(ref_count=ImageBlob.ref_count - 1)
+        .returning(ImageBlob.ref_count, ImageBlob.file_path)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if released is not None and released.ref_count <= 0:
+        session.execute(delete(ImageBlob).where(ImageBlob.hash == blob_hash))
+        return released.file_path
+    return None
+
+
+def _remove_image_file(file_path):
+    """删除图片文件及其缩略图"""
+    if file_path:
+        thumbnails.remove_derivatives(file_path)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+
+@invalidates('images', 'image_blobs')
 def save_single_image(file, table_type, record_id, description=""):
     """处理单个图片文件并返回图片ID"""
-    file_extension = file.name.split(".")[-1]
-
-    # 生成唯一文件名，确保不会覆盖
-    timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
-    random_str = uuid.uuid4().hex[:8]
-    filename = f"{timestamp}_{random_str}.{file_extension}"
+    if table_type not in IMAGE_ENTITY_TYPES:
+        return None
 
-    # 确保图片目录存在
-    BASE_DIR= os.path.dirname(os.path.abspath(__file__))
-    image_dir = os.path.join(BASE_DIR, f"static/images/{table_type}s")
-    os.makedirs(image_dir, exist_ok=True)
+    file_extension = file.name.split(".")[-1]
 
-    # 保存图片文件
-    filepath = os.path.join(image_dir, filename)
-    with open(filepath, "wb") as f:
-        f.write(file.getbuffer())
+    # 分块写入临时文件，同时计算内容哈希
+    blob_hash, size, tmp_path = blob_store.write_temp(file)
 
-    # 创建图片对象
+    # 登记图片，相同内容的文件只保存一份
     session = Session()
     try:
-        if table_type == "plant":
-            image = PlantImage(file_path=filepath, description=description, plant_id=record_id)
-        elif table_type == "collection":
-            image = CollectionImage(file_path=filepath, description=description, collection_id=record_id)
-        elif table_type == "seed":
-            image = SeedImage(file_path=filepath, description=description, seed_batch_id=record_id)
-        elif table_type == "germination":
-            image = GerminationImage(file_path=filepath, description=description, germination_id=record_id)
-        elif table_type == "cultivation":
-            image = CultivationImage(file_path=filepath, description=description, cultivation_id=record_id)
-        else:
-            session.close()
-            return None
-
+        filepath, created = _acquire_blob(session, blob_hash, file_extension, size, tmp_path)
+        image = ImageRecord(entity_type=table_type, entity_id=record_id,
+                            file_path=filepath, blob_hash=blob_hash, description=description)
         session.add(image)
         session.commit()
-        image_id = image.id
-        session.close()
-        return image_id
+
+        # 后台生成缩略图，不阻塞上传
+        if created:
+            thumbnails.submit(filepath)
+        return image.id
     except Exception as e:
         session.rollback()
+        blob_store.discard_temp(tmp_path)
         print(f"保存图片失败: {e}")
         return None
     finally:
         session.close()
 
-def get_images(image_type, record_id):
-    """获取图片列表"""
+
+@invalidates('images', 'image_blobs')
+def migrate_images_to_blob_store():
+    """把尚未进入内容寻址存储的图片文件移入存储（相同内容只保留一份），返回迁移的图片数"""
     session = Session()
+    migrated = 0
+    try:
+        images = (session.query(ImageRecord.id, ImageRecord.file_path)
+                  .filter(ImageRecord.blob_hash.is_(None))
+                  .all())
+        for image_id, file_path in images:
+            if not file_path or not os.path.exists(file_path):
+                continue
+
+            with open(file_path, 'rb') as f:
+                blob_hash, size, tmp_path = blob_store.write_temp(f)
+            extension = os.path.splitext(file_path)[1].lstrip('.') or 'jpg'
+            path, created = _acquire_blob(session, blob_hash, extension, size, tmp_path)
+            session.execute(
+                update(ImageRecord)
+                .where(ImageRecord.id == image_id)
+                .values(file_path=path, blob_hash=blob_hash)
+            )
+            session.commit()
+
+            # 原文件不再被任何图片记录引用时删除
+            if session.query(ImageRecord.id).filter(ImageRecord.file_path == file_path).first() is None:
+                _remove_image_file(file_path)
+            if created:
+                thumbnails.submit(path)
+            migrated += 1
+    except Exception as e:
+        session.rollback()
+        print(f"迁移图片文件失败: {e}")
+    finally:
+        session.close()
+    return migrated
 
-    if image_type == "plant":
-        images = session.query(PlantImage).filter(PlantImage.plant_id == record_id).all()
-    elif image_type == "collection":
-        images = session.query(CollectionImage).filter(CollectionImage.collection_id == record_id).all()
-    elif image_type == "seed":
-        images = session.query(SeedImage).filter(SeedImage.seed_batch_id == record_id).all()
-    elif image_type == "germination":
-        images = session.query(GerminationImage).filter(GerminationImage.germination_id == record_id).all()
-    elif image_type == "cultivation":
-        images = session.query(CultivationImage).filter(CultivationImage.cultivation_id == record_id).all()
-    else:
-        images = []
 
+@cached_read('images')
+def get_images(image_type, record_id):
+    """获取图片列表"""
+    session = Session()
+    images = (session.query(ImageRecord)
+              .filter(ImageRecord.entity_type == image_type, ImageRecord.entity_id == record_id)
+              .order_by(ImageRecord.id)
+              .all())
     session.close()
     return images
 
@@ -505,6 +1068,9 @@ def get_images(image_type, record_id):
 # 二维码和条形码生成
 def generate_qrcode(data, record_id, record_type):
     """生成二维码"""
+    # 只在生成标签时才需要二维码库
+    import qrcode
+
     qr = qrcode.QRCode(
         version=1,
         error_correction=qrcode.ERROR_CORRECT_L,
@@ -523,6 +1089,9 @@ def generate_qrcode(data, record_id, record_type):
 
 def generate_barcode(data, record_id, record_type):
     """生成条形码"""
+    import barcode
+    from barcode.writer import ImageWriter
+
     EAN = barcode.get_barcode_class('code128')
     ean = EAN(data, writer=ImageWriter())
     img_path = f"static/barcodes/{record_type}_{record_id}"
@@ -534,6 +1103,7 @@ def generate_barcode(data, record_id, record_type):
 
 
 
+@cached_read('germination_records')
 def get_germination_record_by_id(record_id):
     """通过ID获取发芽记录"""
     session = Session()
@@ -542,6 +1112,7 @@ def get_germination_record_by_id(record_id):
     return record
 
 # 获取各类记录的函数
+@cached_read('germination_records', 'seed_batches')
 def get_germination_records(filter_species=None):
     """获取发芽记录，可选择按种子名称筛选"""
     session = Session()
@@ -565,6 +1136,7 @@ def get_germination_records(filter_species=None):
     session.close()
     return records
 
+@cached_read('germination_events')
 def get_germination_events(record_id):
     """获取特定发芽记录的所有事件"""
     session = Session()
@@ -575,6 +1147,7 @@ def get_germination_events(record_id):
     return events
 
 
+@cached_read('cultivation_records')
 def get_cultivation_records():
     """获取所有栽培记录"""
     session = Session()
@@ -583,6 +1156,7 @@ def get_cultivation_records():
     return records
 
 
+@cached_read('cultivation_records')
 def get_cultivation_record_by_id(record_id):
     """通过ID获取栽培记录"""
     session = Session()
@@ -591,6 +1165,7 @@ def get_cultivation_record_by_id(record_id):
     return record
 
 
+@cached_read('cultivation_events')
 def get_cultivation_events(record_id):
     """获取特定栽培记录的所有事件"""
     session = Session()
@@ -601,6 +1176,7 @@ def get_cultivation_events(record_id):
     return events
 
 
+@cached_read('collections')
 def search_unidentified_plants():
     """搜索未鉴定的植物"""
     session = Session()
@@ -609,65 +1185,281 @@ def search_unidentified_plants():
     return collections
 
 
-def get_seed_batches_for_germination():
-    """获取可用于发芽实验的种子批次"""
+# 种子库存计算：一次分组查询得到任意一组批次的已用数量和可用数量
+def _seed_usage_subqueries(session):
+    """按种子批次分组汇总发芽和栽培用量的子查询"""
+    germination_usage = session.query(
+        GerminationRecord.seed_batch_id.label('seed_batch_id'),
+        func.sum(GerminationRecord.quantity_used).label('used')
+    ).filter(
+        GerminationRecord.seed_batch_id != None
+    ).group_by(GerminationRecord.seed_batch_id).subquery()
+
+    cultivation_usage = session.query(
+        CultivationRecord.seed_batch_id.label('seed_batch_id'),
+        func.sum(CultivationRecord.quantity).label('used')
+    ).filter(
+        CultivationRecord.seed_batch_id != None
+    ).group_by(CultivationRecord.seed_batch_id).subquery()
+
+    return germination_usage, cultivation_usage
+
+
+def query_seed_batch_inventory(session, *criteria, available_only=False, order_by=None, with_usage=False,
+                               limit=None):
+    """
+    在给定会话中查询种子批次及其库存信息
+
+    可用数量直接读取种子库存台账（按批次索引的一行），返回的每个批次带有
+    available_quantity、reserved_quantity 和 consumed_quantity 属性；
+    with_usage=True 时再通过一次分组汇总附带 used_for_germination 和 used_for_cultivation
+    """
+    columns = [SeedBatch, SeedStockLedger]
+    query_joins = []
+    if with_usage:
+        germination_usage, cultivation_usage = _seed_usage_subqueries(session)
+        columns += [func.coalesce(germination_usage.c.used, 0), func.coalesce(cultivation_usage.c.used, 0)]
+        query_joins = [
+            (germination_usage, germination_usage.c.seed_batch_id == SeedBatch.id),
+            (cultivation_usage, cultivation_usage.c.seed_batch_id == SeedBatch.id),
+        ]
+
+    query = session.query(*columns).outerjoin(
+        SeedStockLedger, SeedStockLedger.seed_batch_id == SeedBatch.id
+    )
+    for subquery, condition in query_joins:
+        query = query.outerjoin(subquery, condition)
+
+    if criteria:
+        query = query.filter(*criteria)
+
+    # 只保留还有剩余种子的批次
+    if available_only:
+        query = query.filter(SeedStockLedger.on_hand - SeedStockLedger.reserved > 0)
+
+    if order_by is not None:
+        query = query.order_by(*(order_by if isinstance(order_by, (list, tuple)) else [order_by]))
+
+    if limit is not None:
+        query = query.limit(limit)
+
+    batches = []
+    for row in query.all():
+        batch, ledger = row[0], row[1]
+        if ledger:
+            batch.reserved_quantity = ledger.reserved or 0
+            batch.consumed_quantity = ledger.consumed or 0
+            batch.available_quantity = (ledger.on_hand or 0) - batch.reserved_quantity
+        else:
+            batch.reserved_quantity = 0
+            batch.consumed_quantity = 0
+            batch.available_quantity = batch.quantity or 0
+        if with_usage:
+            batch.used_for_germination, batch.used_for_cultivation = row[2], row[3]
+        batches.append(batch)
+    return batches
+
+
+def get_seed_batches_with_inventory(*criteria, available_only=False, order_by=None, with_usage=False):
+    """获取种子批次并附带库存信息"""
     session = Session()
+    try:
+        return query_seed_batch_inventory(session, *criteria, available_only=available_only,
+                                          order_by=order_by, with_usage=with_usage)
+    finally:
+        session.close()
 
-    # 找出所有种子批次及其已用于发芽的数量
-    seed_batches = session.query(SeedBatch).all()
-
-    result = []
-    for batch in seed_batches:
-        # 计算已用于发芽的种子数量
-        used_seeds = session.query(GerminationRecord).filter(
-            GerminationRecord.seed_batch_id == batch.id
-        ).with_entities(
-            func.sum(GerminationRecord.quantity_used)
-        ).scalar() or 0
-
-        # 计算已用于栽培的种子数量
-        used_for_cultivation = session.query(CultivationRecord).filter(
-            CultivationRecord.seed_batch_id == batch.id
-        ).with_entities(
-            func.sum(CultivationRecord.quantity)
-        ).scalar() or 0
-
-        # 总共使用的种子数量
-        total_used = used_seeds + used_for_cultivation
-
-        # 如果还有剩余种子可用
-        if batch.quantity > total_used:
-            batch.available_quantity = batch.quantity - total_used
-            result.append(batch)
 
-    session.close()
-    return result
+@cached_read(*INVENTORY_TABLES)
+def get_seed_batch_inventory(batch_id):
+    """获取单个种子批次及其库存信息"""
+    batches = get_seed_batches_with_inventory(SeedBatch.id == batch_id)
+    return batches[0] if batches else None
 
-def get_session():
+
+# 种子库存台账：每个种子批次一行，随发芽和栽培用种在同一事务中更新
+def _open_seed_stock_ledger(session, seed_batch):
+    """在当前事务中为新建的种子批次建立库存台账"""
+    session.flush()
+    session.add(SeedStockLedger(
+        seed_batch_id=seed_batch.id,
+        on_hand=seed_batch.quantity or 0,
+        reserved=0,
+        consumed=0
+    ))
+
+
+def _draw_seed_stock(session, seed_batch_id, quantity):
     """
-    获取数据库会话
+    在当前事务中从种子批次扣减库存
+
+    使用带条件的 UPDATE（可用数量 >= 扣减数量），两个用户同时从同一批次取种时
+    后提交的一方会重新判断条件，不会出现超量使用；条件不满足时返回 False
     """
-    from sqlalchemy.orm import sessionmaker
-    engine = get_engine()  # 假设 get_engine 函数已经存在
-    Session = sessionmaker(bind=engine)
-    return Session()
+    if not quantity:
+        return True
+
+    result = session.execute(
+        update(SeedStockLedger)
+        .where(SeedStockLedger.seed_batch_id == seed_batch_id,
+               SeedStockLedger.on_hand - SeedStockLedger.reserved >= quantity)
+        .values(on_hand=SeedStockLedger.on_hand - quantity,
+                consumed=SeedStockLedger.consumed + quantity,
+                updated_at=datetime.datetime.now())
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
 
 
-# 如果 get_engine 函数也不存在，还需要添加它
-def get_engine():
+@invalidates('seed_stock_ledger')
+def reserve_seed_stock(seed_batch_id, quantity):
+    """预留种子（如计划中的实验），可用数量不足时返回 False"""
+    session = Session()
+    try:
+        result = session.execute(
+            update(SeedStockLedger)
+            .where(SeedStockLedger.seed_batch_id == seed_batch_id,
+                   SeedStockLedger.on_hand - SeedStockLedger.reserved >= quantity)
+            .values(reserved=SeedStockLedger.reserved + quantity,
+                    updated_at=datetime.datetime.now())
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
+        return result.rowcount == 1
+    except Exception as e:
+        session.rollback()
+        print(f"预留种子失败: {e}")
+        return False
+    finally:
+        session.close()
+
+
+@invalidates('seed_stock_ledger')
+def release_seed_stock(seed_batch_id, quantity):
+    """释放已预留的种子"""
+    session = Session()
+    try:
+        result = session.execute(
+            update(SeedStockLedger)
+            .where(SeedStockLedger.seed_batch_id == seed_batch_id,
+                   SeedStockLedger.reserved >= quantity)
+            .values(reserved=SeedStockLedger.reserved - quantity,
+                    updated_at=datetime.datetime.now())
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
+        return result.rowcount == 1
+    except Exception as e:
+        session.rollback()
+        print(f"释放预留种子失败: {e}")
+        return False
+    finally:
+        session.close()
+
+
+def _seed_stock_from_history(session, *criteria):
+    """根据发芽和栽培历史计算每个批次应有的库存，返回 {批次ID: (库存数量, 已消耗数量)}"""
+    germination_usage, cultivation_usage = _seed_usage_subqueries(session)
+    consumed = func.coalesce(germination_usage.c.used, 0) + func.coalesce(cultivation_usage.c.used, 0)
+
+    rows = session.query(SeedBatch.id, SeedBatch.quantity, consumed).outerjoin(
+        germination_usage, germination_usage.c.seed_batch_id == SeedBatch.id
+    ).outerjoin(
+        cultivation_usage, cultivation_usage.c.seed_batch_id == SeedBatch.id
+    ).filter(*criteria).all()
+
+    return {batch_id: ((quantity or 0) - used, used) for batch_id, quantity, used in rows}
+
+
+@invalidates('seed_stock_ledger')
+def rebuild_seed_stock_ledger(missing_only=False):
     """
-    获取数据库引擎
+    根据历史记录重建种子库存台账
+
+    missing_only=True 时只为还没有台账的批次补建；预留数量无法从历史推算，重建时保留原值。
+    返回写入的台账行数
     """
-    from sqlalchemy import create_engine
-    # 替换为你的实际数据库连接字符串
-    db_path = "sqlite:///plant_conservation.db"  # 或者你实际使用的数据库路径
-    return create_engine(db_path)
+    session = Session()
+    try:
+        criteria = []
+        if missing_only:
+            has_ledger = session.query(SeedStockLedger.id).filter(
+                SeedStockLedger.seed_batch_id == SeedBatch.id
+            ).exists()
+            criteria.append(~has_ledger)
+            # 常见情况下所有批次都有台账，直接返回
+            if not session.query(SeedBatch.id).filter(*criteria).first():
+                return 0
+
+        expected = _seed_stock_from_history(session, *criteria)
+        ledgers = {}
+        if not missing_only:
+            ledgers = {ledger.seed_batch_id: ledger for ledger in session.query(SeedStockLedger)}
+
+        now = datetime.datetime.now()
+        for batch_id, (on_hand, consumed) in expected.items():
+            ledger = ledgers.get(batch_id)
+            if ledger is None:
+                session.add(SeedStockLedger(seed_batch_id=batch_id, on_hand=on_hand, reserved=0,
+                                            consumed=consumed, updated_at=now))
+            else:
+                ledger.on_hand = on_hand
+                ledger.consumed = consumed
+                ledger.updated_at = now
 
+        session.commit()
+        return len(expected)
+    except Exception as e:
+        session.rollback()
+        print(f"重建种子库存台账失败: {e}")
+        return 0
+    finally:
+        session.close()
 
 
+def verify_seed_stock_ledger():
+    """核对种子库存台账与历史记录，返回不一致的批次列表"""
+    session = Session()
+    try:
+        expected = _seed_stock_from_history(session)
+        ledgers = {ledger.seed_batch_id: ledger for ledger in session.query(SeedStockLedger)}
+
+        mismatches = []
+        for batch_id, (on_hand, consumed) in expected.items():
+            ledger = ledgers.get(batch_id)
+            if ledger is None or ledger.on_hand != on_hand or ledger.consumed != consumed:
+                mismatches.append({
+                    "seed_batch_id": batch_id,
+                    "expected_on_hand": on_hand,
+                    "ledger_on_hand": ledger.on_hand if ledger else None,
+                    "expected_consumed": consumed,
+                    "ledger_consumed": ledger.consumed if ledger else None,
+                })
+        return mismatches
+    finally:
+        session.close()
 
 
+@cached_read(*INVENTORY_TABLES)
+def get_seed_batches_for_germination():
+    """获取可用于发芽实验的种子批次"""
+    return get_seed_batches_with_inventory(available_only=True)
 
+def get_session():
+    """
+    获取当前线程的数据库会话（同一线程内多次调用返回同一个会话）
+    """
+    return ScopedSession()
+
+
+def get_engine():
+    """
+    获取数据库引擎（整个进程共用一个）
+    """
+    return engine
+
+
+@cached_read('collections')
 def get_all_plants():
     """获取所有植物"""
     session = Session()
@@ -676,6 +1468,7 @@ def get_all_plants():
     return collections
 
 
+@cached_read('collections')
 def get_plant_by_id(plant_id):
     """通过ID获取植物，改为获取 Collection"""
     session = Session()
@@ -684,6 +1477,7 @@ def get_plant_by_id(plant_id):
     return collection
 
 
+@cached_read('collections')
 def get_all_collections():
     """获取所有采集记录"""
     session = Session()
@@ -692,23 +1486,346 @@ def get_all_collections():
     return collections
 
 
-def get_seed_batches(filter_species=None):
-    """获取种子批次，可选择按种子名称筛选"""
+@cached_read(*INVENTORY_TABLES)
+def get_seed_batches(filter_species=None, with_usage=False):
+    """获取种子批次（附带库存信息），可选择按种子名称筛选，with_usage=True 时附带发芽/栽培用量明细"""
+    filters = []
+
+    if filter_species:
+        filters.append(fulltext_filter(SeedBatch, filter_species, ['species_chinese', 'species_latin']))
+
+    return get_seed_batches_with_inventory(*filters, order_by=SeedBatch.storage_date.desc(),
+                                           with_usage=with_usage)
+
+
+# 选择框和列表只需要少数几个字段：按列投影查询，返回轻量的命名元组，不构造 ORM 对象
+CollectionOption = namedtuple('CollectionOption', [
+    'id', 'collection_id', 'location', 'collection_date', 'species_chinese', 'species_latin'])
+SeedBatchOption = namedtuple('SeedBatchOption', [
+    'id', 'batch_id', 'storage_location', 'storage_date', 'species_chinese', 'available_quantity'])
+GerminationOption = namedtuple('GerminationOption', [
+    'id', 'germination_id', 'start_date', 'status', 'seed_batch_id'])
+CultivationOption = namedtuple('CultivationOption', [
+    'id', 'cultivation_id', 'location', 'start_date', 'status', 'species_chinese', 'species_latin',
+    'family', 'genus'])
+
+
+# 种子批次的可用数量：台账的库存减预留，没有台账时取批次数量（与 query_seed_batch_inventory 一致）
+_AVAILABLE_QUANTITY = func.coalesce(
+    SeedStockLedger.on_hand - func.coalesce(SeedStockLedger.reserved, 0), SeedBatch.quantity, 0)
+
+
+def _option_select(row_type, model):
+    """选项行的查询：字段与 model 的列同名，available_quantity 通过外连接库存台账计算"""
+    query = select(*[_AVAILABLE_QUANTITY if field == 'available_quantity' else getattr(model, field)
+                     for field in row_type._fields])
+    if 'available_quantity' in row_type._fields:
+        query = query.outerjoin(SeedStockLedger, SeedStockLedger.seed_batch_id == model.id)
+    return query
+
+
+def _project(row_type, model, *criteria, order_by=None):
+    """只查询 row_type 中的字段，返回 row_type 列表"""
+    query = _option_select(row_type, model).where(*criteria)
+    query = query.order_by(*(order_by if order_by is not None else [model.id]))
+    session = Session()
+    try:
+        return [row_type(*row) for row in session.execute(query)]
+    finally:
+        session.close()
+
+
+@cached_read('collections')
+def get_collection_options(identified=None):
+    """采集记录选择项，identified 不为 None 时按鉴定状态筛选"""
+    criteria = [] if identified is None else [Collection.identified == identified]
+    return _project(CollectionOption, Collection, *criteria)
+
+
+@cached_read('seed_batches', 'seed_stock_ledger')
+def get_seed_batch_options():
+    """种子批次选择项（按存储日期倒序）"""
+    return _project(SeedBatchOption, SeedBatch, order_by=[SeedBatch.storage_date.desc(), SeedBatch.id])
+
+
+@cached_read('germination_records')
+def get_germination_options(status=None):
+    """发芽实验选择项（按开始日期倒序），status 不为空时按状态筛选"""
+    criteria = [GerminationRecord.status == status] if status else []
+    return _project(GerminationOption, GerminationRecord, *criteria,
+                    order_by=[GerminationRecord.start_date.desc(), GerminationRecord.id])
+
+
+@cached_read('cultivation_records')
+def get_cultivation_options(status=None, fruiting=None):
+    """栽培记录选择项，可按状态和是否结果筛选"""
+    criteria = []
+    if status:
+        criteria.append(CultivationRecord.status == status)
+    if fruiting is not None:
+        criteria.append(CultivationRecord.fruiting == fruiting)
+    return _project(CultivationOption, CultivationRecord, *criteria)
+
+
+@cached_read('cultivation_records')
+def get_cultivation_values(column, **filters):
+    """
+    栽培记录某一列（如 location、family、genus）的不同取值，用于筛选下拉框
+
+    filters 为列的等值条件，如 status='活'，空值不返回
+    """
+    field = getattr(CultivationRecord, column)
+    criteria = [getattr(CultivationRecord, name) == value for name, value in filters.items()]
+    session = Session()
+    try:
+        rows = (session.query(field).distinct()
+                .filter(*criteria, field.isnot(None), field != '')
+                .order_by(field).all())
+        return [row[0] for row in rows]
+    finally:
+        session.close()
+
+
+# 记录选择器（边输入边检索）：只返回与输入最匹配的前 PICKER_LIMIT 条选项
+PICKER_LIMIT = 20
+
+# 选择器数据源: 类型 -> (模型, 选项行类型, 编号列, 日期列, 全文检索实体类型, 与检索结果关联的列)
+# 发芽实验不在全文索引中，按其种子批次的检索结果（名称、批次编号等）匹配
+PICKER_SOURCES = {
+    'collection': (Collection, CollectionOption, Collection.collection_id, Collection.collection_date,
+                   'collection', Collection.id),
+    'seed_batch': (SeedBatch, SeedBatchOption, SeedBatch.batch_id, SeedBatch.storage_date,
+                   'seed_batch', SeedBatch.id),
+    'germination': (GerminationRecord, GerminationOption, GerminationRecord.germination_id,
+                    GerminationRecord.start_date, 'seed_batch', GerminationRecord.seed_batch_id),
+    'cultivation': (CultivationRecord, CultivationOption, CultivationRecord.cultivation_id,
+                    CultivationRecord.start_date, 'cultivation', CultivationRecord.id),
+}
+
+
+@cached_read('collections', 'seed_batches', 'germination_records', 'cultivation_records', 'seed_stock_ledger')
+def search_options(kind, term=None, limit=PICKER_LIMIT, available_only=False, **filters):
+    """
+    记录选择器的候选项（kind 为 PICKER_SOURCES 中的类型），返回选项行列表
+
+    编号前缀匹配（编号列唯一索引上的范围查询）排在前面，不足 limit 条时按全文检索相关度补足；
+    没有输入时返回最近的 limit 条。filters 为列的等值条件（如 status='活'），
+    available_only 只用于种子批次，只保留还有可用种子的批次
+    """
+    model, row_type, code_column, date_column, fts_type, fts_key = PICKER_SOURCES[kind]
+    criteria = [getattr(model, name) == value for name, value in filters.items()]
+    if available_only:
+        criteria.append(model.id.in_(
+            select(SeedStockLedger.seed_batch_id).where(SeedStockLedger.on_hand - SeedStockLedger.reserved > 0)
+        ))
+
+    term = (term or '').strip()
+    session = Session()
+    try:
+        if not term:
+            query = (_option_select(row_type, model).where(*criteria)
+                     .order_by(date_column.desc(), model.id.desc()).limit(limit))
+            return [row_type(*row) for row in session.execute(query)]
+
+        # 编号一般为大写，同时按原样和大写匹配前缀
+        prefix_match = or_(*[and_(code_column >= prefix, code_column < prefix + '\U0010ffff')
+                             for prefix in {term, term.upper()}])
+        query = _option_select(row_type, model).where(*criteria, prefix_match).order_by(code_column).limit(limit)
+        options = [row_type(*row) for row in session.execute(query)]
+
+        hits = _search_hits([(term, None)], fts_type) if len(options) < limit else None
+        if hits is not None:
+            seen = {option.id for option in options}
+            query = (_option_select(row_type, model).join(hits, hits.c.entity_id == fts_key).where(*criteria)
+                     .order_by(hits.c.rank, date_column.desc(), model.id.desc())
+                     .limit(limit + len(seen)))
+            for row in session.execute(query):
+                option = row_type(*row)
+                if option.id not in seen and len(options) < limit:
+                    seen.add(option.id)
+                    options.append(option)
+        return options
+    finally:
+        session.close()
+
+
+# 分页列表：按 (日期, id) 倒序做键集分页，翻页时用上一页最后一行定位，不使用 OFFSET，
+# 任何一页都只读取 page_size 行；游标为上一页最后一行的 (日期, id)
+RecordPage = namedtuple('RecordPage', ['items', 'total', 'next_cursor'])
+
+DEFAULT_PAGE_SIZE = 20
+
+
+def _keyset_order(sort_column, id_column):
+    # SQLite 倒序时 NULL 排在最后
+    return [sort_column.desc(), id_column.desc()]
+
+
+def _keyset_after(sort_column, id_column, after):
+    """排在游标 after 之后的行"""
+    if after is None:
+        return true()
+    value, last_id = after
+    if value is None:
+        return and_(sort_column.is_(None), id_column < last_id)
+    return or_(sort_column < value,
+               and_(sort_column == value, id_column < last_id),
+               sort_column.is_(None))
+
+
+def _record_page(rows, page_size, total, sort_attr):
+    """把多取一行的查询结果切成一页，有下一页时以本页最后一行作为游标"""
+    if len(rows) <= page_size:
+        return RecordPage(rows, total, None)
+    rows = rows[:page_size]
+    last = rows[-1]
+    return RecordPage(rows, total, (getattr(last, sort_attr), last.id))
+
+
+def collection_filters(search_term=None, identified=None, start_date=None, end_date=None,
+                       collector=None, family=None):
+    """
+    采集记录的筛选条件，返回可传给 filter()/where() 的条件列表（各条件之间为“且”），可与其他条件组合
+
+    search_term 走全文检索；鉴定状态、采集日期范围、采集人和科都是带索引列上的等值或范围条件
+    """
+    criteria = []
+    if search_term:
+        criteria.append(fulltext_filter(Collection, search_term))
+    if identified is not None:
+        criteria.append(Collection.identified == identified)
+    if start_date is not None:
+        criteria.append(Collection.collection_date >= start_date)
+    if end_date is not None:
+        criteria.append(Collection.collection_date <= end_date)
+    if collector:
+        criteria.append(Collection.collector == collector)
+    if family:
+        criteria.append(Collection.family == family)
+    return criteria
+
+
+@cached_read('collections')
+def get_collections_page(page_size=DEFAULT_PAGE_SIZE, after=None, **filters):
+    """分页获取采集记录（按采集日期倒序），筛选参数见 collection_filters"""
+    criteria = collection_filters(**filters)
+
     session = Session()
-    query = session.query(SeedBatch)
+    try:
+        total = session.query(func.count(Collection.id)).filter(*criteria).scalar()
+        rows = (session.query(Collection)
+                .filter(*criteria, _keyset_after(Collection.collection_date, Collection.id, after))
+                .order_by(*_keyset_order(Collection.collection_date, Collection.id))
+                .limit(page_size + 1)
+                .all())
+        return _record_page(rows, page_size, total, 'collection_date')
+    finally:
+        session.close()
 
+
+def collection_export_query(**filters):
+    """符合筛选条件的采集记录除 id 外全部字段（按采集日期倒序）的查询语句，用于导出；筛选参数见 collection_filters"""
+    columns = [column for column in Collection.__table__.columns if column.name != 'id']
+    return (select(*columns)
+            .where(*collection_filters(**filters))
+            .order_by(*_keyset_order(Collection.collection_date, Collection.id)))
+
+
+@cached_read(*INVENTORY_TABLES)
+def get_seed_batches_page(page_size=DEFAULT_PAGE_SIZE, after=None, filter_species=None, with_usage=False):
+    """分页获取种子批次（按存储日期倒序，附带库存信息），可按种子名称筛选"""
+    criteria = []
     if filter_species:
-        query = query.filter(
-            or_(
-                SeedBatch.species_chinese.ilike(f'%{filter_species}%'),
-                SeedBatch.species_latin.ilike(f'%{filter_species}%')
-            )
+        criteria.append(fulltext_filter(SeedBatch, filter_species, ['species_chinese', 'species_latin']))
+
+    session = Session()
+    try:
+        total = session.query(func.count(SeedBatch.id)).filter(*criteria).scalar()
+        rows = query_seed_batch_inventory(
+            session, *criteria, _keyset_after(SeedBatch.storage_date, SeedBatch.id, after),
+            order_by=_keyset_order(SeedBatch.storage_date, SeedBatch.id),
+            with_usage=with_usage, limit=page_size + 1
         )
+        return _record_page(rows, page_size, total, 'storage_date')
+    finally:
+        session.close()
+
+
+def _page_with_seed_batch(session, model, criteria, sort_column, after, page_size):
+    """
+    按键集分页读取带种子批次外键的记录，同一条查询外连接种子批次，
+    每条记录附带 seed_batch_code（批次编号）和 seed_species_chinese（批次种名），不必逐条查询批次
+    """
+    rows = (session.query(model, SeedBatch.batch_id, SeedBatch.species_chinese)
+            .outerjoin(SeedBatch, model.seed_batch_id == SeedBatch.id)
+            .filter(*criteria, _keyset_after(sort_column, model.id, after))
+            .order_by(*_keyset_order(sort_column, model.id))
+            .limit(page_size + 1)
+            .all())
+    records = []
+    for record, batch_code, species_chinese in rows:
+        record.seed_batch_code = batch_code
+        record.seed_species_chinese = species_chinese
+        records.append(record)
+    return records
+
+
+@cached_read('germination_records', 'seed_batches')
+def get_germination_records_page(page_size=DEFAULT_PAGE_SIZE, after=None, filter_species=None):
+    """
+    分页获取发芽记录（按开始日期倒序，附带种子批次编号和种名），可按种子名称筛选
+
+    种子名称走种子批次的全文检索，与种子批次列表的筛选一致
+    """
+    criteria = []
+    if filter_species:
+        criteria.append(GerminationRecord.seed_batch_id.in_(
+            select(SeedBatch.id).where(
+                fulltext_filter(SeedBatch, filter_species, ['species_chinese', 'species_latin']))
+        ))
+
+    session = Session()
+    try:
+        total = session.query(func.count(GerminationRecord.id)).filter(*criteria).scalar()
+        rows = _page_with_seed_batch(session, GerminationRecord, criteria, GerminationRecord.start_date,
+                                     after, page_size)
+        return _record_page(rows, page_size, total, 'start_date')
+    finally:
+        session.close()
+
+
+@cached_read('cultivation_records', 'seed_batches')
+def get_cultivation_records_page(page_size=DEFAULT_PAGE_SIZE, after=None, status=None, location=None,
+                                 taxon=None):
+    """
+    分页获取栽培记录（按开始日期倒序，附带种子批次编号和种名）
+
+    status 按状态精确筛选；location 按位置、taxon 按科/属/中文名/拉丁名做不区分大小写的包含匹配
+    """
+    criteria = []
+    if status:
+        criteria.append(CultivationRecord.status == status)
+    if location:
+        criteria.append(CultivationRecord.location.contains(location, autoescape=True))
+    if taxon:
+        criteria.append(or_(
+            CultivationRecord.family.contains(taxon, autoescape=True),
+            CultivationRecord.genus.contains(taxon, autoescape=True),
+            CultivationRecord.species_chinese.contains(taxon, autoescape=True),
+            CultivationRecord.species_latin.contains(taxon, autoescape=True),
+        ))
+
+    session = Session()
+    try:
+        total = session.query(func.count(CultivationRecord.id)).filter(*criteria).scalar()
+        rows = _page_with_seed_batch(session, CultivationRecord, criteria, CultivationRecord.start_date,
+                                     after, page_size)
+        return _record_page(rows, page_size, total, 'start_date')
+    finally:
+        session.close()
 
-    seed_batches = query.order_by(SeedBatch.storage_date.desc()).all()
-    session.close()
-    return seed_batches
 
+@cached_read('collections')
 def get_collection_by_id(collection_id):
     """根据ID获取采集记录"""
     session = Session()
@@ -716,6 +1833,7 @@ def get_collection_by_id(collection_id):
     session.close()
     return collection
 
+@cached_read('seed_batches')
 def get_seed_batch_by_id(batch_id):
     """根据ID获取种子批次"""
     session = Session()
@@ -723,6 +1841,7 @@ def get_seed_batch_by_id(batch_id):
     session.close()
     return seed_batch
 
+@cached_read('germination_records')
 def get_germination_records_by_batch(batch_id):
     """获取某种子批次的所有发芽记录"""
     session = Session()
@@ -731,6 +1850,17 @@ def get_germination_records_by_batch(batch_id):
     return records
 
 
+@cached_read('cultivation_records')
+def get_cultivation_records_by_batch(batch_id):
+    """获取某种子批次的所有栽培记录"""
+    session = Session()
+    try:
+        return session.query(CultivationRecord).filter(CultivationRecord.seed_batch_id == batch_id).all()
+    finally:
+        session.close()
+
+
+@invalidates('seed_batches', 'seed_stock_ledger')
 def add_seed_batch(collection_id=None, quantity=None, storage_location=None,
                    storage_date=None, viability=None, notes=None, source=None, seed_id=None):
     """添加种子批次"""
@@ -756,11 +1886,13 @@ def add_seed_batch(collection_id=None, quantity=None, storage_location=None,
             seed_batch.species_chinese = collection.species_chinese
 
     session.add(seed_batch)
+    _open_seed_stock_ledger(session, seed_batch)
     session.commit()
     record_id = seed_batch.id
     session.close()
     return record_id
 
+@invalidates('collections')
 def add_collection(collection_date, location, latitude, longitude, altitude, collector,
                   notes=None, habitat=None, species_latin=None,
                   family=None, family_chinese=None, genus=None, genus_chinese=None,
@@ -810,6 +1942,7 @@ def add_collection(collection_date, location, latitude, longitude, altitude, col
     session.close()
     return collection_id
 
+@invalidates('collections')
 def update_collection(collection_id, collection_date=None, location=None, latitude=None,
                       longitude=None, altitude=None, collector=None, notes=None, habitat=None,
                       species_latin=None, family=None, family_chinese=None,
@@ -900,6 +2033,7 @@ def update_collection(collection_id, collection_date=None, location=None, latitu
 
 
 
+@invalidates('collections')
 def update_collection_identification(collection_id,
                                     family=None, family_chinese=None, genus=None, genus_chinese=None,
                                     species_latin=None, identified_by=None, identification_notes=None,
@@ -944,6 +2078,7 @@ def update_collection_identification(collection_id,
 
 
 
+@cached_read('collections')
 def get_unidentified_collections():
     """获取未鉴定的采集记录"""
     session = Session()
@@ -952,113 +2087,91 @@ def get_unidentified_collections():
     return collections
 
 
+@cached_read('collections')
 def search_collections_by_taxonomy(family=None, genus=None, species_latin=None, species_chinese=None):
-    """按分类信息搜索采集记录"""
+    """按分类信息搜索采集记录（各条件之间为“或”），按相关度排序"""
     session = Session()
 
-    filters = []
-    if family:
-        filters.append(Collection.family.ilike(f'%{family}%'))
-    if genus:
-        filters.append(Collection.genus.ilike(f'%{genus}%'))
-    if species_latin:
-        filters.append(Collection.species_latin.ilike(f'%{species_latin}%'))
-    if species_chinese:
-        filters.append(Collection.species_chinese.ilike(f'%{species_chinese}%'))
-
-    if filters:
-        collections = session.query(Collection).filter(or_(*filters)).all()
-    else:
-        collections = session.query(Collection).all()
+    hits = _search_hits([
+        (family, ['family', 'family_chinese']),
+        (genus, ['genus', 'genus_chinese']),
+        (species_latin, ['species_latin']),
+        (species_chinese, ['species_chinese']),
+    ], 'collection')
+
+    query = session.query(Collection)
+    if hits is not None:
+        query = query.join(hits, hits.c.entity_id == Collection.id).order_by(hits.c.rank, Collection.id.desc())
+    collections = query.all()
 
     session.close()
     return collections
 
+@invalidates('seed_batches', 'seed_stock_ledger')
 def update_seed_batch(batch_id, **kwargs):
-    """更新种子批次信息"""
+    """
+    更新种子批次信息，成功时返回 True
+
+    修改种子总数时同步调整台账中的库存数量（库存 = 总数 - 已消耗），与 _draw_seed_stock 一样
+    使用带条件的 UPDATE：调整后的库存少于已预留的数量时不做修改，返回 False
+    """
     session = Session()
-    session.query(SeedBatch).filter(SeedBatch.id == batch_id).update(kwargs)
-    session.commit()
-    session.close()
+    try:
+        if 'quantity' in kwargs:
+            on_hand = (kwargs['quantity'] or 0) - SeedStockLedger.consumed
+            result = session.execute(
+                update(SeedStockLedger)
+                .where(SeedStockLedger.seed_batch_id == batch_id,
+                       on_hand >= SeedStockLedger.reserved)
+                .values(on_hand=on_hand, updated_at=datetime.datetime.now())
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount != 1 and session.query(SeedStockLedger.id).filter(
+                    SeedStockLedger.seed_batch_id == batch_id).first() is not None:
+                session.rollback()
+                print("更新种子批次失败: 种子总数减去已消耗数量后少于已预留的数量")
+                return False
+
+        session.query(SeedBatch).filter(SeedBatch.id == batch_id).update(kwargs)
+        session.commit()
+        return True
+    except Exception as e:
+        session.rollback()
+        print(f"更新种子批次失败: {e}")
+        return False
+    finally:
+        session.close()
 
 
+@cached_read('collections')
 def search_plants(search_term, identification_status=None, family=None):
-    """搜索植物，改为搜索 Collection"""
+    """全文检索采集记录（编号、名称、科属、地点、采集人等），按相关度排序"""
     session = Session()
-    query = f"%{search_term}%"
-    # 构建基本查询条件，使用 Collection 的字段
-    filters = [
-        or_(
-            Collection.species_latin.like(query),
-            Collection.species_chinese.like(query),
-            Collection.family.like(query),
-            Collection.genus.like(query),
-            Collection.species_chinese.like(query),
-            Collection.collection_id.like(query)
-        )
-    ]
+    query = session.query(Collection)
+    hits = _search_hits([(search_term, None)], 'collection')
+    if hits is not None:
+        query = query.join(hits, hits.c.entity_id == Collection.id).order_by(hits.c.rank, Collection.id.desc())
     # 添加鉴定状态筛选
     if identification_status is not None:
-        filters.append(Collection.identified == identification_status)
+        query = query.filter(Collection.identified == identification_status)
     # 添加科筛选
     if family:
-        filters.append(Collection.family.like(f"%{family}%"))
-    # 执行查询
-    collections = session.query(Collection).filter(and_(*filters)).all()
+        query = query.filter(Collection.family.like(f"%{family}%"))
+    collections = query.all()
     session.close()
     return collections
 
 
+@invalidates('images')
 def update_image_description(image_id, description):
     """更新图片描述"""
     session = Session()
     try:
-        # 尝试在不同的图片表中查找图片
-        image_found = False
-
-        # 检查CollectionImage表
-        image = session.query(CollectionImage).filter(CollectionImage.id == image_id).first()
-        if image:
-            image.description = description
-            image_found = True
-
-        # 检查SeedImage表
-        if not image_found:
-            image = session.query(SeedImage).filter(SeedImage.id == image_id).first()
-            if image:
-                image.description = description
-                image_found = True
-
-        # 检查GerminationImage表
-        if not image_found:
-            image = session.query(GerminationImage).filter(GerminationImage.id == image_id).first()
-            if image:
-                image.description = description
-                image_found = True
-
-        # 检查CultivationImage表
-        if not image_found:
-            image = session.query(CultivationImage).filter(CultivationImage.id == image_id).first()
-            if image:
-                image.description = description
-                image_found = True
-
-        # 检查PlantImage表
-        if not image_found:
-            image = session.query(PlantImage).filter(PlantImage.id == image_id).first()
-            if image:
-                image.description = description
-                image_found = True
-
-        # 如果都没找到，最后尝试BaseImage表
-        if not image_found:
-            image = session.query(BaseImage).filter(BaseImage.id == image_id).first()
-            if image:
-                image.description = description
-                image_found = True
-
+        result = session.execute(
+            update(ImageRecord).where(ImageRecord.id == image_id).values(description=description)
+        )
         session.commit()
-        return image_found
+        return result.rowcount == 1
     except Exception as e:
         session.rollback()
         print(f"更新图片描述失败: {e}")
@@ -1067,67 +2180,28 @@ def update_image_description(image_id, description):
         session.close()
 
 
+@invalidates('images', 'image_blobs')
 def delete_image(image_id):
     """删除图片"""
     session = Session()
     try:
-        # 尝试在不同的图片表中查找图片
-        image_found = False
-        image_path = None
-
-        # 检查CollectionImage表
-        image = session.query(CollectionImage).filter(CollectionImage.id == image_id).first()
-        if image:
-            image_path = image.file_path
-            session.delete(image)
-            image_found = True
-
-        # 检查SeedImage表
-        if not image_found:
-            image = session.query(SeedImage).filter(SeedImage.id == image_id).first()
-            if image:
-                image_path = image.file_path
-                session.delete(image)
-                image_found = True
-
-        # 检查GerminationImage表
-        if not image_found:
-            image = session.query(GerminationImage).filter(GerminationImage.id == image_id).first()
-            if image:
-                image_path = image.file_path
-                session.delete(image)
-                image_found = True
-
-        # 检查CultivationImage表
-        if not image_found:
-            image = session.query(CultivationImage).filter(CultivationImage.id == image_id).first()
-            if image:
-                image_path = image.file_path
-                session.delete(image)
-                image_found = True
-
-        # 检查PlantImage表
-        if not image_found:
-            image = session.query(PlantImage).filter(PlantImage.id == image_id).first()
-            if image:
-                image_path = image.file_path
-                session.delete(image)
-                image_found = True
-
-        # 如果都没找到，最后尝试BaseImage表
-        if not image_found:
-            image = session.query(BaseImage).filter(BaseImage.id == image_id).first()
-            if image:
-                image_path = image.file_path
-                session.delete(image)
-                image_found = True
-
-        # 删除文件
-        if image_path and os.path.exists(image_path):
-            os.remove(image_path)
-
+        deleted = session.execute(
+            delete(ImageRecord)
+            .where(ImageRecord.id == image_id)
+            .returning(ImageRecord.file_path, ImageRecord.blob_hash)
+        ).first()
+        if deleted is None:
+            return False
+
+        if deleted.blob_hash:
+            # 内容文件可能还被其他图片记录引用，由引用计数决定是否删除
+            file_path = _release_blob(session, deleted.blob_hash)
+        else:
+            file_path = deleted.file_path
         session.commit()
-        return image_found
+        # 提交成功后才删除文件
+        _remove_image_file(file_path)
+        return True
     except Exception as e:
         session.rollback()
         print(f"删除图片失败: {e}")
@@ -1136,6 +2210,7 @@ def delete_image(image_id):
         session.close()
 
 
+@cached_read('collections')
 def search_collections(start_date, end_date, location=None, collector=None):
     """搜索采集记录"""
     session = Session()
@@ -1157,10 +2232,9 @@ def search_collections(start_date, end_date, location=None, collector=None):
     return collections
 
 
+@cached_read(*INVENTORY_TABLES)
 def search_seed_batches(start_date, end_date, storage_location=None):
-    """搜索种子批次"""
-    session = Session()
-
+    """搜索种子批次（附带库存信息）"""
     # 构建过滤条件
     filters = [
         SeedBatch.storage_date >= start_date,
@@ -1170,11 +2244,10 @@ def search_seed_batches(start_date, end_date, storage_location=None):
     if storage_location:
         filters.append(SeedBatch.storage_location.like(f"%{storage_location}%"))
 
-    seed_batches = session.query(SeedBatch).filter(*filters).all()
-    session.close()
-    return seed_batches
+    return get_seed_batches_with_inventory(*filters)
 
 
+@cached_read('germination_records')
 def search_germination_records(start_date, end_date, status=None, treatment=None):
     """搜索发芽记录"""
     session = Session()
@@ -1196,6 +2269,7 @@ def search_germination_records(start_date, end_date, status=None, treatment=None
     return records
 
 
+@cached_read('cultivation_records')
 def search_cultivation_records(start_date, end_date, status=None, location=None):
     """搜索栽培记录"""
     session = Session()
@@ -1217,6 +2291,7 @@ def search_cultivation_records(start_date, end_date, status=None, location=None)
     return records
 
 
+@cached_read('collections')
 def get_all_families():
     """获取所有科，改为从 Collection 获取"""
     session = Session()
@@ -1226,6 +2301,17 @@ def get_all_families():
     return [f[0] for f in families if f[0]]
 
 
+@cached_read('collections')
+def get_all_collectors():
+    """获取所有采集人"""
+    session = Session()
+    collectors = session.query(Collection.collector).distinct().filter(Collection.collector != None).order_by(
+        Collection.collector).all()
+    session.close()
+    return [c[0] for c in collectors if c[0]]
+
+
+@cached_read('collections')
 def get_all_genera():
     """获取所有属，改为从 Collection 获取"""
     session = Session()
@@ -1235,6 +2321,7 @@ def get_all_genera():
     return [g[0] for g in genera if g[0]]
 
 
+@cached_read('collections')
 def get_plants_by_family(family):
     """按科获取植物，改为获取 Collection"""
     session = Session()
@@ -1243,6 +2330,7 @@ def get_plants_by_family(family):
     return collections
 
 
+@cached_read('collections')
 def get_plants_by_genus(genus):
     """按属获取植物，改为获取 Collection"""
     session = Session()
@@ -1252,246 +2340,77 @@ def get_plants_by_genus(genus):
 
 
 
+@cached_read(*INVENTORY_TABLES)
 def get_seed_batches_by_collection(collection_id):
-    """获取指定采集记录的种子批次"""
-    session = Session()
-    batches = session.query(SeedBatch).filter(SeedBatch.collection_id == collection_id).all()
-
-    # 计算每个批次的可用数量
-    for batch in batches:
-        # 计算已用于发芽的种子数量
-        used_seeds = session.query(GerminationRecord).filter(
-            GerminationRecord.seed_batch_id == batch.id
-        ).with_entities(
-            func.sum(GerminationRecord.quantity_used)
-        ).scalar() or 0
-
-        # 计算已用于栽培的种子数量
-        used_for_cultivation = session.query(CultivationRecord).filter(
-            CultivationRecord.seed_batch_id == batch.id
-        ).with_entities(
-            func.sum(CultivationRecord.quantity)
-        ).scalar() or 0
-
-        # 总共使用的种子数量
-        total_used = used_seeds + used_for_cultivation
-
-        # 计算可用数量
-        batch.available_quantity = batch.quantity - total_used if batch.quantity else 0
-
-    session.close()
-    return batches
-
-def show_cultivation_statistics():
-    st.subheader("栽培统计")
-    # 创建新的会话
-    session = Session()
-    try:
-        # Get cultivation records
-        cultivation_records = get_cultivation_records()
-
-        if not cultivation_records:
-            st.info("目前没有栽培记录数据")
-            return
-
-        # Basic statistics
-        total_cultivations = len(cultivation_records)
-        active_cultivations = len([r for r in cultivation_records if r.status == "活"])
-        flowering_cultivations = len([r for r in cultivation_records if r.flowering])
-        fruiting_cultivations = len([r for r in cultivation_records if r.fruiting])
-        dead_cultivations = len([r for r in cultivation_records if r.status == "死亡"])
-
-        # Display basic statistics
-        col1, col2, col3, col4, col5 = st.columns(5)
-        with col1:
-            st.metric("总栽培记录", total_cultivations)
-        with col2:
-            st.metric("存活植株", active_cultivations)
-        with col3:
-            st.metric("开花植株", flowering_cultivations)
-        with col4:
-            st.metric("结果植株", fruiting_cultivations)
-        with col5:
-            st.metric("死亡植株", dead_cultivations)
-
-        # Prepare data for taxonomic statistics
-        families = {}
-        genera = {}
-
-        for record in cultivation_records:
-            # Get taxonomic info from the record or its related seed batch or collection
-            family = record.family
-            genus = record.genus
-
-            if not family and record.seed_batch and record.seed_batch.collection:
-                family = record.seed_batch.collection.family
-
-            if not genus and record.seed_batch and record.seed_batch.collection:
-                genus = record.seed_batch.collection.genus
-
-            # Count by family
-            if family:
-                if family in families:
-                    families[family] += 1
-                else:
-                    families[family] = 1
-
-            # Count by genus
-            if genus:
-                if genus in genera:
-                    genera[genus] += 1
-                else:
-                    genera[genus] = 1
-
-        # Display taxonomic charts
-        col1, col2 = st.columns(2)
-
-        with col1:
-            st.subheader("按科统计")
-            if families:
-                # Sort and get top 10 families
-                sorted_families = sorted(families.items(), key=lambda x: x[1], reverse=True)[:10]
-                family_names = [f[0] for f in sorted_families]
-                family_counts = [f[1] for f in sorted_families]
-
-                fig, ax = plt.subplots()
-                ax.barh(family_names, family_counts)
-                ax.set_xlabel('数量')
-                ax.set_ylabel('科')
-                ax.set_title('栽培植物科分布 (Top 10)')
-                st.pyplot(fig)
-            else:
-                st.info("暂无科分布数据")
-
-        with col2:
-            st.subheader("按属统计")
-            if genera:
-                # Sort and get top 10 genera
-                sorted_genera = sorted(genera.items(), key=lambda x: x[1], reverse=True)[:10]
-                genus_names = [g[0] for g in sorted_genera]
-                genus_counts = [g[1] for g in sorted_genera]
-
-                fig, ax = plt.subplots()
-                ax.barh(genus_names, genus_counts)
-                ax.set_xlabel('数量')
-                ax.set_ylabel('属')
-                ax.set_title('栽培植物属分布 (Top 10)')
-                st.pyplot(fig)
-            else:
-                st.info("暂无属分布数据")
-
-        # Status change over time
-        st.subheader("栽培状态随时间变化")
-
-        # Get all cultivation events
-        all_events = []
-        for record in cultivation_records:
-            events = get_cultivation_events(record.id)
-            all_events.extend(events)
-
-        if all_events:
-            # Group events by month
-            events_by_month = {}
-            for event in all_events:
-                month_key = event.event_date.strftime('%Y-%m')
-                if month_key not in events_by_month:
-                    events_by_month[month_key] = {
-                        "浇水": 0, "施肥": 0, "修剪": 0, "观察": 0, "开花": 0, "结果": 0, "死亡": 0, "其他": 0
-                    }
-
-                event_type = event.event_type
-                if event_type not in events_by_month[month_key]:
-                    event_type = "其他"
-
-                events_by_month[month_key][event_type] += 1
-
-            # Sort months
-            sorted_months = sorted(events_by_month.keys())
-
-            # Prepare data for chart
-            event_types = ["浇水", "施肥", "修剪", "观察", "开花", "结果", "死亡", "其他"]
-            data = {
-                "月份": sorted_months
-            }
-
-            for event_type in event_types:
-                data[event_type] = [events_by_month[month][event_type] for month in sorted_months]
-
-            # Create DataFrame
-            df = pd.DataFrame(data)
-
-            # Plot
-            fig, ax = plt.subplots(figsize=(12, 6))
-            bottom = np.zeros(len(sorted_months))
-
-            for event_type in event_types:
-                ax.bar(df["月份"], df[event_type], bottom=bottom, label=event_type)
-                bottom += df[event_type].values
-
-            ax.set_xlabel('月份')
-            ax.set_ylabel('事件数量')
-            ax.set_title('栽培事件随时间变化')
-            ax.legend()
-
-            # Rotate x-labels for better readability
-            plt.xticks(rotation=45)
-
-            st.pyplot(fig)
-        else:
-            st.info("暂无栽培事件数据")
-
-        # Survival rate analysis
-        st.subheader("存活率分析")
-
-        # Get all completed cultivations (older than 3 months)
-        three_months_ago = datetime.datetime.now().date() - datetime.timedelta(days=90)
-        completed_cultivations = [r for r in cultivation_records if r.start_date < three_months_ago]
-
-        if completed_cultivations:
-            # Calculate survival rates by location
-            locations = {}
-            for record in completed_cultivations:
-                if record.location not in locations:
-                    locations[record.location] = {"total": 0, "alive": 0}
-
-                locations[record.location]["total"] += 1
-                if record.status == "活":
-                    locations[record.location]["alive"] += 1
-
-            # Calculate survival rates
-            location_names = []
-            survival_rates = []
-
-            for location, counts in locations.items():
-                if counts["total"] >= 5:  # Only include locations with at least 5 records
-                    location_names.append(location)
-                    survival_rates.append(counts["alive"] / counts["total"] * 100)
-
-            if location_names:
-                # Plot
-                fig, ax = plt.subplots()
-                ax.bar(location_names, survival_rates)
-                ax.set_xlabel('栽培位置')
-                ax.set_ylabel('存活率 (%)')
-                ax.set_title('不同栽培位置的植物存活率')
-                ax.set_ylim(0, 100)
-
-                # Rotate x-labels for better readability
-                plt.xticks(rotation=45)
-
-                st.pyplot(fig)
-            else:
-                st.info("没有足够的数据进行位置存活率分析")
-        else:
-            st.info("暂无完成的栽培记录")
-    finally:
-        # 确保会话被关闭
-        session.close()
+    """获取指定采集记录的种子批次（附带库存信息）"""
+    return get_seed_batches_with_inventory(SeedBatch.collection_id == collection_id)
 
 
+@cached_read('seed_batches')
 def get_harvested_seeds(cultivation_id):
     """获取从栽培记录收获的种子批次"""
     session = Session()
     seeds = session.query(SeedBatch).filter(SeedBatch.parent_cultivation_id == cultivation_id).all()
     session.close()
-    return seeds
\ No newline at end of file
+    return seeds
+
+
+if __name__ == "__main__":
+    # 数据库维护命令，例如: python database.py verify-ledger
+    parser = argparse.ArgumentParser(description="植物保育数据库维护工具")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("rebuild-ledger", help="根据发芽和栽培历史重建种子库存台账")
+    subparsers.add_parser("verify-ledger", help="核对种子库存台账与历史记录是否一致")
+    subparsers.add_parser("index-report", help="显示常用查询的执行计划")
+    subparsers.add_parser("connection-info", help="显示数据库连接的 PRAGMA 设置")
+    subparsers.add_parser("rebuild-search-index", help="重建全文检索索引")
+    subparsers.add_parser("rebuild-identifiers", help="重建扫码查询用的业务编号索引")
+    subparsers.add_parser("generate-thumbnails", help="为缺少缩略图的已有图片生成缩略图")
+    subparsers.add_parser("migrate-images", help="把已有图片文件移入内容寻址存储并去重")
+    subparsers.add_parser("rebuild-event-rollup", help="根据全部栽培事件重建月度汇总表")
+    subparsers.add_parser("rebuild-dashboard-stats", help="按现有数据重新统计首页计数")
+    args = parser.parse_args()
+
+    init_db()
+    if args.command == "rebuild-ledger":
+        count = rebuild_seed_stock_ledger()
+        print(f"已重建 {count} 个种子批次的库存台账")
+    elif args.command == "verify-ledger":
+        mismatches = verify_seed_stock_ledger()
+        if mismatches:
+            print(f"发现 {len(mismatches)} 个批次的台账与历史记录不一致:")
+            for item in mismatches:
+                print(f"  批次 {item['seed_batch_id']}: 库存 {item['ledger_on_hand']} (应为 {item['expected_on_hand']}), "
+                      f"已消耗 {item['ledger_consumed']} (应为 {item['expected_consumed']})")
+        else:
+            print("种子库存台账与历史记录一致")
+    elif args.command == "index-report":
+        print_query_plan_report(None, explain_query_plans())
+    elif args.command == "connection-info":
+        for name, value in connection_settings().items():
+            print(f"{name} = {value}")
+    elif args.command == "rebuild-search-index":
+        count = rebuild_search_index()
+        print(f"已重建全文检索索引，共 {count} 条记录")
+    elif args.command == "rebuild-identifiers":
+        count = rebuild_identifier_registry()
+        print(f"已重建业务编号索引，共 {count} 个编号")
+    elif args.command == "generate-thumbnails":
+        session = Session()
+        file_paths = [path for (path,) in session.query(ImageRecord.file_path)]
+        session.close()
+        count = 0
+        for file_path, paths in thumbnails.iter_missing_derivatives(file_paths):
+            if paths:
+                count += 1
+                print(f"  {file_path}")
+        print(f"已为 {count} 张图片生成缩略图")
+    elif args.command == "migrate-images":
+        count = migrate_images_to_blob_store()
+        print(f"已将 {count} 张图片移入内容寻址存储")
+    elif args.command == "rebuild-event-rollup":
+        count = rebuild_cultivation_event_rollup()
+        print(f"已重建栽培事件月度汇总，共 {count} 行")
+    elif args.command == "rebuild-dashboard-stats":
+        count = rebuild_dashboard_stats()
+        print(f"已重新统计首页计数，共 {count} 行")
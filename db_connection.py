@@ -0,0 +1,49 @@
+"""
+数据库连接管理
+
+整个进程只创建一个引擎（连接池），每个新连接都设置 WAL 日志模式和常用 PRAGMA，
+读操作不再阻塞写操作。Session 每次调用创建一个新会话；ScopedSession 按线程复用会话，
+Streamlit 每个用户会话在各自的线程中运行，互不干扰。
+"""
+
+import os
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker, scoped_session
+
+# 获取当前脚本所在目录的绝对路径
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# 环境变量 PLANT_DB_PATH 可指定其他数据库文件（例如测试使用的临时数据库）
+DB_PATH = os.environ.get('PLANT_DB_PATH') or os.path.join(BASE_DIR, 'plant_conservation.db')
+
+# 每个新连接上执行的 PRAGMA
+CONNECTION_PRAGMAS = [
+    ("journal_mode", "WAL"),       # 写前日志：读写互不阻塞
+    ("synchronous", "NORMAL"),     # WAL 模式下只在检查点时同步磁盘，断电不会损坏数据库
+    ("busy_timeout", 5000),        # 数据库被锁时最多等待 5 秒
+    ("cache_size", -65536),        # 页缓存 64MB（负数表示 KB）
+    ("mmap_size", 268435456),      # 内存映射读取 256MB
+    ("foreign_keys", "ON"),        # 启用外键约束
+]
+
+engine = create_engine(f'sqlite:///{DB_PATH}')
+
+
+@event.listens_for(engine, "connect")
+def _apply_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in CONNECTION_PRAGMAS:
+        cursor.execute(f"PRAGMA {name} = {value}")
+    cursor.close()
+
+
+Session = sessionmaker(bind=engine)
+ScopedSession = scoped_session(Session)
+
+
+def connection_settings():
+    """返回当前连接上各 PRAGMA 的实际取值，用于确认设置已生效"""
+    with engine.connect() as conn:
+        return {
+            name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+            for name, _ in CONNECTION_PRAGMAS
+        }
@@ -0,0 +1,125 @@
+"""
+大批量数据导出
+
+在数据库中执行与列表页相同的筛选查询，按批（CHUNK_SIZE 行）读取并逐行写入导出文件：
+CSV 直接写入文本，Excel 使用 openpyxl 的只写模式（write_only），内存占用与导出行数无关。
+导出文件只在用户点击导出时生成，保存在 exports 目录中，超过 MAX_AGE_HOURS 的旧文件在下次导出时清理。
+"""
+
+import csv
+import datetime
+import os
+import tempfile
+from db_connection import BASE_DIR, engine
+
+EXPORT_DIR = os.path.join(BASE_DIR, 'exports')
+
+# 每批读取和写入的行数
+CHUNK_SIZE = 1000
+
+# 导出文件保留时间（小时）
+MAX_AGE_HOURS = 24
+
+# Excel 单个工作表最多 1048576 行（含表头），超出时续写到新的工作表
+XLSX_MAX_ROWS = 1048576
+
+# 导出格式: (文件扩展名, MIME 类型)
+EXPORT_FORMATS = {
+    "csv": (".csv", "text/csv"),
+    "xlsx": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+def _iter_chunks(query, chunk_size):
+    """执行查询，先返回列名，之后每次返回一批行"""
+    with engine.connect() as conn:
+        result = conn.execution_options(yield_per=chunk_size).execute(query)
+        yield list(result.keys())
+        for rows in result.partitions():
+            yield rows
+
+
+def _write_csv(path, chunks):
+    count = 0
+    # utf-8-sig 让 Excel 正确识别中文
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(next(chunks))
+        for rows in chunks:
+            writer.writerows(rows)
+            count += len(rows)
+    return count
+
+
+def _write_xlsx(path, chunks, sheet_title):
+    # 只在导出 Excel 时才需要 openpyxl
+    from openpyxl import Workbook
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+    workbook = Workbook(write_only=True)
+    header = next(chunks)
+
+    def new_sheet(number):
+        sheet = workbook.create_sheet(sheet_title if number == 1 else f"{sheet_title}{number}")
+        sheet.append(header)
+        return sheet
+
+    sheet_number = 1
+    sheet = new_sheet(sheet_number)
+    sheet_rows = 1
+    count = 0
+    for rows in chunks:
+        for row in rows:
+            if sheet_rows >= XLSX_MAX_ROWS:
+                sheet_number += 1
+                sheet = new_sheet(sheet_number)
+                sheet_rows = 1
+            # 控制字符无法写入 xlsx
+            sheet.append([ILLEGAL_CHARACTERS_RE.sub("", value) if isinstance(value, str) else value
+                          for value in row])
+            sheet_rows += 1
+        count += len(rows)
+
+    workbook.save(path)
+    return count
+
+
+def cleanup_exports(max_age_hours=MAX_AGE_HOURS):
+    """删除超过保留时间的导出文件"""
+    if not os.path.exists(EXPORT_DIR):
+        return
+    cutoff = datetime.datetime.now().timestamp() - max_age_hours * 3600
+    for file in os.listdir(EXPORT_DIR):
+        file_path = os.path.join(EXPORT_DIR, file)
+        try:
+            if os.path.getmtime(file_path) < cutoff:
+                os.remove(file_path)
+        except OSError as e:
+            print(f"删除旧导出文件失败: {file_path}, 错误: {e}")
+
+
+def export_query(query, export_format="csv", name="export", chunk_size=CHUNK_SIZE):
+    """
+    把查询结果按批写入导出文件，返回 (文件路径, 导出行数)
+
+    export_format 为 EXPORT_FORMATS 中的格式；写入失败时删除未完成的文件并抛出异常
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"不支持的导出格式: {export_format}")
+
+    cleanup_exports()
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    extension, _ = EXPORT_FORMATS[export_format]
+    fd, path = tempfile.mkstemp(prefix=f"{name}_", suffix=extension, dir=EXPORT_DIR)
+    os.close(fd)
+
+    try:
+        chunks = _iter_chunks(query, chunk_size)
+        if export_format == "xlsx":
+            count = _write_xlsx(path, chunks, name)
+        else:
+            count = _write_csv(path, chunks)
+    except Exception:
+        os.remove(path)
+        raise
+    return path, count
@@ -0,0 +1,66 @@
+"""
+发芽率统计
+
+与栽培统计一样用 SQL 聚合（AVG / MIN / MAX / GROUP BY）计算，只统计已完成的发芽实验，
+不逐条读取发芽记录。结果按发芽记录表的版本号缓存。
+"""
+
+import pandas as pd
+from db_connection import engine
+from query_cache import cached_read
+
+# 发芽率分布直方图的分组数（0% ~ 100% 等分）
+RATE_BINS = 10
+
+
+@cached_read('germination_records')
+def rate_summary():
+    """
+    发芽率概况，返回 Series：total 发芽实验总数、completed 已完成（有发芽率）的实验数，
+    以及已完成实验的 avg_rate 平均、max_rate 最高、min_rate 最低发芽率（没有已完成的实验时为 NaN）
+    """
+    with engine.connect() as conn:
+        frame = pd.read_sql_query("""
+            SELECT COUNT(*) AS total,
+                   COUNT(done_rate) AS completed,
+                   AVG(done_rate) AS avg_rate,
+                   MAX(done_rate) AS max_rate,
+                   MIN(done_rate) AS min_rate
+            FROM (
+                SELECT CASE WHEN status = '已完成' THEN germination_rate END AS done_rate
+                FROM germination_records
+            )
+        """, conn.connection)
+    return frame.iloc[0]
+
+
+@cached_read('germination_records')
+def rate_histogram(bins=RATE_BINS):
+    """
+    已完成发芽实验的发芽率分布，返回 DataFrame [下限, 数量]，共 bins 组，下限为 0 到 1 之间的小数
+
+    与 hist(range=(0, 1)) 及首页的发芽率分布（dashboard_stats）一致：发芽率为 100% 的实验归入最后一组，
+    0 ~ 1 范围以外的发芽率不计入
+    """
+    with engine.connect() as conn:
+        counts = pd.read_sql_query("""
+            SELECT MIN(CAST(germination_rate * ? AS INTEGER), ? - 1) AS bin, COUNT(*) AS n
+            FROM germination_records
+            WHERE status = '已完成' AND germination_rate >= 0 AND germination_rate <= 1
+            GROUP BY bin
+        """, conn.connection, params=(bins, bins))
+    counts = counts.set_index("bin")["n"].reindex(range(bins), fill_value=0)
+    return pd.DataFrame({"下限": [i / bins for i in range(bins)], "数量": counts.to_numpy()})
+
+
+@cached_read('germination_records')
+def treatment_rates():
+    """已完成发芽实验按处理方式统计的平均发芽率，返回 DataFrame [处理方式, 平均发芽率]"""
+    with engine.connect() as conn:
+        return pd.read_sql_query("""
+            SELECT treatment AS 处理方式, AVG(germination_rate) AS 平均发芽率
+            FROM germination_records
+            WHERE status = '已完成' AND germination_rate IS NOT NULL
+            GROUP BY treatment
+            ORDER BY treatment
+        """, conn.connection)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Text, ForeignKey, Boolean, create_engine
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Text, ForeignKey, Boolean, Index, create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, backref
 import datetime
@@ -8,27 +8,32 @@ Base = declarative_base()
 
 class Collection(Base):
     __tablename__ = 'collections'
+    __table_args__ = (
+        Index('ix_collections_family_genus', 'family', 'genus'),
+        # 部分索引：只索引未鉴定的记录，待鉴定列表不必扫描全表
+        Index('ix_collections_unidentified', 'collection_date', sqlite_where=text('identified = 0')),
+    )
 
     id = Column(Integer, primary_key=True)
     collection_id = Column(String(50), unique=True, nullable=False)
-    collection_date = Column(Date)
+    collection_date = Column(Date, index=True)
     location = Column(String(200))
     latitude = Column(Float)
     longitude = Column(Float)
     altitude = Column(Float)
-    collector = Column(String(100))
+    collector = Column(String(100), index=True)
     habitat = Column(String(200))
     notes = Column(Text)
 
     # 现有的字段
-    family = Column(String(100))  # 科
+    family = Column(String(100), index=True)  # 科
     family_chinese = Column(String(100))  # 科中文名
-    genus = Column(String(100))  # 属
+    genus = Column(String(100), index=True)  # 属
     genus_chinese = Column(String(100))  # 属中文名
     species_latin = Column(String(100))  # 种拉丁名
     species_chinese = Column(String(100))  # 种中文名
     common_name = Column(String(100))  # 俗名
-    identified = Column(Boolean, default=False)  # 是否已鉴定
+    identified = Column(Boolean, default=False, index=True)  # 是否已鉴定
     identified_by = Column(String(100))  # 鉴定人
     identified_date = Column(Date)  # 鉴定日期
     identification_notes = Column(Text)  # 鉴定备注
@@ -58,7 +63,7 @@ class CollectionImage(Base):
     __tablename__ = 'collection_images'
 
     id = Column(Integer, primary_key=True)
-    collection_id = Column(Integer, ForeignKey('collections.id'))
+    collection_id = Column(Integer, ForeignKey('collections.id'), index=True)
     file_path  = Column(String(200))
     description = Column(Text)
     upload_date = Column(Date, default=datetime.datetime.now)
@@ -72,13 +77,13 @@ class SeedBatch(Base):
     id = Column(Integer, primary_key=True)
     batch_id = Column(String(50), unique=True, nullable=False)  # 批次编号
     seed_id = Column(String(50))  # 种子编号
-    collection_id = Column(Integer, ForeignKey('collections.id'), nullable=True)  # 关联采集ID，可以为空
-    parent_cultivation_id = Column(Integer, ForeignKey('cultivation_records.id'), nullable=True)  # 关联母本栽培
+    collection_id = Column(Integer, ForeignKey('collections.id'), nullable=True, index=True)  # 关联采集ID，可以为空
+    parent_cultivation_id = Column(Integer, ForeignKey('cultivation_records.id'), nullable=True, index=True)  # 关联母本栽培
     species_chinese = Column(String(100))  # 种子名称
     species_latin = Column(String(100))  # 拉丁学名
     quantity = Column(Integer)  # 种子数量
     storage_location = Column(String(200))  # 存储位置
-    storage_date = Column(Date)  # 存储日期
+    storage_date = Column(Date, index=True)  # 存储日期
     viability = Column(Float)  # 活力/发芽率
     notes = Column(Text)  # 备注
     source = Column(String(50))  # 来源
@@ -91,11 +96,14 @@ class SeedBatch(Base):
 
 class GerminationRecord(Base):
     __tablename__ = 'germination_records'
+    __table_args__ = (
+        Index('ix_germination_records_status_start_date', 'status', 'start_date'),
+    )
 
     id = Column(Integer, primary_key=True)
     germination_id = Column(String(50), unique=True, nullable=False)  # 保育编号
-    seed_batch_id = Column(Integer, ForeignKey('seed_batches.id'))  # 关联种子批次
-    start_date = Column(Date, default=datetime.datetime.now)  # 开始发芽实验日期
+    seed_batch_id = Column(Integer, ForeignKey('seed_batches.id'), index=True)  # 关联种子批次
+    start_date = Column(Date, default=datetime.datetime.now, index=True)  # 开始发芽实验日期
     treatment = Column(String(200))  # 处理方式
     quantity_used = Column(Integer)  # 使用的种子数量
     germinated_count = Column(Integer, default=0)  # 已发芽数量
@@ -110,6 +118,9 @@ class GerminationRecord(Base):
 
 class GerminationEvent(Base):
     __tablename__ = 'germination_events'
+    __table_args__ = (
+        Index('ix_germination_events_record_date', 'germination_record_id', 'event_date'),
+    )
     id = Column(Integer, primary_key=True)
     germination_record_id = Column(Integer, ForeignKey('germination_records.id'))  # 注意这里的字段名应该是germination_record_id而不是germination_id
     event_date = Column(Date, default=datetime.datetime.now)
@@ -124,7 +135,7 @@ class GerminationImage(Base):
     __tablename__ = 'germination_images'
 
     id = Column(Integer, primary_key=True)
-    germination_id = Column(Integer, ForeignKey('germination_records.id'))
+    germination_id = Column(Integer, ForeignKey('germination_records.id'), index=True)
     file_path = Column(String(200))
     description = Column(Text)
 
@@ -133,12 +144,18 @@ class GerminationImage(Base):
 
 class CultivationRecord(Base):
     __tablename__ = 'cultivation_records'
+    __table_args__ = (
+        Index('ix_cultivation_records_status_location', 'status', 'location'),
+        # 部分索引：已结果且存活的植株（收获种子来源选择）
+        Index('ix_cultivation_records_fruiting_alive', 'start_date',
+              sqlite_where=text("fruiting = 1 AND status = '活'")),
+    )
 
     id = Column(Integer, primary_key=True)
     cultivation_id = Column(String(50), unique=True, nullable=False)  # 栽培编号
-    seed_batch_id = Column(Integer, ForeignKey('seed_batches.id'), nullable=True)  # 关联种子批次
-    collection_id = Column(Integer, ForeignKey('collections.id'), nullable=True)  # 直接关联野外采集
-    parent_cultivation_id = Column(Integer, ForeignKey('cultivation_records.id'), nullable=True)  # 关联母本栽培
+    seed_batch_id = Column(Integer, ForeignKey('seed_batches.id'), nullable=True, index=True)  # 关联种子批次
+    collection_id = Column(Integer, ForeignKey('collections.id'), nullable=True, index=True)  # 直接关联野外采集
+    parent_cultivation_id = Column(Integer, ForeignKey('cultivation_records.id'), nullable=True, index=True)  # 关联母本栽培
     species_chinese = Column(String(100))  # 物种名称
     species_latin = Column(String(100))  # 拉丁学名
     quantity = Column(Integer)  # 数量
@@ -154,7 +171,7 @@ class CultivationRecord(Base):
     fertilizer = Column(String(100))  # 肥料
 
     # Add these missing fields
-    start_date = Column(Date, default=datetime.datetime.now)  # 开始日期
+    start_date = Column(Date, default=datetime.datetime.now, index=True)  # 开始日期
     flowering = Column(Boolean, default=False)  # 是否开花
     flowering_date = Column(Date)  # 开花日期
     fruiting = Column(Boolean, default=False)  # 是否结果
@@ -189,10 +206,13 @@ class CultivationRecord(Base):
 
 class CultivationEvent(Base):
     __tablename__ = 'cultivation_events'
+    __table_args__ = (
+        Index('ix_cultivation_events_record_date', 'cultivation_record_id', 'event_date'),
+    )
 
     id = Column(Integer, primary_key=True)
     cultivation_record_id = Column(Integer, ForeignKey('cultivation_records.id'))
-    event_date = Column(Date, default=datetime.datetime.now)
+    event_date = Column(Date, default=datetime.datetime.now, index=True)
     event_type = Column(String(50))  # 事件类型：浇水/施肥/修剪等
     description = Column(Text)
 
@@ -203,7 +223,7 @@ class CultivationImage(Base):
     __tablename__ = 'cultivation_images'
 
     id = Column(Integer, primary_key=True)
-    cultivation_id = Column(Integer, ForeignKey('cultivation_records.id'))
+    cultivation_id = Column(Integer, ForeignKey('cultivation_records.id'), index=True)
     file_path = Column(String(200))
     description = Column(Text)
     upload_date = Column(Date, default=datetime.datetime.now)
@@ -213,6 +233,9 @@ class CultivationImage(Base):
 
 class CultivationSubgroup(Base):
     __tablename__ = 'cultivation_subgroups'
+    __table_args__ = (
+        Index('ix_cultivation_subgroups_cultivation_date', 'cultivation_id', 'status_date'),
+    )
 
     id = Column(Integer, primary_key=True)
     cultivation_id = Column(Integer, ForeignKey('cultivation_records.id'))
@@ -243,7 +266,7 @@ CultivationRecord.harvested_seeds = relationship("SeedBatch",
 class BaseImage(Base):
     __tablename__ = 'base_images'
     id = Column(Integer, primary_key=True)
-    seed_batch_id = Column(Integer, ForeignKey('seed_batches.id'), nullable=True)  # 关联种子批次
+    seed_batch_id = Column(Integer, ForeignKey('seed_batches.id'), nullable=True, index=True)  # 关联种子批次
     file_path = Column(String(200))
     description = Column(Text)
     image_date = Column(Date, default=datetime.datetime.now)
@@ -255,7 +278,7 @@ class PlantImage(Base):
     __tablename__ = 'plant_images'
 
     id = Column(Integer, primary_key=True)
-    plant_id = Column(Integer, ForeignKey('cultivation_records.id'), nullable=True)
+    plant_id = Column(Integer, ForeignKey('cultivation_records.id'), nullable=True, index=True)
     file_path = Column(String(200))
     description = Column(Text)
     image_date = Column(Date, default=datetime.datetime.now)
@@ -266,9 +289,88 @@ class SeedImage(Base):
     __tablename__ = 'seed_images'
 
     id = Column(Integer, primary_key=True)
-    seed_batch_id = Column(Integer, ForeignKey('seed_batches.id'))
+    seed_batch_id = Column(Integer, ForeignKey('seed_batches.id'), index=True)
     file_path = Column(String(200))
     description = Column(Text)
     upload_date = Column(Date, default=datetime.datetime.now)
 
     seed_batch = relationship("SeedBatch", backref="images")
+
+
+class SeedStockLedger(Base):
+    __tablename__ = 'seed_stock_ledger'
+
+    id = Column(Integer, primary_key=True)
+    seed_batch_id = Column(Integer, ForeignKey('seed_batches.id'), unique=True, nullable=False)  # 关联种子批次
+    on_hand = Column(Integer, default=0)  # 库存数量
+    reserved = Column(Integer, default=0)  # 预留数量
+    consumed = Column(Integer, default=0)  # 已消耗数量（发芽+栽培）
+    updated_at = Column(DateTime, default=datetime.datetime.now)  # 最后更新时间
+
+    seed_batch = relationship("SeedBatch", backref=backref("stock_ledger", uselist=False))
+
+
+class IdentifierRegistry(Base):
+    # 业务编号索引，由数据库触发器在各表增删改时维护
+    __tablename__ = 'identifier_registry'
+
+    code = Column(String(50), primary_key=True)  # 采集编号/批次编号/保育编号/栽培编号
+    entity_type = Column(String(20), nullable=False)  # collection / seed_batch / germination / cultivation
+    entity_id = Column(Integer, nullable=False)  # 对应记录的主键
+
+
+class ImageRecord(Base):
+    # 所有图片统一登记在这张表中，图片 ID 全局唯一；旧的六张图片表只在迁移时读取
+    __tablename__ = 'images'
+    __table_args__ = (
+        Index('ix_images_entity', 'entity_type', 'entity_id'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    entity_type = Column(String(20), nullable=False)  # 所属记录类型：collection/seed/germination/cultivation/plant/base
+    entity_id = Column(Integer)  # 所属记录的主键
+    file_path = Column(String(200))
+    blob_hash = Column(String(64), index=True)  # 图片内容哈希，对应 image_blobs.hash；旧图片为空
+    description = Column(Text)
+    upload_date = Column(Date, default=datetime.datetime.now)
+
+
+class ImageBlob(Base):
+    # 按内容哈希存储的图片文件，同一张照片只存一份
+    __tablename__ = 'image_blobs'
+
+    hash = Column(String(64), primary_key=True)  # SHA-256
+    file_path = Column(String(200), nullable=False)
+    size = Column(Integer)  # 文件字节数
+    ref_count = Column(Integer, nullable=False, default=0)  # 引用该文件的图片记录数
+    created_at = Column(DateTime, default=datetime.datetime.now)
+
+
+class TableVersion(Base):
+    # 各表的修改版本号，由数据库触发器在增删改时递增，供缓存判断数据是否变化
+    __tablename__ = 'table_versions'
+
+    table_name = Column(String(100), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)  # 全库递增的版本号，最近一次修改该表时的取值
+
+
+class DashboardCounter(Base):
+    # 首页统计计数，由数据库触发器在增删改时增减（见 dashboard_stats），首页直接读取
+    __tablename__ = 'dashboard_counters'
+    __table_args__ = (
+        Index('ix_dashboard_counters_section_n', 'section', 'n'),
+    )
+
+    section = Column(String(20), primary_key=True)  # 统计项：counts 记录数、family 科分布、rate_bin 发芽率分组
+    key = Column(String(100), primary_key=True)  # counts 为表名或 unidentified，family 为科名，rate_bin 为分组序号
+    n = Column(Integer, nullable=False, default=0)
+
+
+class CultivationEventRollup(Base):
+    # 栽培事件按月份、类型、栽培位置汇总的计数，写入事件时同步累加，统计图表直接读取
+    __tablename__ = 'cultivation_event_rollup'
+
+    month = Column(String(7), primary_key=True)  # 事件月份 YYYY-MM
+    event_type = Column(String(50), primary_key=True)  # 事件类型，原样保存
+    location = Column(String(200), primary_key=True)  # 栽培记录当前的位置，未填写为空字符串
+    count = Column(Integer, nullable=False, default=0)  # 事件数
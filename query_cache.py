@@ -0,0 +1,150 @@
+"""
+查询结果缓存
+
+Streamlit 每次交互都会重新运行整个脚本，同样的查询会被反复执行。读函数的结果按
+(函数, 参数, 所读各表的版本号) 缓存在进程内，所有用户会话共用；写函数执行后递增所写各表的版本号，
+之后的读取自然落到新的缓存键上，写入者下一次重新运行就能看到自己写入的数据。
+"""
+
+import functools
+import threading
+from collections import OrderedDict
+
+# 每个读函数最多缓存的结果数
+DEFAULT_MAXSIZE = 128
+
+_versions = {}
+_lock = threading.RLock()
+
+# 读缓存前调用的同步函数，返回被其他进程修改过的表名，见 set_sync_hook
+_sync_hook = None
+
+
+def table_versions(tables):
+    """返回各表当前的版本号"""
+    with _lock:
+        return tuple(_versions.get(table, 0) for table in tables)
+
+
+def bump(*tables):
+    """递增各表的版本号，使依赖这些表的缓存失效"""
+    with _lock:
+        for table in tables:
+            _versions[table] = _versions.get(table, 0) + 1
+
+
+def invalidate_all():
+    """使所有缓存失效，例如整个数据库文件被替换之后"""
+    bump('*')
+
+
+def set_sync_hook(hook):
+    """
+    注册同步函数：每次读缓存前调用，返回自上次调用以来被修改的表名列表
+
+    进程内的写函数会直接递增版本号，这个钩子用来发现其他进程（或绕过写函数）的修改
+    """
+    global _sync_hook
+    _sync_hook = hook
+
+
+def _sync():
+    if _sync_hook is not None:
+        changed = _sync_hook()
+        if changed:
+            bump(*changed)
+
+
+def _detached_copy(obj, state):
+    """ORM 对象的副本：复制已加载的属性，作为游离对象返回（未加载的属性与原对象一样不可访问）"""
+    from sqlalchemy.orm import make_transient_to_detached
+    copy = state.manager.new_instance()
+    copy.__dict__.update((key, value) for key, value in obj.__dict__.items() if key != '_sa_instance_state')
+    if state.key is not None:
+        make_transient_to_detached(copy)
+    return copy
+
+
+def copy_result(value):
+    """
+    返回缓存结果的副本，所有会话共用的缓存值不会被调用方修改
+
+    列表、字典和普通元组逐项复制；DataFrame / Series 调用 copy()；ORM 对象复制为新的游离对象；
+    命名元组和标量本身不可变，直接返回
+    """
+    if isinstance(value, list):
+        return [copy_result(item) for item in value]
+    if isinstance(value, dict):
+        return {key: copy_result(item) for key, item in value.items()}
+    if type(value) is tuple:
+        return tuple(copy_result(item) for item in value)
+    if type(value).__module__.startswith("pandas") and hasattr(value, "copy"):
+        return value.copy()
+    state = getattr(value, "_sa_instance_state", None)
+    if state is not None:
+        return _detached_copy(value, state)
+    return value
+
+
+def cached_read(*tables, maxsize=DEFAULT_MAXSIZE):
+    """
+    读函数装饰器：结果按参数和 tables 中各表的版本号缓存
+
+    参数不可哈希时直接执行查询，不缓存。每次返回缓存结果的副本（见 copy_result），
+    调用方修改返回的列表、DataFrame 或 ORM 对象不会影响缓存
+    """
+    tables = tables + ('*',)
+
+    def decorator(func):
+        entries = OrderedDict()
+        entries_lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            _sync()
+
+            # 先取版本号再查询：查询期间有写入时，结果存在旧版本的键下，不会被之后的读取用到
+            key = (args, tuple(sorted(kwargs.items())), table_versions(tables))
+            try:
+                hash(key)
+            except TypeError:
+                return func(*args, **kwargs)
+
+            with entries_lock:
+                cached = key in entries
+                if cached:
+                    entries.move_to_end(key)
+                    result = entries[key]
+            if cached:
+                return copy_result(result)
+
+            result = func(*args, **kwargs)
+            with entries_lock:
+                entries[key] = result
+                if len(entries) > maxsize:
+                    entries.popitem(last=False)
+            return copy_result(result)
+
+        def cache_clear():
+            with entries_lock:
+                entries.clear()
+
+        wrapper.cache_clear = cache_clear
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
+
+
+def invalidates(*tables):
+    """写函数装饰器：函数执行后（无论成功与否）递增 tables 中各表的版本号"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                bump(*tables)
+        return wrapper
+
+    return decorator
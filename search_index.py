@@ -0,0 +1,256 @@
+"""
+全文检索索引（SQLite FTS5）
+
+采集记录、种子批次和栽培记录的编号、中文名/拉丁名、科属、地点、采集人、生境和备注
+写入同一张 FTS5 虚拟表，由触发器在增删改时同步。使用 trigram 分词器，
+中文和拉丁文都可以按任意子串检索。
+
+索引表的 rowid = 记录主键 * ENTITY_SLOTS + 实体类型编号，删除和更新只需按 rowid 定位。
+
+trigram 无法匹配少于 3 个字符的检索词（如两个字的中文名），这类短词改查名称前缀表 search_names：
+名称类字段的值（及其中第二个词起的部分，如拉丁学名的种加词）转成小写后存入 B-tree，
+短词按前缀范围查找，与检索索引由同一组触发器维护。
+"""
+
+FTS_TABLE = 'search_index'
+
+# 每条记录在索引中的 rowid 按实体类型编号错开
+ENTITY_SLOTS = 8
+
+SEARCH_COLUMNS = [
+    'code', 'species_latin', 'species_chinese', 'common_name',
+    'family', 'family_chinese', 'genus', 'genus_chinese',
+    'location', 'collector', 'habitat', 'notes',
+]
+
+# 实体类型: (编号, 来源表, {索引列: 来源字段表达式})
+ENTITY_SOURCES = {
+    'collection': (1, 'collections', {
+        'code': "{row}.collection_id || ' ' || COALESCE({row}.original_id, '') || ' ' || COALESCE({row}.specimen_number, '')",
+        'species_latin': '{row}.species_latin',
+        'species_chinese': '{row}.species_chinese',
+        'common_name': '{row}.common_name',
+        'family': '{row}.family',
+        'family_chinese': '{row}.family_chinese',
+        'genus': '{row}.genus',
+        'genus_chinese': '{row}.genus_chinese',
+        'location': '{row}.location',
+        'collector': '{row}.collector',
+        'habitat': '{row}.habitat',
+        'notes': '{row}.notes',
+    }),
+    'seed_batch': (2, 'seed_batches', {
+        'code': "{row}.batch_id || ' ' || COALESCE({row}.seed_id, '')",
+        'species_latin': '{row}.species_latin',
+        'species_chinese': '{row}.species_chinese',
+        'location': '{row}.storage_location',
+        'notes': '{row}.notes',
+    }),
+    'cultivation': (3, 'cultivation_records', {
+        'code': '{row}.cultivation_id',
+        'species_latin': '{row}.species_latin',
+        'species_chinese': '{row}.species_chinese',
+        'family': '{row}.family',
+        'family_chinese': '{row}.family_chinese',
+        'genus': '{row}.genus',
+        'genus_chinese': '{row}.genus_chinese',
+        'location': '{row}.location',
+        'notes': '{row}.notes',
+    }),
+}
+
+# trigram 分词器要求检索词至少 3 个字符，更短的词（如两个字的中文名）改查名称前缀表
+MIN_MATCH_LENGTH = 3
+
+NAME_TABLE = 'search_names'
+
+# 写入名称前缀表的字段（编号、生境和备注不参与短词检索）
+NAME_COLUMNS = [
+    'species_latin', 'species_chinese', 'common_name',
+    'family', 'family_chinese', 'genus', 'genus_chinese',
+    'location', 'collector',
+]
+
+
+def _select_values(entity_type, row):
+    """生成写入索引的 (rowid, 各列) 取值表达式"""
+    type_no, _, fields = ENTITY_SOURCES[entity_type]
+    values = [f"{row}.id * {ENTITY_SLOTS} + {type_no}"]
+    for column in SEARCH_COLUMNS:
+        values.append(fields[column].format(row=row) if column in fields else 'NULL')
+    return ', '.join(values)
+
+
+def _insert_columns():
+    return ', '.join(['rowid'] + SEARCH_COLUMNS)
+
+
+def _name_selects(entity_type, row, source=''):
+    """生成写入名称前缀表的 SELECT (term, field, entry)；source 为 FROM 子句，触发器中为空"""
+    type_no, _, fields = ENTITY_SOURCES[entity_type]
+    entry = f"{row}.id * {ENTITY_SLOTS} + {type_no}"
+    selects = []
+    for column in NAME_COLUMNS:
+        if column not in fields:
+            continue
+        value = f"TRIM({fields[column].format(row=row)})"
+        rest = f"LOWER(TRIM(SUBSTR({value}, INSTR({value}, ' ') + 1)))"
+        selects.append(f"SELECT LOWER({value}), '{column}', {entry}{source} WHERE {value} != ''")
+        selects.append(f"SELECT {rest}, '{column}', {entry}{source} WHERE INSTR({value}, ' ') > 0")
+    return selects
+
+
+def _insert_names(entity_type, row, source='', where=''):
+    selects = [select + where for select in _name_selects(entity_type, row, source)]
+    return f"INSERT OR IGNORE INTO {NAME_TABLE}(term, field, entry) {' UNION ALL '.join(selects)}"
+
+
+def _trigger_statements(entity_type):
+    """生成保持检索索引和名称前缀表同步的触发器"""
+    type_no, table, _ = ENTITY_SOURCES[entity_type]
+    insert_new = (f"INSERT INTO {FTS_TABLE}({_insert_columns()}) VALUES ({_select_values(entity_type, 'new')}); "
+                  f"{_insert_names(entity_type, 'new')};")
+    delete_old = (f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id * {ENTITY_SLOTS} + {type_no}; "
+                  f"DELETE FROM {NAME_TABLE} WHERE entry = old.id * {ENTITY_SLOTS} + {type_no};")
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_{table}_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_{table}_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_{table}_au AFTER UPDATE ON {table} BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+def populate(conn):
+    """用现有数据重新填充索引"""
+    conn.exec_driver_sql(f"DELETE FROM {FTS_TABLE}")
+    conn.exec_driver_sql(f"DELETE FROM {NAME_TABLE}")
+    for entity_type, (_, table, _) in ENTITY_SOURCES.items():
+        conn.exec_driver_sql(
+            f"INSERT INTO {FTS_TABLE}({_insert_columns()}) "
+            f"SELECT {_select_values(entity_type, table)} FROM {table}"
+        )
+        conn.exec_driver_sql(_insert_names(entity_type, table, f" FROM {table}"))
+
+
+def index_rows(conn, entity_type, after_id):
+    """把主键大于 after_id 的记录写入索引（绕过触发器批量插入后调用）"""
+    _, table, _ = ENTITY_SOURCES[entity_type]
+    conn.exec_driver_sql(
+        f"INSERT INTO {FTS_TABLE}({_insert_columns()}) "
+        f"SELECT {_select_values(entity_type, table)} FROM {table} WHERE id > ?", (after_id,)
+    )
+    conn.exec_driver_sql(_insert_names(entity_type, table, f" FROM {table}", f" AND {table}.id > {int(after_id)}"))
+
+
+def install(conn):
+    """创建索引表、名称前缀表和触发器；索引表是新建的则同时导入现有数据。返回是否新建"""
+    exists = conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+    ).first()
+    names_exist = conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (NAME_TABLE,)
+    ).first()
+
+    if not exists:
+        columns = ', '.join(SEARCH_COLUMNS)
+        try:
+            conn.exec_driver_sql(f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5({columns}, tokenize='trigram')")
+        except Exception as e:
+            # SQLite 3.34 之前没有 trigram 分词器
+            print(f"trigram 分词器不可用，改用 unicode61: {e}")
+            conn.exec_driver_sql(f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5({columns}, tokenize='unicode61')")
+
+    if not names_exist:
+        conn.exec_driver_sql(
+            f"CREATE TABLE {NAME_TABLE}(term TEXT NOT NULL, field TEXT NOT NULL, entry INTEGER NOT NULL, "
+            f"PRIMARY KEY (term, field, entry)) WITHOUT ROWID"
+        )
+        conn.exec_driver_sql(f"CREATE INDEX ix_{NAME_TABLE}_entry ON {NAME_TABLE}(entry)")
+        # 旧版本的触发器只维护检索索引，删除后按新定义重建
+        for entity_type, (_, table, _) in ENTITY_SOURCES.items():
+            for suffix in ("ai", "ad", "au"):
+                conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{table}_{suffix}")
+
+    for entity_type in ENTITY_SOURCES:
+        for statement in _trigger_statements(entity_type):
+            conn.exec_driver_sql(statement)
+
+    if not exists:
+        populate(conn)
+    elif not names_exist:
+        for entity_type, (_, table, _) in ENTITY_SOURCES.items():
+            conn.exec_driver_sql(_insert_names(entity_type, table, f" FROM {table}"))
+    return not exists
+
+
+def _quote(token):
+    """把检索词转成 FTS5 短语，避免用户输入被当作查询语法"""
+    return '"' + token.replace('"', '""') + '"'
+
+
+def _name_entries(token, columns, name, params):
+    """短检索词：名称前缀表中以该词开头的名称所属的索引行号（B-tree 范围查找）"""
+    params[name] = token
+    sql = (f"SELECT DISTINCT entry FROM {NAME_TABLE} "
+           f"WHERE term >= LOWER(:{name}) AND term < LOWER(:{name}) || CHAR(1114111)")
+    if columns:
+        fields = ', '.join(f"'{column}'" for column in columns if column in NAME_COLUMNS)
+        sql += f" AND field IN ({fields or 'NULL'})"
+    return sql
+
+
+def _group_sql(term, columns, prefix, params, entity_type):
+    """单个检索条件（词与词之间为 AND），返回结果列为 entity_type_no、entity_id、rank 的 SELECT"""
+    tokens = term.split()
+    long_tokens = [token for token in tokens if len(token) >= MIN_MATCH_LENGTH]
+    short_tokens = [token for token in tokens if len(token) < MIN_MATCH_LENGTH]
+    entries = [_name_entries(token, columns, f'{prefix}_name{i}', params) for i, token in enumerate(short_tokens)]
+    type_filter = f" % {ENTITY_SLOTS} = {ENTITY_SOURCES[entity_type][0]}" if entity_type else None
+
+    if not long_tokens:
+        # 只有短词：直接取名称前缀表的命中结果，不经过检索索引
+        where = f" WHERE entry{type_filter}" if type_filter else ""
+        return (f"SELECT entry % {ENTITY_SLOTS} AS entity_type_no, entry / {ENTITY_SLOTS} AS entity_id, "
+                f"0.0 AS rank FROM ({' INTERSECT '.join(entries)}){where}")
+
+    expression = ' AND '.join(_quote(token) for token in long_tokens)
+    if columns:
+        expression = '{' + ' '.join(columns) + '} : (' + expression + ')'
+    params[f'{prefix}_match'] = expression
+    # +rowid：短词的命中结果只用来过滤，不作为 rowid 约束交给 FTS5（否则每个 rowid 单独执行一次 MATCH）
+    conditions = [f"{FTS_TABLE} MATCH :{prefix}_match"] + [f"+rowid IN ({sql})" for sql in entries]
+    if type_filter:
+        conditions.append(f"rowid{type_filter}")
+    return (f"SELECT rowid % {ENTITY_SLOTS} AS entity_type_no, rowid / {ENTITY_SLOTS} AS entity_id, "
+            f"rank AS rank FROM {FTS_TABLE} WHERE {' AND '.join(conditions)}")
+
+
+def build_search_sql(groups, entity_type=None):
+    """
+    生成检索 SQL
+
+    groups 为 [(检索词, 限定列或 None), ...]，各组之间为 OR；结果列为 entity_type_no、
+    entity_id 和 rank（越小越相关）。没有有效检索词时返回 (None, None)
+    """
+    params = {}
+    selects = [
+        _group_sql(term, columns, f'g{i}', params, entity_type)
+        for i, (term, columns) in enumerate(groups)
+        if term and term.strip()
+    ]
+
+    if not selects:
+        return None, None
+    if len(selects) == 1:
+        return selects[0], params
+
+    union = ' UNION ALL '.join(selects)
+    return (f"SELECT entity_type_no, entity_id, MIN(rank) AS rank FROM ({union}) "
+            f"GROUP BY entity_type_no, entity_id"), params
+
+
+def entity_type_of(type_no):
+    """根据编号取实体类型名"""
+    for entity_type, (number, _, _) in ENTITY_SOURCES.items():
+        if number == type_no:
+            return entity_type
+    return None
@@ -0,0 +1,34 @@
+"""
+测试配置
+
+所有测试共用一个临时数据库：在导入任何应用模块之前通过 PLANT_DB_PATH 指向临时目录，
+不会读写项目目录中的 plant_conservation.db。
+"""
+
+import datetime
+import os
+import sys
+import tempfile
+
+import pytest
+
+_TMP_DIR = tempfile.mkdtemp(prefix="plant_test_")
+os.environ["PLANT_DB_PATH"] = os.path.join(_TMP_DIR, "test.db")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+
+database.init_db()
+
+
+@pytest.fixture
+def tmp_dir():
+    """本次测试会话的临时目录"""
+    return _TMP_DIR
+
+
+@pytest.fixture
+def seed_batch():
+    """新建一个有 100 粒种子的种子批次，返回批次 id"""
+    return database.add_seed_batch(quantity=100, storage_location="测试柜",
+                                   storage_date=datetime.date(2024, 1, 2), source="其他来源")
@@ -0,0 +1,58 @@
+import datetime
+import os
+import sqlite3
+
+import pytest
+
+import backup_utils
+import database
+from db_connection import DB_PATH, engine
+from sqlalchemy import text
+
+
+def _count_collections():
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT COUNT(*) FROM collections")).scalar()
+
+
+def _add_collection(location):
+    return database.add_collection(datetime.date(2024, 5, 1), location, None, None, None, "测试")
+
+
+def test_run_backup_writes_verified_copy(tmp_dir):
+    _add_collection("备份测试")
+    path = backup_utils.run_backup(os.path.join(tmp_dir, "backups", "backup_test.db"))
+
+    assert os.path.exists(path)
+    assert not os.path.exists(path + ".partial")
+    ok, result = backup_utils.verify_backup(path)
+    assert ok, result
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM collections").fetchone()[0] == _count_collections()
+
+
+def test_restore_replaces_live_database(tmp_dir):
+    _add_collection("恢复前")
+    path = backup_utils.run_backup(os.path.join(tmp_dir, "backups", "backup_restore.db"))
+    expected = _count_collections()
+
+    _add_collection("恢复后应消失")
+    assert _count_collections() == expected + 1
+
+    safety_path = backup_utils.restore_backup_file(path)
+
+    assert _count_collections() == expected
+    assert safety_path.startswith(DB_PATH + ".bak_")
+    with sqlite3.connect(safety_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM collections").fetchone()[0] == expected + 1
+
+
+def test_restore_rejects_corrupt_file(tmp_dir):
+    path = os.path.join(tmp_dir, "corrupt.db")
+    with open(path, "wb") as f:
+        f.write(b"not a database" * 100)
+    before = _count_collections()
+
+    with pytest.raises(Exception):
+        backup_utils.restore_backup_file(path)
+    assert _count_collections() == before
@@ -0,0 +1,66 @@
+import io
+import os
+
+import pytest
+
+import blob_store
+import database
+import thumbnails
+from models import ImageBlob
+
+
+@pytest.fixture(autouse=True)
+def blob_dir(tmp_dir, monkeypatch):
+    """图片文件写到临时目录，不生成缩略图"""
+    monkeypatch.setattr(blob_store, "BLOB_DIR", os.path.join(tmp_dir, "blobs"))
+    monkeypatch.setattr(thumbnails, "submit", lambda file_path: None)
+
+
+def _upload(content, record_id):
+    file = io.BytesIO(content)
+    file.name = "photo.jpg"
+    return database.save_single_image(file, "collection", record_id)
+
+
+def _ref_count(file_path):
+    session = database.Session()
+    try:
+        return session.query(ImageBlob.ref_count).filter(ImageBlob.file_path == file_path).scalar()
+    finally:
+        session.close()
+
+
+def test_identical_uploads_share_one_file():
+    first = _upload(b"same photo", 1)
+    second = _upload(b"same photo", 2)
+
+    paths = {image.file_path for record_id in (1, 2) for image in database.get_images("collection", record_id)}
+    assert first != second
+    assert len(paths) == 1
+    path = paths.pop()
+    assert blob_store.is_blob(path)
+    assert _ref_count(path) == 2
+
+    assert database.delete_image(first)
+    assert os.path.exists(path)
+    assert _ref_count(path) == 1
+
+    assert database.delete_image(second)
+    assert not os.path.exists(path)
+    assert _ref_count(path) is None
+
+
+def test_file_kept_when_delete_is_rolled_back(monkeypatch):
+    image_id = _upload(b"photo kept on failed delete", 3)
+    path = database.get_images("collection", 3)[0].file_path
+
+    def failing_commit(session):
+        raise RuntimeError("磁盘已满")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(database.Session.class_, "commit", failing_commit)
+        assert database.delete_image(image_id) is False
+
+    assert os.path.exists(path)
+    assert _ref_count(path) == 1
+    assert [image.id for image in database.get_images("collection", 3)] == [image_id]
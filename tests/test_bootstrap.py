@@ -0,0 +1,49 @@
+import json
+import os
+
+import pytest
+
+import bootstrap
+
+
+@pytest.fixture
+def settings_file(tmp_dir, monkeypatch):
+    path = os.path.join(tmp_dir, "settings.json")
+    monkeypatch.setattr(bootstrap, "SETTINGS_FILE", path)
+    monkeypatch.setattr(bootstrap, "_settings", None)
+    yield path
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def test_bootstrap_runs_steps_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(bootstrap, "STEPS", [("第一步", lambda: calls.append(1)), ("第二步", lambda: calls.append(2))])
+    bootstrap.bootstrap.clear()
+    try:
+        first = bootstrap.bootstrap()
+        second = bootstrap.bootstrap()
+    finally:
+        bootstrap.bootstrap.clear()
+
+    assert calls == [1, 2]
+    assert [name for name, _ in first] == ["第一步", "第二步"]
+    assert second == first
+
+
+def test_settings_are_read_once_until_saved(settings_file):
+    settings = bootstrap.get_settings()
+    assert settings == bootstrap.DEFAULT_SETTINGS
+
+    # 其他途径修改的设置文件在保存设置之前不会重新读取
+    with open(settings_file, "w", encoding="utf-8") as f:
+        json.dump({"items_per_page": 50}, f)
+    assert bootstrap.get_settings()["items_per_page"] == 10
+
+    settings["items_per_page"] = 20
+    assert bootstrap.save_settings(settings)
+    assert bootstrap.get_settings()["items_per_page"] == 20
+
+    # 返回的是副本，修改它不影响缓存的设置
+    bootstrap.get_settings()["items_per_page"] = 99
+    assert bootstrap.get_settings()["items_per_page"] == 20
@@ -0,0 +1,46 @@
+import datetime
+import sqlite3
+
+import change_tracking
+import database
+from db_connection import DB_PATH
+
+
+def test_writes_bump_table_version():
+    version = change_tracking.current_version()
+
+    database.add_collection(datetime.date(2024, 5, 1), "版本测试", None, None, None, "测试")
+
+    changed = change_tracking.changed_since(version)
+    assert "collections" in changed
+    assert changed["collections"] > version
+    assert "cultivation_records" not in changed
+
+
+def test_poll_detects_writes_from_other_connections():
+    change_tracking.poll_changes()
+
+    # 模拟另一个进程：不经过应用的写函数直接写库
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        conn.execute("INSERT INTO collections (collection_id, location) VALUES ('COL-EXTERNAL-1', '外部写入')")
+        conn.commit()
+    finally:
+        conn.close()
+
+    assert "collections" in change_tracking.poll_changes()
+    assert change_tracking.poll_changes() == []
+
+
+def test_cached_reads_see_writes_from_other_connections():
+    assert database.search_options("collection", "COL-EXTERNAL-2") == []
+
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        conn.execute("INSERT INTO collections (collection_id, location) VALUES ('COL-EXTERNAL-2', '外部写入')")
+        conn.commit()
+    finally:
+        conn.close()
+
+    assert [option.collection_id for option in database.search_options("collection", "COL-EXTERNAL-2")] == [
+        "COL-EXTERNAL-2"]
@@ -0,0 +1,67 @@
+import datetime
+
+import pandas as pd
+
+import collection_import
+import database
+
+
+def _frame(rows):
+    return pd.DataFrame(rows, columns=["采集日期", "采集地点", "采集人", "纬度", "种子数量", "已鉴定"], dtype=str)
+
+
+def _mapping(frame):
+    return collection_import.suggest_mapping(frame.columns)
+
+
+def test_prepare_rows_reports_errors_by_sheet_row():
+    frame = _frame([
+        ["2024-05-01", "导入校验山", "张三", "30.5", "120", "是"],
+        ["2024-05-02", "导入校验山", "", "30,5", "12.5", "否"],
+        ["不是日期", "导入校验山", "李四", "95", "1,200", "也许"],
+    ])
+
+    records, errors = collection_import.prepare_rows(frame, _mapping(frame))
+
+    assert len(records) == 1
+    assert records[0]["latitude"] == 30.5 and records[0]["seed_quantity"] == 120
+    assert records[0]["identified"] is True
+    # 行号含表头，与表格软件中看到的一致；含逗号的数值不会被去掉逗号后导入
+    assert {(error.row, error.column) for error in errors} == {
+        (3, "采集人"), (3, "纬度"), (3, "种子数量"),
+        (4, "采集日期"), (4, "纬度"), (4, "种子数量"), (4, "已鉴定"),
+    }
+    assert [error.row for error in errors] == sorted(error.row for error in errors)
+
+
+def test_import_writes_rows_and_keeps_indexes_in_sync():
+    frame = _frame([["2024-06-01", f"批量导入谷{i}", "王五", "25", "10", "否"] for i in range(30)]
+                   + [["2024-06-01", "批量导入谷错误", "王五", "abc", "10", "否"]])
+
+    result = collection_import.import_collections(frame, _mapping(frame))
+
+    assert len(result.imported) == 30 == len(set(result.imported))
+    assert all(code.startswith("COL-20240601-") for code in result.imported)
+    assert [error.row for error in result.errors] == [32]
+
+    # 批量写入后全文检索、编号登记表和缓存都能看到新记录，导入期间删除的触发器已恢复
+    found = database.search_options('collection', "批量导入谷1")
+    assert {row.location for row in found} >= {"批量导入谷1", "批量导入谷10"}
+    entity_type, record = database.resolve_identifier(result.imported[0])
+    assert entity_type == 'collection' and record.location == "批量导入谷0"
+
+    database.add_collection(datetime.date(2024, 6, 2), "批量导入谷之后", None, None, None, "王五")
+    assert [row.location for row in database.search_options('collection', "批量导入谷之后")] == ["批量导入谷之后"]
+
+
+def test_import_without_skip_invalid_writes_nothing_on_errors():
+    frame = _frame([
+        ["2024-07-01", "全部回退岭", "赵六", "20", "5", "否"],
+        ["2024-07-01", "全部回退岭", "赵六", "200", "5", "否"],
+    ])
+
+    result = collection_import.import_collections(frame, _mapping(frame), skip_invalid=False)
+
+    assert result.imported == []
+    assert [(error.row, error.column) for error in result.errors] == [(3, "纬度")]
+    assert database.search_options('collection', "全部回退岭") == []
@@ -0,0 +1,56 @@
+import datetime
+
+import cultivation_stats
+import database
+
+LOCATION = "统计测试苗圃"
+
+
+def _plant(start_date, family=None):
+    return database.add_cultivation_record(start_date=start_date, location=LOCATION, quantity=1,
+                                           origin="其他来源", family=family)
+
+
+def _location_row(cutoff):
+    frame = cultivation_stats.survival_by_location(cutoff, min_records=1)
+    rows = frame[frame["栽培位置"] == LOCATION]
+    return None if rows.empty else rows.iloc[0]
+
+
+def test_cutoff_is_part_of_the_cached_result():
+    early = datetime.date(2020, 1, 10)
+    late = datetime.date(2020, 3, 10)
+    before = cultivation_stats.status_summary(datetime.date(2020, 2, 1))
+
+    plants = [_plant(early), _plant(early), _plant(late)]
+    database.update_cultivation_status(plants[0], "死亡", datetime.date(2020, 2, 1), "冻害")
+    database.update_cultivation_status(plants[1], "开花", datetime.date(2020, 4, 1))
+
+    summary = cultivation_stats.status_summary(datetime.date(2020, 2, 1)) - before
+    assert summary.to_dict() == {"total": 3, "alive": 2, "flowering": 1, "fruiting": 0, "dead": 1,
+                                 "established": 2}
+
+    # 只有截止日期变化，没有写入时同样得到新日期的结果
+    assert _location_row(datetime.date(2020, 2, 1))[["总数", "存活数"]].tolist() == [2, 1]
+    row = _location_row(datetime.date(2020, 4, 1))
+    assert row[["总数", "存活数"]].tolist() == [3, 2]
+    assert abs(row["存活率"] - 200 / 3) < 1e-9
+    assert _location_row(datetime.date(2019, 1, 1)) is None
+
+
+def test_established_cutoff():
+    assert cultivation_stats.established_cutoff(90, today=datetime.date(2024, 4, 1)) == datetime.date(2024, 1, 2)
+
+
+def test_taxon_counts_fall_back_to_collection_family():
+    code = database.add_collection(datetime.date(2024, 5, 1), LOCATION, None, None, None, "测试",
+                                   family="统计测试科甲")
+    collection_id = database.resolve_identifier(code)[1].id
+    batch_id = database.add_seed_batch(collection_id=collection_id, quantity=10, storage_location="测试柜")
+    # 栽培记录没有填写科时取采集记录的科
+    database.add_cultivation_record(seed_batch_id=batch_id, start_date=datetime.date(2024, 6, 1),
+                                    location=LOCATION, quantity=1)
+    _plant(datetime.date(2024, 6, 1), family="统计测试科甲")
+
+    counts = cultivation_stats.taxon_counts("family", limit=1000)
+    assert dict(zip(counts["名称"], counts["数量"])).get("统计测试科甲") == 2
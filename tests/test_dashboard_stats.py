@@ -0,0 +1,71 @@
+import datetime
+import sqlite3
+
+import pandas as pd
+
+import collection_import
+import dashboard_stats
+import database
+from db_connection import DB_PATH
+
+
+def _counters():
+    with database.engine.connect() as conn:
+        return dict(((section, key), n) for section, key, n in conn.exec_driver_sql(
+            f"SELECT section, key, n FROM {dashboard_stats.TABLE} WHERE n != 0"))
+
+
+def _assert_matches_rebuild():
+    """触发器增量维护的计数与按现有数据重新统计的结果一致"""
+    maintained = _counters()
+    database.rebuild_dashboard_stats()
+    assert _counters() == maintained
+
+
+def test_counters_follow_every_write_without_recomputing():
+    before = dashboard_stats.get_section("counts")
+
+    code = database.add_collection(datetime.date(2024, 8, 1), "统计山", None, None, None, "钱七",
+                                   family=" 统计测试科 ")
+    _, collection = database.resolve_identifier(code)
+    counts = dashboard_stats.get_section("counts")
+    assert counts["collections"] == before["collections"] + 1
+    assert counts["unidentified"] == before["unidentified"] + 1
+    assert _counters()[("family", "统计测试科")] == 1
+
+    database.update_collection_identification(collection.id, family="统计测试科二", species_latin="Rosa sp.")
+    counts = dashboard_stats.get_section("counts")
+    assert counts["unidentified"] == before["unidentified"]
+    assert ("family", "统计测试科") not in _counters()
+    assert _counters()[("family", "统计测试科二")] == 1
+    _assert_matches_rebuild()
+
+    # 其他进程的写入同样计入
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.execute("DELETE FROM collections WHERE id = ?", (collection.id,))
+    assert dashboard_stats.get_section("counts") == before
+    _assert_matches_rebuild()
+
+
+def test_rate_bins_follow_germination_events(seed_batch):
+    bins_before = dashboard_stats.get_section("germination_rate_bins")
+    record_id = database.add_germination_record(seed_batch, datetime.date(2024, 8, 2), "浸种", 10)
+    database.add_germination_event(record_id, datetime.date(2024, 8, 5), 2)
+    database.add_germination_event(record_id, datetime.date(2024, 8, 9), 4)
+
+    bins = dashboard_stats.get_section("germination_rate_bins")
+    assert [after - before for after, before in zip(bins, bins_before)] == [0, 0, 0, 0, 0, 0, 1, 0, 0, 0]
+    _assert_matches_rebuild()
+
+
+def test_bulk_import_is_counted():
+    before = dashboard_stats.get_section("counts")
+    frame = pd.DataFrame([["2024-09-01", "统计导入坡", "孙八", "统计导入科"]] * 5,
+                         columns=["采集日期", "采集地点", "采集人", "科"])
+
+    result = collection_import.import_collections(frame, collection_import.suggest_mapping(frame.columns))
+
+    assert len(result.imported) == 5
+    assert dashboard_stats.get_section("counts")["collections"] == before["collections"] + 5
+    assert _counters()[("family", "统计导入科")] == 5
+    _assert_matches_rebuild()
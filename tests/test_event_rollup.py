@@ -0,0 +1,53 @@
+import datetime
+import sqlite3
+
+import database
+from db_connection import DB_PATH
+
+
+def _rollup():
+    with database.engine.connect() as conn:
+        return sorted(conn.exec_driver_sql(
+            "SELECT month, event_type, location, count FROM cultivation_event_rollup WHERE count != 0").all())
+
+
+def _assert_matches_rebuild():
+    """写入时累加的汇总与按全部事件重建的结果一致"""
+    maintained = _rollup()
+    database.rebuild_cultivation_event_rollup()
+    assert _rollup() == maintained
+
+
+def test_rollup_counts_events_by_month_type_and_location(seed_batch):
+    record_id = database.add_cultivation_record(seed_batch_id=seed_batch, start_date=datetime.date(2024, 5, 1),
+                                                quantity=2, location="汇总温室甲")
+    database.add_cultivation_event(record_id, datetime.date(2024, 5, 3), "浇水")
+    database.add_cultivation_event(record_id, datetime.date(2024, 5, 20), "浇水")
+    database.add_cultivation_event(record_id, datetime.date(2024, 6, 1), "施肥")
+
+    rows = [row for row in _rollup() if row[2] == "汇总温室甲"]
+    assert rows == [("2024-05", "浇水", "汇总温室甲", 2), ("2024-06", "施肥", "汇总温室甲", 1)]
+    _assert_matches_rebuild()
+
+
+def test_rollup_follows_a_plant_that_moves(seed_batch):
+    moving = database.add_cultivation_record(seed_batch_id=seed_batch, start_date=datetime.date(2024, 7, 1),
+                                             quantity=1, location="汇总温室乙")
+    staying = database.add_cultivation_record(seed_batch_id=seed_batch, start_date=datetime.date(2024, 7, 1),
+                                              quantity=1, location="汇总温室乙")
+    for record_id in (moving, staying):
+        database.add_cultivation_event(record_id, datetime.date(2024, 7, 5), "修剪")
+
+    # 位置可能由其他进程修改
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.execute("UPDATE cultivation_records SET location = ? WHERE id = ?", ("汇总温室丙", moving))
+    database.add_cultivation_event(moving, datetime.date(2024, 7, 9), "修剪")
+
+    rows = [row for row in _rollup() if row[2] in ("汇总温室乙", "汇总温室丙")]
+    assert rows == [("2024-07", "修剪", "汇总温室丙", 2), ("2024-07", "修剪", "汇总温室乙", 1)]
+    _assert_matches_rebuild()
+
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.execute("UPDATE cultivation_records SET location = NULL WHERE id = ?", (staying,))
+    assert ("2024-07", "修剪", "汇总温室乙", 1) not in _rollup()
+    _assert_matches_rebuild()
@@ -0,0 +1,28 @@
+import datetime
+
+import dashboard_stats
+import database
+import germination_stats
+
+
+def _completed_record(seed_batch, used, germinated):
+    record_id = database.add_germination_record(seed_batch, datetime.date(2024, 3, 1), "冷层积", used)
+    database.add_germination_event(record_id, datetime.date(2024, 3, 8), germinated)
+    database.complete_germination_record(record_id)
+    return record_id
+
+
+def test_rate_histogram_drops_out_of_range_rates_like_the_dashboard(seed_batch):
+    histogram_before = germination_stats.rate_histogram()["数量"].tolist()
+    dashboard_before = dashboard_stats.get_section("germination_rate_bins")
+
+    _completed_record(seed_batch, 10, 5)
+    _completed_record(seed_batch, 10, 10)
+    # 累计发芽数大于使用数量时发芽率超过 100%，两个直方图都不计入
+    _completed_record(seed_batch, 10, 15)
+
+    histogram = [after - before for after, before in
+                 zip(germination_stats.rate_histogram()["数量"].tolist(), histogram_before)]
+    dashboard = [after - before for after, before in
+                 zip(dashboard_stats.get_section("germination_rate_bins"), dashboard_before)]
+    assert histogram == dashboard == [0, 0, 0, 0, 0, 1, 0, 0, 0, 1]
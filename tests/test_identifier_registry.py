@@ -0,0 +1,68 @@
+import datetime
+
+import database
+from models import Collection, CultivationRecord, GerminationRecord, SeedBatch
+
+
+def _code(model, record_id, column):
+    session = database.Session()
+    try:
+        return getattr(session.get(model, record_id), column)
+    finally:
+        session.close()
+
+
+def _id(model, column, code):
+    session = database.Session()
+    try:
+        return session.query(model.id).filter(getattr(model, column) == code).scalar()
+    finally:
+        session.close()
+
+
+def test_every_entity_type_resolves(seed_batch):
+    collection_code = database.add_collection(datetime.date(2024, 5, 1), "编号测试", None, None, None, "测试")
+    germination_id = database.add_germination_record(seed_batch, datetime.date(2024, 6, 1), "浸种", 10)
+    cultivation_id = database.add_cultivation_record(seed_batch_id=seed_batch, start_date=datetime.date(2024, 7, 1),
+                                                     location="温室", quantity=5)
+    records = [
+        ('collection', _id(Collection, 'collection_id', collection_code), collection_code),
+        ('seed_batch', seed_batch, _code(SeedBatch, seed_batch, 'batch_id')),
+        ('germination', germination_id, _code(GerminationRecord, germination_id, 'germination_id')),
+        ('cultivation', cultivation_id, _code(CultivationRecord, cultivation_id, 'cultivation_id')),
+    ]
+
+    for entity_type, record_id, code in records:
+        found_type, record = database.resolve_identifier(code)
+        assert (found_type, record.id) == (entity_type, record_id)
+
+
+def test_label_suffix_and_unknown_code(seed_batch):
+    code = _code(SeedBatch, seed_batch, 'batch_id')
+
+    found_type, record = database.resolve_identifier(f" {code} - 测试柜 ")
+    assert (found_type, record.id) == ('seed_batch', seed_batch)
+    assert database.resolve_identifier("SEED-19000101-NOPE00") is None
+    assert database.resolve_identifier("") is None
+
+
+def test_registry_follows_code_changes_and_deletes():
+    old_code = database.add_collection(datetime.date(2024, 5, 2), "改号测试", None, None, None, "测试")
+    collection_id = _id(Collection, 'collection_id', old_code)
+    session = database.Session()
+    try:
+        session.get(Collection, collection_id).collection_id = "COL-RELABELLED-1"
+        session.commit()
+    finally:
+        session.close()
+
+    assert database.resolve_identifier(old_code) is None
+    assert database.resolve_identifier("COL-RELABELLED-1")[1].id == collection_id
+
+    session = database.Session()
+    try:
+        session.delete(session.get(Collection, collection_id))
+        session.commit()
+    finally:
+        session.close()
+    assert database.resolve_identifier("COL-RELABELLED-1") is None
@@ -0,0 +1,58 @@
+import datetime
+
+import database
+
+
+def _walk(fetch, page_size):
+    """按游标依次取完所有页，返回 (各页记录, 每页的 total)"""
+    pages, totals, cursor = [], [], None
+    while True:
+        page = fetch(page_size, cursor)
+        pages.append(page.items)
+        totals.append(page.total)
+        if page.next_cursor is None:
+            return pages, totals
+        cursor = page.next_cursor
+
+
+def test_cursor_round_trip_visits_every_row_once():
+    collector = "分页测试"
+    dates = [datetime.date(2024, 1, 1 + i % 4) for i in range(11)] + [None, None]
+    for i, date in enumerate(dates):
+        database.add_collection(date or datetime.date(2024, 1, 1), f"分页{i}", None, None, None, collector)
+    # add_collection 总会写入日期，直接把两条改为空日期，检查 NULL 排在最后且不会丢失
+    session = database.Session()
+    try:
+        rows = (session.query(database.Collection).filter(database.Collection.collector == collector)
+                .order_by(database.Collection.id).all())
+        for row in rows[-2:]:
+            row.collection_date = None
+        session.commit()
+    finally:
+        session.close()
+    database.invalidate_all()
+
+    pages, totals = _walk(
+        lambda page_size, after: database.get_collections_page(page_size, after, collector=collector), 4)
+
+    ids = [row.id for page in pages for row in page]
+    assert len(ids) == len(set(ids)) == len(dates)
+    assert set(totals) == {len(dates)}
+    assert [len(page) for page in pages] == [4, 4, 4, 1]
+
+    keys = [(row.collection_date, row.id) for page in pages for row in page]
+    dated = [key for key in keys if key[0] is not None]
+    assert dated == sorted(dated, reverse=True)
+    assert all(key[0] is None for key in keys[len(dated):])
+
+
+def test_germination_page_carries_seed_batch_code(seed_batch):
+    for day in range(3):
+        database.add_germination_record(seed_batch, datetime.date(2024, 2, 1 + day), "浸种", 1)
+    batch_code = database.get_seed_batch_by_id(seed_batch).batch_id
+
+    pages, _ = _walk(lambda page_size, after: database.get_germination_records_page(page_size, after), 2)
+
+    rows = [row for page in pages for row in page if row.seed_batch_id == seed_batch]
+    assert len(rows) == 3
+    assert {row.seed_batch_code for row in rows} == {batch_code}
@@ -0,0 +1,60 @@
+import datetime
+
+import pandas as pd
+
+import database
+from query_cache import cached_read, invalidates
+
+
+def test_results_are_cached_until_table_is_written():
+    calls = []
+
+    @cached_read('cache_test_table')
+    def read(value):
+        calls.append(value)
+        return [value]
+
+    @invalidates('cache_test_table')
+    def write():
+        pass
+
+    assert read(1) == [1]
+    assert read(1) == [1]
+    assert calls == [1]
+
+    write()
+    read(1)
+    assert calls == [1, 1]
+
+
+def test_callers_get_copies_of_cached_values():
+    @cached_read('cache_test_copies')
+    def read():
+        return [{"a": 1}], pd.DataFrame({"n": [1, 2]})
+
+    rows, frame = read()
+    rows.append({"a": 2})
+    rows[0]["a"] = 99
+    frame["n"] = 0
+
+    rows, frame = read()
+    assert rows == [{"a": 1}]
+    assert frame["n"].tolist() == [1, 2]
+
+
+def test_orm_objects_are_copied():
+    collection_id = database.add_collection(datetime.date(2024, 5, 1), "缓存测试", None, None, None, "测试")
+    record_id = database.search_options("collection", collection_id)[0].id
+
+    collection = database.get_collection_by_id(record_id)
+    collection.location = "被调用方修改"
+
+    assert database.get_collection_by_id(record_id).location == "缓存测试"
+
+
+def test_writer_sees_own_write_on_next_read():
+    assert database.search_options("collection", "写入后可见") == []
+
+    database.add_collection(datetime.date(2024, 5, 2), "写入后可见", None, None, None, "测试")
+
+    assert [option.location for option in database.search_options("collection", "写入后可见")] == ["写入后可见"]
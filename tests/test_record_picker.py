@@ -0,0 +1,38 @@
+import datetime
+
+import database
+
+
+def _cultivation(seed_batch, location, family=None):
+    return database.add_cultivation_record(seed_batch_id=seed_batch, start_date=datetime.date(2024, 4, 1),
+                                           quantity=1, location=location, family=family)
+
+
+def test_picker_returns_at_most_limit_rows_matching_the_filters(seed_batch):
+    for i in range(database.PICKER_LIMIT + 5):
+        _cultivation(seed_batch, "选择器温室", "Rosaceae" if i % 2 else "Pinaceae")
+    _cultivation(seed_batch, "选择器苗圃", "Rosaceae")
+
+    options = database.search_options('cultivation', None, status="活", location="选择器温室")
+    assert len(options) == database.PICKER_LIMIT
+    assert {option.location for option in options} == {"选择器温室"}
+
+    options = database.search_options('cultivation', None, limit=50, status="活",
+                                      location="选择器温室", family="Rosaceae")
+    assert len(options) == (database.PICKER_LIMIT + 5) // 2
+    assert {option.family for option in options} == {"Rosaceae"}
+
+    assert database.get_cultivation_values("family", status="活", location="选择器苗圃") == ["Rosaceae"]
+    assert {"选择器温室", "选择器苗圃"} <= set(database.get_cultivation_values("location", status="活"))
+
+
+def test_picker_prefix_match_and_available_only(seed_batch):
+    batch_code = database.get_seed_batch_by_id(seed_batch).batch_id
+    # 编号前缀匹配不区分大小写
+    found = database.search_options('seed_batch', batch_code.lower(), available_only=True)
+    assert [option.id for option in found] == [seed_batch]
+    assert found[0].available_quantity == 100
+
+    assert database.add_germination_record(seed_batch, datetime.date(2024, 4, 2), "浸种", 100)
+    assert database.search_options('seed_batch', batch_code, available_only=True) == []
+    assert [option.id for option in database.search_options('seed_batch', batch_code)] == [seed_batch]
@@ -0,0 +1,73 @@
+import datetime
+import sqlite3
+
+from sqlalchemy import text
+
+import database
+import search_index
+from db_connection import DB_PATH
+
+
+def _collection(location, **fields):
+    code = database.add_collection(datetime.date(2024, 10, 1), location, None, None, None, "周九", **fields)
+    return database.resolve_identifier(code)[1].id
+
+
+def _found(term, entity_types=('collection',)):
+    return {record.id for _, record in database.search_records(term, entity_types)}
+
+
+def test_substring_search_across_entities(seed_batch):
+    collection_id = _collection("检索测试西双版纳热带植物园", species_chinese="望天树", habitat="季节性雨林沟谷")
+    cultivation_id = database.add_cultivation_record(seed_batch_id=seed_batch, start_date=datetime.date(2024, 10, 2),
+                                                     quantity=1, location="检索测试热带温室")
+
+    assert collection_id in _found("版纳热带")
+    assert collection_id in _found("雨林沟谷")
+    results = database.search_records("检索测试", ['collection', 'cultivation'])
+    assert {('collection', collection_id), ('cultivation', cultivation_id)} <= {
+        (entity_type, record.id) for entity_type, record in results}
+
+
+def test_short_terms_use_name_prefixes():
+    collection_id = _collection("短词测试苑", species_chinese="鹅掌楸", species_latin="Liriodendron chinense",
+                                family="Magnoliaceae", genus_chinese="鹅掌楸属")
+
+    # 少于 3 个字符的词按名称（及其中各词）前缀匹配，不区分大小写
+    assert collection_id in _found("鹅掌")
+    assert collection_id in _found("li")
+    assert collection_id in _found("CH")
+    assert collection_id in _found("鹅掌 Liriodendron")
+    assert collection_id not in _found("掌楸")
+    assert collection_id in {c.id for c in database.search_collections_by_taxonomy(family="Ma")}
+    assert collection_id not in {c.id for c in database.search_collections_by_taxonomy(genus="Ma")}
+
+    # 名称修改和删除后前缀表同步更新
+    database.update_collection_identification(collection_id, species_chinese="北美鹅掌楸")
+    assert collection_id in _found("北美")
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.execute("DELETE FROM collections WHERE id = ?", (collection_id,))
+    with database.engine.connect() as conn:
+        assert conn.exec_driver_sql(
+            f"SELECT COUNT(*) FROM {search_index.NAME_TABLE} WHERE entry = ?",
+            (collection_id * search_index.ENTITY_SLOTS + 1,)).scalar() == 0
+
+
+def test_short_terms_do_not_scan():
+    sql, params = search_index.build_search_sql([("鹅掌", None)], 'collection')
+    with database.engine.connect() as conn:
+        plan = " ".join(row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params))
+    assert f"SEARCH {search_index.NAME_TABLE} USING PRIMARY KEY" in plan
+    assert "SCAN" not in plan.replace("SCAN (subquery", "")
+
+
+def test_existing_index_gains_name_prefixes():
+    collection_id = _collection("升级测试园", species_chinese="珙桐")
+    # 模拟只有检索索引、没有名称前缀表的旧数据库
+    with database.engine.begin() as conn:
+        conn.exec_driver_sql(f"DROP TABLE {search_index.NAME_TABLE}")
+    database.install_search_index()
+
+    assert collection_id in _found("珙桐")
+    _collection("升级之后园", species_chinese="珙桐花")
+    assert len(_found("珙桐")) >= 2
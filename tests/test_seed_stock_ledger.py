@@ -0,0 +1,55 @@
+import datetime
+
+import database
+from models import GerminationRecord
+
+
+def _available(batch_id):
+    return database.get_seed_batch_inventory(batch_id).available_quantity
+
+
+def test_germination_draws_from_ledger(seed_batch):
+    record_id = database.add_germination_record(seed_batch, datetime.date(2024, 2, 1), "浸种", 30)
+
+    assert record_id is not None
+    assert _available(seed_batch) == 70
+    assert database.verify_seed_stock_ledger() == []
+
+
+def test_overdraw_is_rejected_without_writing_record(seed_batch):
+    database.add_germination_record(seed_batch, datetime.date(2024, 2, 1), "浸种", 80)
+
+    assert database.add_germination_record(seed_batch, datetime.date(2024, 2, 2), "浸种", 21) is None
+    assert database.add_cultivation_record(seed_batch_id=seed_batch, start_date=datetime.date(2024, 3, 1),
+                                           location="温室", quantity=21) is None
+
+    assert _available(seed_batch) == 20
+    session = database.Session()
+    try:
+        assert session.query(GerminationRecord).filter(GerminationRecord.seed_batch_id == seed_batch).count() == 1
+    finally:
+        session.close()
+
+
+def test_cultivation_can_use_remaining_stock(seed_batch):
+    database.add_germination_record(seed_batch, datetime.date(2024, 2, 1), "浸种", 60)
+
+    assert database.add_cultivation_record(seed_batch_id=seed_batch, start_date=datetime.date(2024, 3, 1),
+                                           location="温室", quantity=40) is not None
+    assert _available(seed_batch) == 0
+    assert seed_batch not in {batch.id for batch in database.get_seed_batches_for_germination()}
+    assert database.verify_seed_stock_ledger() == []
+
+
+def test_quantity_cannot_drop_below_reserved(seed_batch):
+    database.add_germination_record(seed_batch, datetime.date(2024, 2, 1), "浸种", 30)
+    assert database.reserve_seed_stock(seed_batch, 50)
+
+    assert database.update_seed_batch(seed_batch, quantity=79) is False
+    assert database.get_seed_batch_by_id(seed_batch).quantity == 100
+    assert _available(seed_batch) == 20
+
+    assert database.update_seed_batch(seed_batch, quantity=80) is True
+    assert database.get_seed_batch_by_id(seed_batch).quantity == 80
+    assert _available(seed_batch) == 0
+    assert database.verify_seed_stock_ledger() == []
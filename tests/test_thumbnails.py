@@ -0,0 +1,42 @@
+import os
+
+from PIL import Image
+
+import thumbnails
+
+
+def _write_image(directory, name):
+    path = os.path.join(directory, name)
+    Image.new("RGB", (1600, 900), "green").save(path, "JPEG")
+    return path
+
+
+def test_display_path_uses_generated_thumbnail(tmp_dir):
+    path = _write_image(tmp_dir, "thumb_ok.jpg")
+
+    assert thumbnails.display_path(path, 300) == path
+    thumbnails.submit(path).result()
+
+    assert thumbnails.display_path(path, 300) == thumbnails.derivative_path(path, "thumb")
+    assert thumbnails.display_path(path, 800) == thumbnails.derivative_path(path, "medium")
+    assert thumbnails.display_path(path, 2000) == path
+
+
+def test_corrupt_image_is_not_resubmitted(tmp_dir, monkeypatch):
+    path = os.path.join(tmp_dir, "thumb_corrupt.jpg")
+    with open(path, "wb") as f:
+        f.write(b"not an image")
+
+    assert thumbnails.display_path(path, 300) == path
+    thumbnails.submit(path).result()
+
+    submitted = []
+    monkeypatch.setattr(thumbnails, "submit", submitted.append)
+    assert thumbnails.display_path(path, 300) == path
+    assert submitted == []
+
+    # 原图被替换后重新尝试
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    assert thumbnails.display_path(path, 300) == path
+    assert submitted == [path]
@@ -0,0 +1,146 @@
+"""
+图片缩略图
+
+原图旁边的 thumb/、medium/ 子目录中保存按长边缩小的 JPEG 副本。上传时在后台线程池中生成，
+已有图片在第一次显示时提交到同一个线程池生成（生成完成前显示原图）；页面显示时选用不小于显示宽度的最小副本，不必每次解码原图。
+无法生成缩略图的图片（文件损坏、格式不支持等）会被记住，在原图被修改之前直接显示原图，不再重复提交。
+"""
+
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# 缩略图尺寸（长边像素），从小到大
+DERIVATIVE_SIZES = {
+    "thumb": 400,
+    "medium": 1200,
+}
+
+JPEG_QUALITY = 85
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="thumbnails")
+
+# 正在后台生成缩略图的原图路径 {原图路径: Future}，同一张图片只提交一次
+_pending = {}
+_pending_lock = threading.RLock()
+
+# 生成缩略图失败的原图 {原图路径: 提交时的修改时间}，原图修改后会重新尝试
+_failed = {}
+
+
+def derivative_path(file_path, size):
+    """缩略图文件路径：原图目录/尺寸名/原文件名.jpg"""
+    directory, filename = os.path.split(file_path)
+    return os.path.join(directory, size, os.path.splitext(filename)[0] + ".jpg")
+
+
+def generate_derivatives(file_path):
+    """为一张图片生成全部尺寸的缩略图，返回 {尺寸名: 路径}；原图无法读取时返回空字典"""
+    # 只在生成缩略图时才需要 Pillow
+    from PIL import Image, ImageOps
+
+    try:
+        with Image.open(file_path) as img:
+            # JPEG 按最大缩略图尺寸降采样解码，大幅减少解码时间和内存
+            largest = max(DERIVATIVE_SIZES.values())
+            img.draft("RGB", (largest, largest))
+            img = ImageOps.exif_transpose(img).convert("RGB")
+
+            paths = {}
+            for size, max_edge in sorted(DERIVATIVE_SIZES.items(), key=lambda item: -item[1]):
+                img.thumbnail((max_edge, max_edge))
+                path = derivative_path(file_path, size)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+
+                # 先写临时文件再替换，避免并发显示时读到写了一半的文件
+                tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+                img.save(tmp_path, "JPEG", quality=JPEG_QUALITY, optimize=True)
+                os.replace(tmp_path, path)
+                paths[size] = path
+            return paths
+    except Exception as e:
+        print(f"生成缩略图失败 {file_path}: {e}")
+        return {}
+
+
+def submit(file_path):
+    """在后台线程池中生成缩略图；同一张图片已在生成时返回已有的任务"""
+    with _pending_lock:
+        future = _pending.get(file_path)
+        if future is None:
+            future = _executor.submit(_generate, file_path, _mtime(file_path))
+            _pending[file_path] = future
+            future.add_done_callback(lambda _: _discard_pending(file_path))
+        return future
+
+
+def _generate(file_path, mtime):
+    """后台任务：生成缩略图并记录是否失败"""
+    paths = generate_derivatives(file_path)
+    with _pending_lock:
+        if paths:
+            _failed.pop(file_path, None)
+        else:
+            _failed[file_path] = mtime
+    return paths
+
+
+def _discard_pending(file_path):
+    with _pending_lock:
+        _pending.pop(file_path, None)
+
+
+def _mtime(file_path):
+    try:
+        return os.path.getmtime(file_path)
+    except OSError:
+        return None
+
+
+def _has_failed(file_path):
+    """该图片上次生成缩略图失败且之后没有修改过"""
+    with _pending_lock:
+        return file_path in _failed and _failed[file_path] == _mtime(file_path)
+
+
+def iter_missing_derivatives(file_paths):
+    """逐张为缺少缩略图的图片生成缩略图，依次返回 (原图路径, {尺寸名: 路径})"""
+    for file_path in file_paths:
+        if not file_path or not os.path.exists(file_path):
+            continue
+        if all(os.path.exists(derivative_path(file_path, size)) for size in DERIVATIVE_SIZES):
+            continue
+        yield file_path, generate_derivatives(file_path)
+
+
+def display_path(file_path, width=None):
+    """
+    返回适合按指定宽度显示的图片路径
+
+    选用长边不小于显示宽度的最小缩略图；未指定宽度时使用最大的缩略图。缩略图不存在时提交到后台线程池生成，
+    这次先返回原图，不在页面运行中解码原图；显示宽度超过所有缩略图尺寸、或该图片无法生成缩略图时也返回原图
+    """
+    if not file_path or not os.path.exists(file_path):
+        return file_path
+    if width is None:
+        width = max(DERIVATIVE_SIZES.values())
+
+    for size, max_edge in sorted(DERIVATIVE_SIZES.items(), key=lambda item: item[1]):
+        if width > max_edge:
+            continue
+        path = derivative_path(file_path, size)
+        if os.path.exists(path):
+            return path
+        if not _has_failed(file_path):
+            submit(file_path)
+        return file_path
+    return file_path
+
+
+def remove_derivatives(file_path):
+    """删除图片的全部缩略图"""
+    for size in DERIVATIVE_SIZES:
+        path = derivative_path(file_path, size)
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,45 @@
+"""
+页面模块
+
+每个页面一个模块，第一次打开页面时才导入，页面用到的 matplotlib、plotly、二维码等库随页面模块一起加载；
+只打开首页时不必导入其他页面的代码和依赖。各模块首次导入的耗时记录在 import_times 中，在系统设置页面查看。
+"""
+
+import importlib
+import sys
+import time
+
+# 页面名称: (模块名, 显示函数名)
+PAGES = {
+    "首页": ("home", "show_home"),
+    "采集管理": ("collection", "show_collection_management"),
+    "种子管理": ("seed", "show_seed_management"),
+    "发芽实验": ("germination", "show_germination_management"),
+    "栽培管理": ("cultivation", "show_cultivation_management"),
+    "数据查询": ("query", "show_data_query"),
+    "图片管理": ("images", "show_image_management"),
+    "标签生成": ("labels", "show_label_generator"),
+    "备份与恢复": ("backup", "show_backup_restore"),
+    "系统设置": ("settings", "show_settings"),
+    "扫码查询": ("scan", "show_scan_lookup"),
+}
+
+# 各模块首次导入的耗时 {模块: 秒}，按导入先后排列；导入页面模块时一并导入的其他页面模块计入该页面
+import_times = {}
+
+
+def record_import_time(name, seconds):
+    """记录模块的导入耗时，只保留第一次（之后的导入直接取自 sys.modules，耗时可以忽略）"""
+    import_times.setdefault(name, seconds)
+
+
+def load(page):
+    """返回页面的显示函数，页面模块还没有导入时先导入并记录耗时"""
+    module_name, function_name = PAGES[page]
+    full_name = f"{__name__}.{module_name}"
+    module = sys.modules.get(full_name)
+    if module is None:
+        start = time.perf_counter()
+        module = importlib.import_module(full_name)
+        record_import_time(full_name, time.perf_counter() - start)
+    return getattr(module, function_name)
@@ -0,0 +1,92 @@
+"""
+备份与恢复页面
+"""
+
+import streamlit as st
+import os
+from database import invalidate_all
+from backup_utils import start_backup, restore_backup_file
+from bootstrap import bootstrap, get_settings
+
+# 备份进行中刷新进度的间隔（秒）
+BACKUP_POLL_INTERVAL = 0.5
+
+
+def show_backup_restore():
+    st.subheader("备份与恢复")
+
+    tab1, tab2 = st.tabs(["备份数据", "恢复数据"])
+
+    with tab1:
+        st.subheader("备份数据")
+
+        st.write("点击下面的按钮创建数据库备份。备份文件将包含所有数据但不包含图片文件。")
+
+        if st.button("创建备份"):
+            # 在线备份在后台线程中分步进行，不影响其他用户读写
+            settings = get_settings()
+            st.session_state.backup_job = start_backup(settings.get("max_backups", 10))
+
+        # 显示备份进度或结果
+        job = st.session_state.get("backup_job")
+        if job is not None:
+            if job.done:
+                show_backup_result(job)
+            else:
+                show_backup_progress()
+
+
+# 进度区域每隔 BACKUP_POLL_INTERVAL 秒单独重新运行，页面其他部分不受影响
+@st.fragment(run_every=BACKUP_POLL_INTERVAL)
+def show_backup_progress():
+    """画出备份任务的当前进度，不在脚本中等待备份结束；备份结束后重新运行一次整个页面显示结果"""
+    job = st.session_state.get("backup_job")
+    if job is None:
+        return
+    if job.done:
+        st.rerun()
+    st.progress(job.progress,
+                text=f"{job.status}: {job.total_pages - job.remaining_pages}/{job.total_pages} 页")
+
+
+def show_backup_result(job):
+    """显示备份结果和下载按钮"""
+    if job.succeeded:
+        st.progress(1.0, text="备份完成，完整性检查通过")
+        st.success("备份创建成功!")
+
+        # 提供下载链接
+        with open(job.backup_path, "rb") as file:
+            st.download_button(
+                label="下载备份文件",
+                data=file,
+                file_name=os.path.basename(job.backup_path),
+                mime="application/octet-stream"
+            )
+    else:
+        st.error(f"备份创建失败: {job.error}")
+
+
+def restore_backup(uploaded_file):
+    """恢复数据库备份"""
+    backup_file = "temp_backup.db"
+    try:
+        # 保存上传的文件
+        with open(backup_file, "wb") as f:
+            f.write(uploaded_file.getbuffer())
+
+        # 校验上传的备份，为当前数据库做安全备份后在线写入
+        restore_backup_file(backup_file)
+
+        # 数据库整体被替换，缓存的查询结果全部作废；下次运行时重新检查数据库结构
+        invalidate_all()
+        bootstrap.clear()
+
+        return True
+    except Exception as e:
+        print(f"恢复备份失败: {str(e)}")
+        return False
+    finally:
+        # 删除临时文件
+        if os.path.exists(backup_file):
+            os.remove(backup_file)
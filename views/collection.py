@@ -0,0 +1,768 @@
+"""
+野外采集管理页面
+"""
+
+import streamlit as st
+import pandas as pd
+import datetime
+import os
+from database import (
+    add_collection, update_collection_identification, save_image, get_images, get_collection_by_id,
+    get_seed_batches_by_collection, update_collection, get_collections_page,
+    collection_export_query, get_all_collectors, get_all_families
+)
+from dashboard_stats import get_section
+from collection_import import (
+    IMPORT_FIELDS, REQUIRED_FIELDS, read_table, suggest_mapping, prepare_rows, import_collections, error_report
+)
+from export_utils import export_query, EXPORT_FORMATS
+from views.common import show_image, paged_records, record_picker, section_tabs, settings_export_format
+
+
+def identify_collection(collection_id):
+    """
+    设置会话状态以鉴定指定的采集记录
+    """
+    st.session_state['identify_collection_id'] = collection_id
+    st.session_state['active_tab'] = 3  # 假设鉴定采集记录是第4个选项卡(索引3)
+    st.rerun()  # 重新运行应用以更新UI
+
+
+def show_collection_management():
+    st.subheader("野外采集管理")
+
+    # 创建标签页
+    tab_names = ["添加采集记录", "查看采集记录", "编辑采集记录", "植物鉴定", "批量导入"]
+    current_tab = section_tabs("collection", tab_names)
+
+    # 添加采集记录标签页
+    if current_tab == 0:
+        st.subheader("添加采集记录")
+
+        # 基本信息部分 - 改为三列布局
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            collection_date = st.date_input("采集日期", datetime.datetime.now(), key="add_collection_date")
+            latitude = st.number_input("纬度", format="%.6f", step=0.000001, key="add_latitude")
+            country = st.text_input("国家（可选）", key="add_country")
+        with col2:
+            location = st.text_input("采集地点", key="add_location")
+            longitude = st.number_input("经度", format="%.6f", step=0.000001, key="add_longitude")
+            terrain = st.text_input("地形（可选）", key="add_terrain")
+        with col3:
+            collector = st.text_input("采集人", key="add_collector")
+            altitude = st.number_input("海拔(米)", min_value=0.0, step=0.1, key="add_altitude")
+            land_use = st.text_input("土地利用（可选）", key="add_land_use")
+        # 编号和生境部分
+        col1, col2 = st.columns(2)
+        with col1:
+            original_id = st.text_input("原始编号（可选）", key="add_original_id", help="如果有原始的采集编号，请在此填写")
+            specimen_number = st.text_input("标本号（可选）", key="add_specimen_number")
+        with col2:
+            habitat = st.text_input("生境描述", key="add_habitat")
+        # 土壤信息部分
+        st.markdown("### 土壤信息（可选）")
+        col1, col2 = st.columns(2)
+        with col1:
+            soil_parent_material = st.text_input("土壤母质", key="add_soil_parent_material")
+        with col2:
+            soil_texture = st.text_input("土壤质地", key="add_soil_texture")
+        # 种子信息部分
+        st.markdown("### 种子信息（可选）")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            seed_harvest_period = st.text_input("收获种子时期", key="add_seed_harvest_period")
+            seed_quantity = st.text_input("种子数量", key="add_seed_quantity")
+        with col2:
+            collection_part = st.text_input("采集部位", key="add_collection_part")
+            seed_condition = st.text_input("种子状况", key="add_seed_condition")
+        with col3:
+            fruit_size = st.text_input("果实大小", key="add_fruit_size")
+            fruit_color = st.text_input("果实颜色", key="add_fruit_color")
+        # 备注
+        notes = st.text_area("备注", key="add_notes")
+        # 植物信息部分 - 改为三列布局
+        st.markdown("### 植物信息（可选）")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            species_chinese = st.text_input("中文种名", key="add_species_chinese")
+            species_latin = st.text_input("拉丁学名 (Latin name)", key="add_species_latin")
+
+        with col2:
+            family_chinese = st.text_input("科中文名", key="add_family_chinese")
+            family = st.text_input("科", key="add_family")
+        with col3:
+            genus_chinese = st.text_input("属中文名", key="add_genus_chinese")
+            genus = st.text_input("属", key="add_genus")
+            # 判断是否已鉴定
+            identified = False
+            if species_latin:
+                identified = st.checkbox("已鉴定", value=True, key="add_identified")
+                if identified:
+                    identified_by = st.text_input("鉴定人", key="add_identified_by")
+
+        if st.button("添加采集记录", key="add_collection_button"):
+            if location and collector:
+                # 添加采集记录
+                collection_id = add_collection(
+                    collection_date=collection_date,
+                    location=location,
+                    latitude=latitude,
+                    longitude=longitude,
+                    altitude=altitude,
+                    collector=collector,
+                    notes=notes,
+                    habitat=habitat,
+                    species_latin=species_latin,
+                    species_chinese=species_chinese,
+                    family=family,
+                    family_chinese=family_chinese,
+                    genus=genus,
+                    genus_chinese=genus_chinese,
+                    identified=identified,
+                    original_id=original_id,
+                    # 添加新字段
+                    country=country,
+                    terrain=terrain,
+                    land_use=land_use,
+                    soil_parent_material=soil_parent_material,
+                    soil_texture=soil_texture,
+                    seed_harvest_period=seed_harvest_period,
+                    collection_part=collection_part,
+                    seed_quantity=seed_quantity,
+                    seed_condition=seed_condition,
+                    fruit_size=fruit_size,
+                    fruit_color=fruit_color,
+                    specimen_number=specimen_number
+                )
+                if collection_id:
+                    st.success(f"采集记录添加成功！采集编号: {collection_id}")
+                    # 在添加成功后清空表单
+                    st.rerun()
+                else:
+                    st.error("添加采集记录失败")
+            else:
+                st.warning("请至少填写采集地点和采集人")
+
+        # 图片上传部分
+        st.markdown("### 上传采集图片")
+        st.write("采集记录创建后，可在'查看采集记录'标签页中上传图片")
+
+    # 查看采集记录标签页
+    elif current_tab == 1:
+        st.subheader("查看采集记录")
+
+        # 添加搜索和筛选功能
+        col1, col2 = st.columns(2)
+        with col1:
+            search_term = st.text_input("搜索(采集编号/地点/采集人)", key="search_collection")
+        with col2:
+            identification_status = st.selectbox("鉴定状态", ["全部", "已鉴定", "未鉴定"], key="filter_identification")
+
+        with st.expander("更多筛选条件"):
+            col1, col2 = st.columns(2)
+            with col1:
+                filter_start_date = st.date_input("采集日期从", value=None, key="filter_collection_start")
+                filter_collector = st.selectbox("采集人", ["全部"] + get_all_collectors(), key="filter_collector")
+            with col2:
+                filter_end_date = st.date_input("采集日期至", value=None, key="filter_collection_end")
+                filter_family = st.selectbox("科", ["全部"] + get_all_families(), key="filter_collection_family")
+
+        # 所有筛选条件都在数据库中执行，每次只读取当前页
+        collection_filter = {
+            "search_term": search_term or None,
+            "identified": {"已鉴定": True, "未鉴定": False}.get(identification_status),
+            "start_date": filter_start_date,
+            "end_date": filter_end_date,
+            "collector": None if filter_collector == "全部" else filter_collector,
+            "family": None if filter_family == "全部" else filter_family,
+        }
+        page = paged_records(
+            "collection_list",
+            lambda page_size, after: get_collections_page(page_size, after, **collection_filter),
+            tuple(collection_filter.values())
+        )
+        collections = page.items
+
+        if collections:
+            # 创建表格数据
+            collection_data = []
+            for collection in collections:
+                collection_data.append({
+                    "采集编号": collection.collection_id,
+                    "采集人": collection.collector,
+                    "采集日期": collection.collection_date,
+                    "地点": collection.location,
+                    "Species": collection.species_latin or '',
+                    "鉴定状态": "已鉴定" if collection.identified else "未鉴定",
+                    "id": collection.id  # 隐藏ID列
+                })
+
+            # 创建DataFrame
+            df = pd.DataFrame(collection_data)
+
+            # 显示基本表格
+            st.dataframe(df.drop(columns=["id"]), use_container_width=True)
+
+            # 导出全部筛选结果（不只是当前页）的所有字段：点击后才在后台分批写入导出文件
+            export_format = settings_export_format()
+            if st.button(f"导出所有字段数据 ({export_format})", key="export_collections"):
+                with st.spinner("正在导出..."):
+                    try:
+                        path, count = export_query(collection_export_query(**collection_filter),
+                                                   export_format, name="采集记录")
+                        st.session_state["collection_export"] = (path, count, export_format)
+                    except Exception as e:
+                        st.error(f"导出失败: {e}")
+
+            export = st.session_state.get("collection_export")
+            if export and os.path.exists(export[0]):
+                path, count, export_format = export
+                st.write(f"已导出 {count} 条记录")
+                with open(path, "rb") as file:
+                    st.download_button(
+                        label="下载导出文件",
+                        data=file,
+                        file_name=f"采集记录完整导出_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                                  f"{EXPORT_FORMATS[export_format][0]}",
+                        mime=EXPORT_FORMATS[export_format][1],
+                    )
+
+            st.markdown("---")
+
+            # 检查是否需要显示详情
+            if 'show_collection_details' in st.session_state and st.session_state['show_collection_details']:
+                collection_id = st.session_state['show_collection_details']
+                collection = get_collection_by_id(collection_id)
+                if collection:
+                    st.markdown("---")
+                    st.markdown("### 采集记录详情")
+                    # Basic information
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.write(f"**采集编号:** {collection.collection_id}")
+                        st.write(f"**采集日期:** {collection.collection_date}")
+                        st.write(f"**采集地点:** {collection.location}")
+                        st.write(f"**海拔:** {collection.altitude}米")
+                        st.write(f"**采集人:** {collection.collector}")
+
+                    with col2:
+                        st.write(f"**经纬度:** {collection.latitude}, {collection.longitude}")
+                        st.write(f"**生境描述:** {collection.habitat or '未记录'}")
+                        st.write(f"**鉴定状态:** {'已鉴定' if collection.identified else '未鉴定'}")
+                        if collection.identified:
+                            st.write(f"**鉴定人:** {collection.identified_by or '未记录'}")
+
+                    # Notes
+                    if collection.notes:
+                        st.write("**备注:**")
+                        st.write(collection.notes)
+
+                    # Plant information
+                    st.markdown("### 植物信息")
+                    if collection.species_latin or collection.species_chinese or collection.family or collection.genus:
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            st.write(f"**中文名:** {collection.species_chinese or '未记录'}")
+                            st.write(f"**科:** {collection.family or '未记录'}")
+                        with col2:
+                            st.write(f"**拉丁学名:** {collection.species_latin or '未记录'}")
+                            st.write(f"**属:** {collection.genus or '未记录'}")
+
+                        if collection.species_latin:
+                            st.write(f"**种:** {collection.species_latin}")
+
+                        if collection.identification_notes:
+                            st.write("**鉴定备注:**")
+                            st.write(collection.identification_notes)
+                    else:
+                        st.write("暂无植物分类信息")
+
+                    # Images
+                    images = get_images("collection", collection_id)
+                    if images:
+                        st.markdown("### 采集图片")
+                        image_cols = st.columns(min(3, len(images)))
+                        for i, image in enumerate(images):
+                            with image_cols[i % len(image_cols)]:
+                                show_image(image.file_path, caption=image.description, width=250)
+
+                    # Button to close details
+                    if st.button("关闭详情"):
+                        st.session_state.pop('show_collection_details', None)
+                        st.rerun()
+
+                    st.markdown("---")
+
+            # 选择记录进行操作
+            collection_labels = {c["id"]: f"{c['采集编号']} - {c['地点']} ({c['采集日期']})" for c in collection_data}
+            selected_id = st.selectbox(
+                "选择采集记录进行操作",
+                options=df["id"].tolist(),
+                format_func=lambda x: collection_labels.get(x, ""),
+                key="selected_collection_for_action"
+            )
+
+            # 显示操作按钮
+            if selected_id:
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    if st.button("查看详情"):
+                        st.session_state['show_collection_details'] = selected_id
+                        st.rerun()
+                with col2:
+                    if st.button("编辑记录"):
+                        st.session_state['edit_collection_id'] = selected_id
+                        st.session_state['active_tab'] = 2
+                        st.rerun()
+                with col3:
+                    selected_collection = next((c for c in collections if c.id == selected_id), None)
+                    if selected_collection and not selected_collection.identified:
+                        if st.button("鉴定"):
+                            st.session_state['identify_collection_id'] = selected_id
+                            st.session_state['active_tab'] = 3
+                            st.rerun()
+                    else:
+                        st.button("已鉴定", disabled=True)
+
+                st.subheader("上传采集图片")
+                uploaded_file = st.file_uploader("选择图片", type=["jpg", "jpeg", "png"],
+                                                 key=f"collection_upload_{selected_id}",
+                                                 accept_multiple_files=True)
+                image_description = st.text_input("图片描述", key=f"collection_img_desc_{selected_id}")
+
+                if uploaded_file and st.button("上传图片", key=f"upload_collection_img_{selected_id}"):
+                    image_id = save_image(uploaded_file, "collection", selected_id, image_description)
+                    if image_id:
+                        st.success("图片上传成功！")
+                        st.rerun()
+                    else:
+                        st.error("图片上传失败")
+
+        else:
+            st.info("暂无采集记录。请先添加采集记录。")
+
+    # 编辑采集记录标签页
+    elif current_tab == 2:
+        show_edit_collection_form()
+
+    # 植物鉴定标签页
+    elif current_tab == 3:
+        show_identify_collection_form()
+    elif current_tab == 4:
+        show_import_collections_form()
+
+
+def show_import_collections_form():
+    """
+    从 CSV / Excel 文件批量导入采集记录：对应列、校验、导入，错误行可下载成报告
+    """
+    st.subheader("批量导入采集记录")
+    st.write("表格第一行为列名，列名与添加表单或导出文件一致时自动对应；采集日期、采集地点和采集人必须填写。")
+
+    uploaded_file = st.file_uploader("选择 CSV 或 Excel 文件", type=["csv", "xlsx", "xls"], key="collection_import_file")
+    if uploaded_file is None:
+        return
+
+    # 同一个文件只读取一次
+    cached = st.session_state.get("collection_import_table")
+    if cached is None or cached[0] != uploaded_file.file_id:
+        try:
+            frame = read_table(uploaded_file, uploaded_file.name)
+        except Exception as e:
+            st.error(f"读取文件失败: {e}")
+            return
+        st.session_state["collection_import_table"] = (uploaded_file.file_id, frame)
+        st.session_state.pop("collection_import_result", None)
+    frame = st.session_state["collection_import_table"][1]
+
+    st.write(f"共 {len(frame)} 行，前 5 行：")
+    st.dataframe(frame.head(), use_container_width=True)
+
+    # 列对应关系
+    st.markdown("### 列对应")
+    suggested = suggest_mapping(frame.columns)
+    skip = "（不导入）"
+    columns = [skip] + list(frame.columns)
+    mapping = {}
+    layout = st.columns(3)
+    for i, (field, (label, _)) in enumerate(IMPORT_FIELDS.items()):
+        with layout[i % 3]:
+            default = suggested.get(field)
+            column = st.selectbox(label + (" *" if field in REQUIRED_FIELDS else ""), columns,
+                                  index=columns.index(default) if default in columns else 0,
+                                  key=f"collection_import_map_{field}")
+        if column != skip:
+            mapping[field] = column
+
+    skip_invalid = st.checkbox("跳过有错误的行，导入其余行", value=True, key="collection_import_skip_invalid")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("校验", key="collection_import_check"):
+            with st.spinner("正在校验..."):
+                records, errors = prepare_rows(frame, mapping)
+            st.session_state["collection_import_result"] = ("check", len(records), errors)
+    with col2:
+        if st.button("导入", type="primary", key="collection_import_run"):
+            with st.spinner("正在导入..."):
+                result = import_collections(frame, mapping, skip_invalid=skip_invalid)
+            st.session_state["collection_import_result"] = ("import", len(result.imported), result.errors)
+
+    outcome = st.session_state.get("collection_import_result")
+    if outcome:
+        action, count, errors = outcome
+        bad_rows = len({error.row for error in errors if error.row is not None})
+        if action == "check":
+            st.info(f"可导入 {count} 行，{bad_rows} 行有错误")
+        elif count:
+            st.success(f"已导入 {count} 条采集记录")
+        else:
+            st.warning("没有导入任何记录")
+
+        if errors:
+            report = error_report(errors)
+            st.dataframe(report.head(200), use_container_width=True)
+            if len(report) > 200:
+                st.write(f"仅显示前 200 条，共 {len(report)} 条错误")
+            st.download_button(
+                label="下载错误报告",
+                data=report.to_csv(index=False).encode("utf-8-sig"),
+                file_name=f"采集记录导入错误_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                mime="text/csv",
+                key="collection_import_errors",
+            )
+
+
+def edit_collection(collection_id):
+    """
+    设置会话状态以编辑指定的采集记录
+    """
+    st.session_state['edit_collection_id'] = collection_id
+    st.session_state['active_tab'] = 2  # 假设编辑采集记录是第3个选项卡(索引2)
+    st.rerun()  # 重新运行应用以更新UI
+
+
+def show_edit_collection_form():
+    """
+    显示编辑采集记录的表单
+    """
+    # 检查是否有从查看页面传递过来的编辑ID
+    edit_collection_id = st.session_state.get('edit_collection_id', None)
+
+    if edit_collection_id:
+        collection = get_collection_by_id(edit_collection_id)
+
+        if collection:
+            st.write(f"正在编辑采集记录: {collection.collection_id}")
+
+            # 基本信息部分 - 改为三列布局
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                collection_date = st.date_input("采集日期", collection.collection_date, key="edit_collection_date")
+                latitude = st.number_input("纬度", format="%.6f", step=0.000001, value=collection.latitude,
+                                           key="edit_latitude")
+                country = st.text_input("国家（可选）", getattr(collection, 'country', ''), key="edit_country")
+            with col2:
+                location = st.text_input("采集地点", collection.location, key="edit_location")
+                longitude = st.number_input("经度", format="%.6f", step=0.000001, value=collection.longitude,
+                                            key="edit_longitude")
+                terrain = st.text_input("地形（可选）", getattr(collection, 'terrain', ''), key="edit_terrain")
+            with col3:
+                collector = st.text_input("采集人", collection.collector, key="edit_collector")
+                altitude = st.number_input("海拔(米)", min_value=0.0, step=0.1, value=collection.altitude,
+                                           key="edit_altitude")
+                land_use = st.text_input("土地利用（可选）", getattr(collection, 'land_use', ''), key="edit_land_use")
+
+            # 编号和生境部分
+            col1, col2 = st.columns(2)
+            with col1:
+                original_id = st.text_input("原始编号（可选）", getattr(collection, 'original_id', ''),
+                                            key="edit_original_id")
+                specimen_number = st.text_input("标本号（可选）", getattr(collection, 'specimen_number', ''),
+                                                key="edit_specimen_number")
+            with col2:
+                habitat = st.text_input("生境描述", collection.habitat or "", key="edit_habitat")
+
+            # 土壤信息部分
+            st.markdown("### 土壤信息（可选）")
+            col1, col2 = st.columns(2)
+            with col1:
+                soil_parent_material = st.text_input("土壤母质", getattr(collection, 'soil_parent_material', ''),
+                                                     key="edit_soil_parent_material")
+            with col2:
+                soil_texture = st.text_input("土壤质地", getattr(collection, 'soil_texture', ''),
+                                             key="edit_soil_texture")
+
+            # 种子信息部分
+            st.markdown("### 种子信息（可选）")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                seed_harvest_period = st.text_input("收获种子时期", getattr(collection, 'seed_harvest_period', ''),
+                                                    key="edit_seed_harvest_period")
+                seed_quantity = st.text_input("种子数量", getattr(collection, 'seed_quantity', ''),
+                                              key="edit_seed_quantity")
+            with col2:
+                collection_part = st.text_input("采集部位", getattr(collection, 'collection_part', ''),
+                                                key="edit_collection_part")
+                seed_condition = st.text_input("种子状况", getattr(collection, 'seed_condition', ''),
+                                               key="edit_seed_condition")
+            with col3:
+                fruit_size = st.text_input("果实大小", getattr(collection, 'fruit_size', ''), key="edit_fruit_size")
+                fruit_color = st.text_input("果实颜色", getattr(collection, 'fruit_color', ''), key="edit_fruit_color")
+
+            # 备注
+            notes = st.text_area("备注", collection.notes or "", key="edit_notes")
+
+            # 植物信息部分 - 改为三列布局
+            st.markdown("### 植物信息（可选）")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                species_chinese = st.text_input("中文种名", getattr(collection, 'species_chinese', ''),
+                                                     key="edit_species_chinese")
+                species_latin = st.text_input("拉丁学名 (Latin name)", collection.species_latin or "",
+                                                key="edit_species_latin")
+
+            with col2:
+                genus_chinese = st.text_input("属中文名", getattr(collection, 'genus_chinese', ''),
+                                              key="edit_genus_chinese")
+                genus = st.text_input("属", collection.genus or "", key="edit_genus")
+            with col3:
+                family_chinese = st.text_input("科中文名", getattr(collection, 'family_chinese', ''),
+                                               key="edit_family_chinese")
+                family = st.text_input("科", collection.family or "", key="edit_family")
+
+
+                # 判断是否已鉴定
+                identified = st.checkbox("已鉴定", value=collection.identified, key="edit_identified")
+                if identified:
+                    identified_by = st.text_input("鉴定人", collection.identified_by or "", key="edit_identified_by")
+
+            # 保存和取消按钮
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("保存更改", key="save_edit_collection"):
+                    update_data = {
+                        "collection_date": collection_date,
+                        "location": location,
+                        "latitude": latitude,
+                        "longitude": longitude,
+                        "altitude": altitude,
+                        "collector": collector,
+                        "notes": notes,
+                        "habitat": habitat,
+                        "species_latin": species_latin,
+                        "family": family,
+                        "family_chinese": family_chinese,
+                        "genus": genus,
+                        "genus_chinese": genus_chinese,
+                        "identified": identified,
+                        "original_id": original_id,
+                        "country": country,
+                        "species_chinese": species_chinese,
+                        "terrain": terrain,
+                        "land_use": land_use,
+                        "soil_parent_material": soil_parent_material,
+                        "soil_texture": soil_texture,
+                        "seed_harvest_period": seed_harvest_period,
+                        "collection_part": collection_part,
+                        "seed_quantity": seed_quantity,
+                        "seed_condition": seed_condition,
+                        "fruit_size": fruit_size,
+                        "fruit_color": fruit_color,
+                        "specimen_number": specimen_number
+                    }
+
+                    if identified:
+                        update_data["identified_by"] = identified_by
+
+                    # 更新采集记录
+                    if update_collection(edit_collection_id, **update_data):
+                        st.success("采集记录更新成功!")
+                        st.session_state.pop('edit_collection_id', None)
+                        st.session_state['active_tab'] = 1  # 切换回查看标签页
+                        st.rerun()
+                    else:
+                        st.error("更新采集记录失败")
+
+            with col2:
+                if st.button("取消编辑", key="cancel_edit_collection"):
+                    st.session_state.pop('edit_collection_id', None)
+                    st.session_state['active_tab'] = 1  # 回到查看标签页
+                    st.rerun()
+        else:
+            st.error(f"未找到ID为 {edit_collection_id} 的采集记录")
+            if st.button("返回", key="return_from_edit"):
+                st.session_state.pop('edit_collection_id', None)
+                st.session_state['active_tab'] = 1  # 回到查看标签页
+                st.rerun()
+    else:
+        # 如果没有选择记录，显示选择框
+        selected_collection = record_picker(
+            "选择采集记录进行编辑", "collection", "edit_collection_select",
+            lambda c: f"{c.collection_id} - {c.location} ({c.collection_date})",
+            empty_message="目前没有采集记录", index=None)
+        if selected_collection:
+            st.session_state['edit_collection_id'] = selected_collection.id
+            st.rerun()
+
+
+def show_identify_collection_form():
+    """
+    显示鉴定采集记录的表单
+    """
+    # 检查是否有从查看页面传递过来的鉴定ID
+    identify_collection_id = st.session_state.get('identify_collection_id', None)
+
+    if identify_collection_id:
+        collection = get_collection_by_id(identify_collection_id)
+
+        if collection and not collection.identified:
+            st.write(f"正在鉴定采集记录: {collection.collection_id}")
+
+            # 植物信息表单
+            st.markdown("### 植物鉴定信息")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                species_chinese = st.text_input("种中文名", getattr(collection, 'species_chinese', ''),
+                                                     key="identify_species_chinese")
+                genus_chinese = st.text_input("属中文名", getattr(collection, 'genus_chinese', ''),
+                                              key="identify_genus_chinese")
+                family_chinese = st.text_input("科中文名", getattr(collection, 'family_chinese', ''),
+                                               key="identify_family_chinese")
+
+            with col2:
+                species_latin = st.text_input("拉丁学名", collection.species_latin or "",
+                                                key="identify_species_latin")
+                genus = st.text_input("属", collection.genus or "", key="identify_genus")
+                family = st.text_input("科", collection.family or "", key="identify_family")
+            with col3:
+
+                identified_by = st.text_input("鉴定人", key="identify_identified_by")
+
+            # 鉴定备注
+            identification_notes = st.text_area("鉴定备注", key="identify_notes")
+
+            # 保存和取消按钮
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("保存鉴定信息", key="save_identification"):
+                    if species_latin:
+                        # 更新鉴定信息
+                        if update_collection_identification(
+                                identify_collection_id,
+                                species_latin=species_latin,
+                                family=family,
+                                family_chinese=family_chinese,
+                                genus=genus,
+                                genus_chinese=genus_chinese,
+                                identified_by=identified_by,
+                                identification_notes=identification_notes,
+                                species_chinese=species_chinese
+                        ):
+                            st.success("植物鉴定信息更新成功!")
+                            st.session_state.pop('identify_collection_id', None)
+                            st.session_state['active_tab'] = 1  # 切换回查看标签页
+                            st.rerun()
+                        else:
+                            st.error("更新鉴定信息失败")
+                    else:
+                        st.warning("请至少填写拉丁学名")
+
+            with col2:
+                if st.button("取消鉴定", key="cancel_identification"):
+                    st.session_state.pop('identify_collection_id', None)
+                    st.session_state['active_tab'] = 1  # 回到查看标签页
+                    st.rerun()
+        else:
+            st.warning("选择的记录不存在或已经被鉴定")
+            if st.button("返回", key="return_from_identify"):
+                st.session_state.pop('identify_collection_id', None)
+                st.session_state['active_tab'] = 1  # 回到查看标签页
+                st.rerun()
+    else:
+        # 未鉴定记录数取自首页统计，不读取记录本身
+        unidentified_count = get_section("counts")["unidentified"]
+        if unidentified_count:
+            st.write(f"共有 {unidentified_count} 条未鉴定的采集记录")
+
+        selected_collection = record_picker(
+            "选择采集记录进行鉴定", "collection", "identify_collection_select",
+            lambda c: f"{c.collection_id} - {c.location} ({c.collection_date})",
+            empty_message="目前没有未鉴定的采集记录", index=None, identified=False)
+        if selected_collection:
+            st.session_state['identify_collection_id'] = selected_collection.id
+            st.rerun()
+
+
+def show_collection_details(collection_id):
+    """显示采集记录详情"""
+    collection = get_collection_by_id(collection_id)
+    if collection:
+        st.markdown(f"### 采集编号: {collection.collection_id}")
+
+        # 基本信息
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write(f"**采集日期:** {collection.collection_date}")
+            st.write(f"**采集地点:** {collection.location}")
+            st.write(f"**海拔:** {collection.altitude}米")
+            st.write(f"**采集人:** {collection.collector}")
+
+        with col2:
+            st.write(f"**经纬度:** {collection.latitude}, {collection.longitude}")
+            st.write(f"**生境描述:** {collection.habitat or '未记录'}")
+            st.write(f"**鉴定状态:** {'已鉴定' if collection.identified else '未鉴定'}")
+            if collection.identified:
+                st.write(f"**鉴定人:** {collection.identified_by or '未记录'}")
+
+        # 备注
+        if collection.notes:
+            st.write("**备注:**")
+            st.write(collection.notes)
+
+        # 植物信息
+        st.markdown("### 植物信息")
+        if collection.species_latin or collection.species_chinese or collection.family or collection.genus:
+            col1, col2 = st.columns(2)
+            with col1:
+                st.write(f"**中文名:** {collection.species_chinese or '未记录'}")
+                st.write(f"**科:** {collection.family or '未记录'}")
+            with col2:
+                st.write(f"**拉丁学名:** {collection.species_latin or '未记录'}")
+                st.write(f"**属:** {collection.genus or '未记录'}")
+
+            if collection.species_latin:
+                st.write(f"**种:** {collection.species_latin}")
+
+            if collection.identification_notes:
+                st.write("**鉴定备注:**")
+                st.write(collection.identification_notes)
+        else:
+            st.write("暂无植物分类信息")
+
+        # 相关种子批次
+        seed_batches = get_seed_batches_by_collection(collection_id)
+        if seed_batches:
+            st.markdown("### 相关种子批次")
+
+            batch_data = []
+            for batch in seed_batches:
+                batch_data.append({
+                    "批次编号": batch.batch_id,
+                    "存储日期": batch.storage_date,
+                    "存储位置": batch.storage_location,
+                    "种子数量": batch.quantity,
+                    "可用数量": batch.available_quantity
+                })
+
+            st.dataframe(pd.DataFrame(batch_data))
+
+        # 图片
+        images = get_images("collection", collection_id)
+        if images:
+            st.markdown("### 采集图片")
+            image_cols = st.columns(min(3, len(images)))
+            for i, image in enumerate(images):
+                with image_cols[i % len(image_cols)]:
+                    show_image(image.file_path, caption=image.description, width=250)
@@ -0,0 +1,139 @@
+"""
+页面公用的显示组件：图片、图表、分页列表、记录选择器和标签页导航
+"""
+
+import streamlit as st
+import os
+import base64
+import thumbnails
+import chart_service
+from database import search_options
+from bootstrap import get_settings
+from export_utils import EXPORT_FORMATS
+
+
+# 显示图片的函数：按显示宽度选用缩略图，不解码原图
+def show_image(file_path, caption=None, width=None):
+    st.image(thumbnails.display_path(file_path, width), caption=caption, width=width)
+
+
+# 显示图表：draw(ax, data) 绘制的图表渲染为 PNG 显示，数据不变时使用缓存的 PNG
+def show_chart(draw, data, figsize=None):
+    st.image(chart_service.render_png(draw, data, figsize))
+
+
+# 分页显示列表：各页游标保存在会话状态中，筛选条件或每页条数变化时回到第一页
+def paged_records(key, fetch, filters=()):
+    """
+    调用 fetch(page_size, after) 取当前页（RecordPage）并显示翻页按钮，返回当前页
+
+    每页条数取自系统设置中的 items_per_page；filters 为当前筛选条件，用于判断是否需要回到第一页
+    """
+    page_size = int(get_settings().get("items_per_page") or 10)
+    state_key = f"{key}_pager"
+    signature = (tuple(filters), page_size)
+    state = st.session_state.get(state_key)
+    if state is None or state["signature"] != signature:
+        state = {"signature": signature, "cursors": [None]}
+        st.session_state[state_key] = state
+
+    cursors = state["cursors"]
+    page = fetch(page_size, cursors[-1])
+    # 当前页的记录已被删除时回到第一页
+    if not page.items and len(cursors) > 1:
+        del cursors[1:]
+        page = fetch(page_size, None)
+
+    page_count = max(1, -(-page.total // page_size))
+    if page_count > 1:
+        col1, col2, col3 = st.columns([1, 3, 1])
+        with col1:
+            st.button("上一页", key=f"{key}_prev", disabled=len(cursors) == 1,
+                      on_click=cursors.pop)
+        with col2:
+            st.caption(f"第 {len(cursors)} / {page_count} 页，共 {page.total} 条")
+        with col3:
+            st.button("下一页", key=f"{key}_next", disabled=page.next_cursor is None,
+                      on_click=cursors.append, args=(page.next_cursor,))
+    return page
+
+
+# 记录选择器：先输入编号或名称检索，下拉框中只列出匹配的前若干条记录，不读取整张表
+def record_picker(label, kind, key, format_func, empty_message="目前没有可选的记录",
+                  available_only=False, index=0, **filters):
+    """
+    显示检索框和下拉框，返回选中的选项行（见 database.search_options），没有可选记录或未选择时返回 None
+
+    filters 为传给 search_options 的等值条件，如 status="活"；index=None 时下拉框默认不选中任何记录
+    """
+    term = st.text_input(f"检索{label}", key=f"{key}_term", placeholder="输入编号、物种名或地点，留空显示最近的记录")
+    options = search_options(kind, term, available_only=available_only, **filters)
+    if not options:
+        if term.strip():
+            st.info(f"没有与“{term.strip()}”匹配的记录")
+        else:
+            st.info(empty_message)
+        return None
+    return st.selectbox(label, options, format_func=format_func, index=index, key=key)
+
+
+# 多选的记录选择器：每次检索同样只列出匹配的前若干条，已选中的记录在更换检索词后保留
+def record_multi_picker(label, kind, key, format_func, empty_message="目前没有可选的记录",
+                        available_only=False, **filters):
+    """
+    显示检索框和多选框，返回选中的选项行列表（见 database.search_options）
+
+    多选框的取值为记录 id，已选记录的选项行保存在会话状态中，可以分几次检索、逐步加入选择
+    """
+    term = st.text_input(f"检索{label}", key=f"{key}_term", placeholder="输入编号、物种名或地点，留空显示最近的记录")
+    rows_key = f"{key}_rows"
+    rows = dict(st.session_state.get(rows_key, {}))
+    chosen = [row_id for row_id in st.session_state.get(key, []) if row_id in rows]
+    options = search_options(kind, term, available_only=available_only, **filters)
+    rows.update((option.id, option) for option in options)
+    ids = chosen + [option.id for option in options if option.id not in chosen]
+    if not ids:
+        if term.strip():
+            st.info(f"没有与“{term.strip()}”匹配的记录")
+        else:
+            st.info(empty_message)
+        return []
+    selected = st.multiselect(label, ids, format_func=lambda row_id: format_func(rows[row_id]), key=key)
+    st.session_state[rows_key] = {row_id: rows[row_id] for row_id in selected}
+    return [rows[row_id] for row_id in selected]
+
+
+def clear_record_multi_picker(key):
+    """清空多选记录选择器的选择，例如批量操作完成后（选项行中的数量等信息可能已经过时）"""
+    st.session_state.pop(key, None)
+    st.session_state.pop(f"{key}_rows", None)
+
+
+# 管理页面的子导航：st.tabs 每次重新运行都会执行所有标签页的代码，这里只运行选中的一页
+def section_tabs(key, tab_names):
+    """
+    显示横向的标签页导航，返回选中的标签页序号，调用方只显示该标签页的内容
+
+    把 st.session_state['active_tab'] 设为某个序号后重新运行，可以切换到该标签页（只生效一次）
+    """
+    state_key = f"{key}_tab"
+    requested = st.session_state.pop('active_tab', None)
+    if requested is not None and 0 <= requested < len(tab_names):
+        st.session_state[state_key] = tab_names[requested]
+    selected = st.radio(key, tab_names, horizontal=True, key=state_key, label_visibility="collapsed")
+    return tab_names.index(selected)
+
+
+# 下载图片的函数
+def get_binary_file_downloader_html(file_path, file_label='文件'):
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    b64 = base64.b64encode(data).decode()
+    href = f'<a href="data:application/octet-stream;base64,{b64}" download="{os.path.basename(file_path)}">{file_label}</a>'
+    return href
+
+
+def settings_export_format():
+    """系统设置中的导出格式，不支持的取值按 csv 处理"""
+    export_format = str(get_settings().get("export_format") or "csv").lower()
+    return export_format if export_format in EXPORT_FORMATS else "csv"
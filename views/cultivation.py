@@ -0,0 +1,821 @@
+"""
+温室栽培管理页面
+"""
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+import datetime
+import cultivation_stats
+from database import (
+    add_cultivation_record, add_cultivation_event, update_cultivation_status,
+    batch_update_cultivation_status, save_image, get_images, get_collection_by_id,
+    get_cultivation_record_by_id, get_cultivation_events, get_seed_batch_by_id,
+    get_cultivation_subgroups, add_cultivation_subgroup, add_seed_batch_from_cultivation,
+    get_harvested_seeds, get_all_families, get_all_genera, get_cultivation_values,
+    get_cultivation_records_page
+)
+from views.common import (
+    show_image, show_chart, paged_records, record_picker, record_multi_picker, clear_record_multi_picker,
+    section_tabs
+)
+
+
+def draw_taxon_counts(ax, data):
+    counts, rank_label = data
+    ax.barh(counts["名称"], counts["数量"])
+    ax.set_xlabel('数量')
+    ax.set_ylabel(rank_label)
+    ax.set_title(f'栽培植物{rank_label}分布 (Top 10)')
+
+
+def draw_monthly_events(ax, df):
+    bottom = np.zeros(len(df))
+    for event_type in cultivation_stats.EVENT_TYPES:
+        ax.bar(df["月份"], df[event_type], bottom=bottom, label=event_type)
+        bottom += df[event_type].values
+
+    ax.set_xlabel('月份')
+    ax.set_ylabel('事件数量')
+    ax.set_title('栽培事件随时间变化')
+    ax.legend()
+
+    # 旋转x轴标签以提高可读性
+    ax.tick_params(axis='x', labelrotation=45)
+
+
+def draw_survival_by_location(ax, survival):
+    ax.bar(survival["栽培位置"], survival["存活率"])
+    ax.set_xlabel('栽培位置')
+    ax.set_ylabel('存活率 (%)')
+    ax.set_title('不同栽培位置的植物存活率')
+    ax.set_ylim(0, 100)
+
+    # 旋转x轴标签以提高可读性
+    ax.tick_params(axis='x', labelrotation=45)
+
+
+def show_cultivation_statistics():
+    st.subheader("栽培统计")
+
+    # 已完成的栽培指种植超过3个月的记录
+    cutoff = cultivation_stats.established_cutoff(90)
+    summary = cultivation_stats.status_summary(cutoff)
+
+    if not summary["total"]:
+        st.info("目前没有栽培记录数据")
+        return
+
+    # 显示基本统计
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        st.metric("总栽培记录", int(summary["total"]))
+    with col2:
+        st.metric("存活植株", int(summary["alive"]))
+    with col3:
+        st.metric("开花植株", int(summary["flowering"]))
+    with col4:
+        st.metric("结果植株", int(summary["fruiting"]))
+    with col5:
+        st.metric("死亡植株", int(summary["dead"]))
+
+    # 显示分类图表
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.subheader("按科统计")
+        families = cultivation_stats.taxon_counts("family", limit=10)
+        if not families.empty:
+            show_chart(draw_taxon_counts, (families, '科'))
+        else:
+            st.info("暂无科分布数据")
+
+    with col2:
+        st.subheader("按属统计")
+        genera = cultivation_stats.taxon_counts("genus", limit=10)
+        if not genera.empty:
+            show_chart(draw_taxon_counts, (genera, '属'))
+        else:
+            st.info("暂无属分布数据")
+
+    # 状态随时间变化
+    st.subheader("栽培状态随时间变化")
+
+    df = cultivation_stats.monthly_event_matrix()
+
+    if not df.empty:
+        show_chart(draw_monthly_events, df, figsize=(12, 6))
+    else:
+        st.info("暂无栽培事件数据")
+
+    # 存活率分析
+    st.subheader("存活率分析")
+
+    if summary["established"]:
+        # 只包括至少有5条记录的位置
+        survival = cultivation_stats.survival_by_location(cutoff, min_records=5)
+
+        if not survival.empty:
+            show_chart(draw_survival_by_location, survival)
+        else:
+            st.info("没有足够的数据进行位置存活率分析")
+    else:
+        st.info("暂无完成的栽培记录")
+
+
+def show_cultivation_management():
+    st.subheader("温室栽培管理")
+
+    current_tab = section_tabs("cultivation", ["新建栽培记录", "记录栽培状态", "批量更新状态", "栽培记录列表", "栽培统计"])
+
+    if current_tab == 0:
+        st.subheader("新建栽培记录")
+
+        # Plant origin selection
+        origin_option = st.radio("植株来源", ["种子批次", "已有栽培", "野外采集", "其他来源"], horizontal=True)
+
+        if origin_option == "种子批次":
+            # Existing code for selecting seed batch
+            selected_batch = record_picker(
+                "选择种子批次", "seed_batch", "cultivation_seed_batch_select",
+                lambda b: f"{b.batch_id} - {b.storage_location}",
+                empty_message="目前没有种子批次，请先添加种子批次")
+
+            if selected_batch:
+                batch_id = selected_batch.id
+                seed_batch = get_seed_batch_by_id(batch_id)
+
+                # Display taxonomic info if available
+                if seed_batch and seed_batch.collection_id:
+                    collection = get_collection_by_id(seed_batch.collection_id)
+                    if collection:
+                        st.info(
+                            f"植物信息: {collection.species_chinese or ''} {collection.species_latin or ''} ({collection.family or ''} {collection.genus or ''})")
+
+                # Rest of existing code for seed batch based cultivation
+                start_date = st.date_input("开始栽培日期", datetime.datetime.now())
+                location = st.text_input("栽培位置")
+                quantity = st.number_input("栽培数量", min_value=1, step=1)
+                notes = st.text_area("备注")
+
+                # Add taxonomic fields in case the seed batch doesn't have complete info
+                with st.expander("添加分类信息（可选）"):
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        family = st.text_input("科")
+                        family_chinese = st.text_input("科中文名")
+
+                    with col2:
+                        genus = st.text_input("属")
+                        genus_chinese = st.text_input("属中文名")
+                    with col3:
+                        species_latin = st.text_input("种")
+                        species_chinese = st.text_input("种中文名")
+
+
+                if st.button("创建栽培记录"):
+                    # Create cultivation record with origin info
+                    record_id = add_cultivation_record(
+                        seed_batch_id=batch_id,
+                        start_date=start_date,
+                        location=location,
+                        quantity=quantity,
+                        notes=notes,
+                        origin="种子批次",
+                        family=family,
+                        family_chinese=family_chinese,
+                        genus=genus,
+                        genus_chinese=genus_chinese,
+                        species_chinese=species_chinese,
+                        species_latin=species_latin
+                    )
+
+                    if record_id:
+                        st.success(f"栽培记录创建成功！")
+                        st.rerun()
+                    else:
+                        st.error("创建栽培记录失败")
+
+        elif origin_option == "已有栽培":
+            # Select existing cultivation that has fruited
+            selected_cultivation = record_picker(
+                "选择结果的栽培记录", "cultivation", "parent_cultivation_select",
+                lambda c: f"{c.cultivation_id} - {c.location} ({c.species_chinese or c.species_latin or '未命名'})",
+                empty_message="目前没有结果的栽培记录", status="活", fruiting=True)
+
+            if selected_cultivation:
+                parent_cultivation_id = selected_cultivation.id
+                parent_cultivation = get_cultivation_record_by_id(parent_cultivation_id)
+
+                # Display parent plant info
+                st.info(
+                    f"母本植物: {parent_cultivation.species_chinese or parent_cultivation.species_latin or '未命名'}")
+
+                # Input fields for new cultivation
+                start_date = st.date_input("开始栽培日期", datetime.datetime.now())
+                location = st.text_input("栽培位置")
+                quantity = st.number_input("栽培数量", min_value=1, step=1)
+                notes = st.text_area("备注")
+
+                if st.button("创建栽培记录"):
+                    # Create cultivation record with parent cultivation info
+                    record_id = add_cultivation_record(
+                        seed_batch_id=None,  # No seed batch
+                        start_date=start_date,
+                        location=location,
+                        quantity=quantity,
+                        notes=notes,
+                        origin="已有栽培",
+                        origin_details=f"母本: {parent_cultivation.cultivation_id}",
+                        parent_cultivation_id=parent_cultivation_id,
+                        # Copy taxonomic info from parent
+                        family=parent_cultivation.family,
+                        family_chinese=parent_cultivation.family_chinese,
+                        genus=parent_cultivation.genus,
+                        genus_chinese=parent_cultivation.genus_chinese,
+                        species_chinese=parent_cultivation.species_chinese,
+                        species_latin=parent_cultivation.species_latin
+                    )
+
+                    if record_id:
+                        st.success(f"栽培记录创建成功！")
+                        st.rerun()
+                    else:
+                        st.error("创建栽培记录失败")
+
+        elif origin_option == "野外采集":
+            # Select from collections
+            selected_collection = record_picker(
+                "选择野外采集记录", "collection", "cultivation_collection_select",
+                lambda c: f"{c.collection_id} - {c.location} ({c.species_chinese or c.species_latin or '未命名'})",
+                empty_message="目前没有采集记录")
+
+            if selected_collection:
+                collection_id = selected_collection.id
+                collection = get_collection_by_id(collection_id)
+
+                # Display collection info
+                st.info(
+                    f"采集信息: {collection.species_chinese or ''} {collection.species_latin or ''} ({collection.family or ''} {collection.genus or ''})")
+
+                # Input fields for new cultivation
+                start_date = st.date_input("开始栽培日期", datetime.datetime.now())
+                location = st.text_input("栽培位置")
+                quantity = st.number_input("栽培数量", min_value=1, step=1)
+                notes = st.text_area("备注")
+
+                if st.button("创建栽培记录"):
+                    # Create cultivation record with collection info
+                    record_id = add_cultivation_record(
+                        seed_batch_id=None,  # No seed batch
+                        start_date=start_date,
+                        location=location,
+                        quantity=quantity,
+                        notes=notes,
+                        origin="野外采集",
+                        origin_details=f"采集记录: {collection.collection_id}",
+                        collection_id=collection_id,
+                        # Copy taxonomic info from collection
+                        family=collection.family,
+                        family_chinese=collection.family_chinese,
+                        genus=collection.genus,
+                        genus_chinese=collection.genus_chinese,
+                        species_chinese=collection.species_chinese,
+                        species_latin=collection.species_latin,
+                    )
+
+                    if record_id:
+                        st.success(f"栽培记录创建成功！")
+                        st.rerun()
+                    else:
+                        st.error("创建栽培记录失败")
+
+        else:  # 其他来源
+            # Input fields for new cultivation with manual taxonomic info
+            start_date = st.date_input("开始栽培日期", datetime.datetime.now())
+            location = st.text_input("栽培位置")
+            quantity = st.number_input("栽培数量", min_value=1, step=1)
+            origin_details = st.text_input("来源详情")
+
+            # Taxonomic fields
+            st.subheader("分类信息")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                family = st.text_input("科")
+                family_chinese = st.text_input("科中文名")
+
+            with col2:
+                genus = st.text_input("属")
+                genus_chinese = st.text_input("属中文名")
+            with col3:
+                species_latin = st.text_input("拉丁学名")
+                species_chinese = st.text_input("种中文名")
+            notes = st.text_area("备注")
+
+            if st.button("创建栽培记录"):
+                # Create cultivation record with manual info
+                record_id = add_cultivation_record(
+                    seed_batch_id=None,  # No seed batch
+                    start_date=start_date,
+                    location=location,
+                    quantity=quantity,
+                    notes=notes,
+                    origin="其他来源",
+                    origin_details=origin_details,
+                    family=family,
+                    family_chinese=family_chinese,
+                    genus=genus,
+                    genus_chinese=genus_chinese,
+                    species_chinese=species_chinese,
+                    species_latin=species_latin,
+                )
+
+                if record_id:
+                    st.success(f"栽培记录创建成功！")
+                    st.rerun()
+                else:
+                    st.error("创建栽培记录失败")
+
+    elif current_tab == 1:
+        st.subheader("记录栽培状态")
+
+        selected_record = record_picker(
+            "选择栽培记录", "cultivation", "status_record_select",
+            lambda r: f"{r.cultivation_id} - {r.location} ({r.start_date})",
+            empty_message="目前没有活的栽培记录", status="活")
+
+        if selected_record:
+            record_id = selected_record.id
+
+            # 查询该记录的详细信息
+            record = get_cultivation_record_by_id(record_id)
+
+            if record:
+                st.markdown(f"### 栽培编号: {record.cultivation_id}")
+                st.write(f"开始日期: {record.start_date}")
+                st.write(f"栽培位置: {record.location}")
+                st.write(f"栽培数量: {record.quantity}")
+                st.write(f"当前状态: {record.status}")
+
+                # Show taxonomic info if available
+                taxonomic_info = []
+                if record.species_chinese:
+                    taxonomic_info.append(f"中文名: {record.species_chinese}")
+                if record.species_latin:
+                    taxonomic_info.append(f"拉丁学名: {record.species_latin}")
+                if record.family:
+                    taxonomic_info.append(f"科: {record.family}")
+                if record.genus:
+                    taxonomic_info.append(f"属: {record.genus}")
+
+
+                if taxonomic_info:
+                    st.write(" | ".join(taxonomic_info))
+
+                # Show origin info
+                if record.origin:
+                    origin_text = f"来源: {record.origin}"
+                    if record.origin_details:
+                        origin_text += f" ({record.origin_details})"
+                    st.write(origin_text)
+
+                if record.flowering:
+                    st.write(f"开花日期: {record.flowering_date}")
+
+                if record.fruiting:
+                    st.write(f"结果日期: {record.fruiting_date}")
+
+                # 显示事件历史
+                events = get_cultivation_events(record_id)
+                if events:
+                    st.markdown("### 历史记录")
+                    event_data = []
+                    for event in events:
+                        event_data.append({
+                            "日期": event.event_date,
+                            "事件类型": event.event_type,
+                            "描述": event.description or ""
+                        })
+
+                    st.table(pd.DataFrame(event_data))
+
+                # 显示子分组信息
+                subgroups = get_cultivation_subgroups(record_id)
+                if subgroups:
+                    st.markdown("### 子分组记录")
+                    subgroup_data = []
+                    for subgroup in subgroups:
+                        subgroup_data.append({
+                            "日期": subgroup.status_date,
+                            "状态": subgroup.status,
+                            "数量": subgroup.quantity,
+                            "备注": subgroup.notes or ""
+                        })
+                    st.table(pd.DataFrame(subgroup_data))
+
+                # 添加新记录
+                st.markdown("### 添加常规事件")
+                event_date = st.date_input("记录日期", datetime.datetime.now(), key="event_date")
+                event_type = st.selectbox("事件类型",
+                                          ["浇水", "施肥", "修剪", "观察", "其他"], key="event_type")
+                event_description = st.text_area("描述", key="event_desc")
+
+                if st.button("添加事件", key="add_event_btn"):
+                    event_id = add_cultivation_event(
+                        cultivation_record_id=record_id,
+                        event_date=event_date,
+                        event_type=event_type,
+                        description=event_description
+                    )
+
+                    if event_id:
+                        st.success("事件添加成功！")
+                        st.rerun()
+                    else:
+                        st.error("添加事件失败")
+
+                # 记录特殊状态
+                st.markdown("### 记录特殊状态")
+                status_option = st.radio(
+                    "状态类型",
+                    ["开花", "结果", "死亡"],
+                    key=f"status_option_{record_id}"
+                )
+
+                status_date = st.date_input("状态日期", datetime.datetime.now(),
+                                            key=f"status_date_{record_id}")
+
+                if status_option == "死亡":
+                    death_reason = st.text_input("死亡原因",
+                                                 key=f"death_reason_{record_id}")
+                else:
+                    death_reason = None
+
+                if st.button("更新状态", key="update_status_btn"):
+                    result = update_cultivation_status(
+                        cultivation_record_id=record_id,
+                        status=status_option,
+                        date=status_date,
+                        reason=death_reason
+                    )
+
+                    if result:
+                        st.success(f"状态更新成功！")
+                        st.rerun()
+                    else:
+                        st.error("更新状态失败")
+
+                # 记录部分植株状态
+                st.markdown("### 记录部分植株状态")
+                subgroup_status = st.radio(
+                    "状态类型",
+                    ["部分开花", "部分结果", "部分死亡"],
+                    key="subgroup_status"
+                )
+
+                subgroup_quantity = st.number_input(
+                    "状态变化的植株数量",
+                    min_value=1,
+                    max_value=record.quantity,
+                    key="subgroup_quantity"
+                )
+
+                subgroup_date = st.date_input(
+                    "状态日期",
+                    datetime.datetime.now(),
+                    key="subgroup_date"
+                )
+
+                subgroup_notes = st.text_input(
+                    "说明",
+                    key="subgroup_notes"
+                )
+
+                if st.button("记录部分状态", key="add_subgroup_btn"):
+                    result = add_cultivation_subgroup(
+                        cultivation_record_id=record_id,
+                        status=subgroup_status.replace("部分", ""),  # Remove "部分" prefix
+                        quantity=subgroup_quantity,
+                        status_date=subgroup_date,
+                        notes=subgroup_notes
+                    )
+
+                    if result:
+                        st.success(f"部分状态记录成功！")
+                        st.rerun()
+                    else:
+                        st.error("记录部分状态失败")
+
+                # 种子收获选项（仅当植物结果时显示）
+                if record.fruiting:
+                    st.markdown("### 收获种子")
+                    seed_quantity = st.number_input("种子数量", min_value=1, key="seed_quantity")
+                    seed_storage_location = st.text_input("存储位置", key="seed_storage_location")
+                    seed_notes = st.text_area("备注", key="seed_notes")
+
+                    if st.button("记录收获种子", key="harvest_seeds_btn"):
+                        seed_batch_id = add_seed_batch_from_cultivation(
+                            cultivation_id=record_id,
+                            quantity=seed_quantity,
+                            storage_location=seed_storage_location,
+                            notes=seed_notes
+                        )
+
+                        if seed_batch_id:
+                            st.success("种子收获记录成功！")
+                            st.rerun()
+                        else:
+                            st.error("记录种子收获失败")
+
+                # 上传图片
+                st.markdown("### 上传栽培图片")
+                uploaded_file = st.file_uploader("选择图片",
+                                                 type=["jpg", "jpeg", "png"],
+                                                 key=f"cultivation_{record_id}", accept_multiple_files=True)
+                image_description = st.text_input("图片描述",
+                                                  key=f"cult_desc_{record_id}")
+
+                if uploaded_file is not None:
+                    if st.button("上传图片", key=f"upload_cult_{record_id}"):
+                        image_id = save_image(uploaded_file, "cultivation", record_id,
+                                              image_description)
+                        if image_id:
+                            st.success("图片上传成功！")
+                            st.rerun()
+                        else:
+                            st.error("图片上传失败")
+
+                # 显示图片
+                st.markdown("### 栽培图片")
+                images = get_images("cultivation", record_id)
+
+                if images:
+                    image_cols = st.columns(3)
+                    for i, image in enumerate(images):
+                        with image_cols[i % 3]:
+                            show_image(image.file_path, caption=image.description,
+                                       width=250)
+
+    elif current_tab == 2:
+        st.subheader("批量更新状态")
+
+        # 筛选条件都作为 SQL 条件传给选择器，只读取匹配的前若干条活的栽培记录
+        filters = {"status": "活"}
+        locations = get_cultivation_values("location", status="活")
+        selected_location = st.selectbox("选择栽培位置", ["全部"] + locations)
+        if selected_location != "全部":
+            filters["location"] = selected_location
+
+        # 添加按科属筛选
+        taxonomic_filter = st.radio("按分类筛选", ["不筛选", "按科筛选", "按属筛选"], horizontal=True)
+
+        if taxonomic_filter == "按科筛选":
+            families = get_cultivation_values("family", **filters)
+            if families:
+                filters["family"] = st.selectbox("选择科", families)
+            else:
+                st.info("没有科信息可供筛选")
+
+        elif taxonomic_filter == "按属筛选":
+            genera = get_cultivation_values("genus", **filters)
+            if genera:
+                filters["genus"] = st.selectbox("选择属", genera)
+            else:
+                st.info("没有属信息可供筛选")
+
+        # 创建选择框
+        st.markdown("### 选择要更新的记录")
+        empty_message = ("目前没有活的栽培记录" if selected_location == "全部"
+                         else f"在 {selected_location} 位置没有活的栽培记录")
+        selected_records = [record.id for record in record_multi_picker(
+            "栽培记录", "cultivation", key="batch_status_records",
+            format_func=lambda r: f"{r.cultivation_id} - {r.location} ({r.start_date}) - "
+                                  f"{r.species_chinese or r.species_latin or ''}",
+            empty_message=empty_message, **filters)]
+
+        if selected_records:
+            st.markdown(f"已选择 {len(selected_records)} 条记录")
+
+            st.markdown("### 设置新状态")
+            status_option = st.radio("状态类型", ["开花", "结果", "死亡"], key="batch_status_option")
+            status_date = st.date_input("状态日期", datetime.datetime.now(), key="batch_status_date")
+
+            if status_option == "死亡":
+                death_reason = st.text_input("死亡原因", key="batch_death_reason")
+            else:
+                death_reason = None
+
+            if st.button("批量更新状态", key="batch_update_btn"):
+                result = batch_update_cultivation_status(
+                    cultivation_ids=selected_records,
+                    status=status_option,
+                    date=status_date,
+                    reason=death_reason
+                )
+
+                if result:
+                    st.success(f"成功更新 {len(selected_records)} 条记录的状态！")
+                    clear_record_multi_picker("batch_status_records")
+                    st.rerun()
+                else:
+                    st.error("批量更新状态失败")
+
+    elif current_tab == 3:
+        st.subheader("栽培记录列表")
+
+        # 筛选选项
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            status_filter = st.selectbox("状态筛选", ["全部", "活", "死亡"], key="list_status_filter")
+        with col2:
+            location_filter = st.text_input("位置筛选", key="list_location_filter")
+        with col3:
+            taxonomic_filter = st.text_input("分类筛选（科/属/种名）", key="list_taxonomic_filter")
+
+        # 筛选条件在数据库中执行，每次只读取一页
+        page = paged_records(
+            "cultivation_list",
+            lambda page_size, after: get_cultivation_records_page(
+                page_size, after, status=None if status_filter == "全部" else status_filter,
+                location=location_filter or None, taxon=taxonomic_filter or None),
+            (status_filter, location_filter, taxonomic_filter)
+        )
+        filtered_records = page.items
+
+        # 创建数据表格
+        if filtered_records:
+            st.write(f"共有 {page.total} 条栽培记录")
+
+            record_data = []
+            for record in filtered_records:
+                # 获取来源信息
+                origin_info = record.origin or "未知"
+                if record.origin_details:
+                    origin_info += f" ({record.origin_details})"
+
+                # 获取分类信息
+                taxonomic_info = record.species_chinese or record.species_latin or ""
+                if record.family:
+                    taxonomic_info += f" | {record.family}"
+                if record.genus:
+                    taxonomic_info += f" | {record.genus}"
+
+                record_data.append({
+                    "栽培编号": record.cultivation_id,
+                    "开始日期": record.start_date,
+                    "来源": origin_info,
+                    "分类信息": taxonomic_info,
+                    "种子批次": record.seed_batch_code or "",
+                    "栽培位置": record.location,
+                    "栽培数量": record.quantity,
+                    "开花": "是" if record.flowering else "否",
+                    "结果": "是" if record.fruiting else "否",
+                    "状态": record.status
+                })
+
+            st.dataframe(pd.DataFrame(record_data))
+
+            # 选择查看详情
+            record_options = {
+                f"{record.cultivation_id} - {record.location} ({record.start_date})": record.id for
+                record in filtered_records}
+            selected_record = st.selectbox("选择栽培记录查看详情", list(record_options.keys()),
+                                           key="list_view_record")
+
+            if selected_record:
+                record_id = record_options[selected_record]
+
+                # 查询该记录的详细信息
+                for record in filtered_records:
+                    if record.id == record_id:
+                        st.markdown(f"### 栽培编号: {record.cultivation_id}")
+
+                        # 基本信息
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            st.write(f"开始日期: {record.start_date}")
+                            st.write(f"栽培位置: {record.location}")
+                            st.write(f"栽培数量: {record.quantity}")
+                            st.write(f"当前状态: {record.status}")
+
+                            if record.flowering:
+                                st.write(f"开花日期: {record.flowering_date}")
+                            if record.fruiting:
+                                st.write(f"结果日期: {record.fruiting_date}")
+                            if record.status == "死亡":
+                                st.write(f"死亡日期: {record.death_date}")
+                                st.write(f"死亡原因: {record.death_reason}")
+
+                        with col2:
+                            # 分类信息
+                            if record.species_chinese or record.species_latin or record.family or record.genus:
+                                st.write("**分类信息:**")
+                                if record.species_chinese:
+                                    st.write(f"中文名: {record.species_chinese}")
+                                if record.species_latin:
+                                    st.write(f"拉丁学名: {record.species_latin}")
+                                if record.family:
+                                    st.write(f"科: {record.family}")
+                                if record.genus:
+                                    st.write(f"属: {record.genus}")
+
+
+                            # 来源信息
+                            st.write("**来源信息:**")
+                            st.write(f"来源类型: {record.origin or '未知'}")
+                            if record.origin_details:
+                                st.write(f"来源详情: {record.origin_details}")
+
+                            if record.seed_batch_id:
+                                seed_batch = get_seed_batch_by_id(record.seed_batch_id)
+                                if seed_batch:
+                                    st.write(f"种子批次: {seed_batch.batch_id}")
+
+                            if record.collection_id:
+                                collection = get_collection_by_id(record.collection_id)
+                                if collection:
+                                    st.write(f"野外采集: {collection.collection_id}")
+
+                            if record.parent_cultivation_id:
+                                parent = get_cultivation_record_by_id(record.parent_cultivation_id)
+                                if parent:
+                                    st.write(f"母本栽培: {parent.cultivation_id}")
+
+                        # 备注
+                        if record.notes:
+                            st.write("**备注:**")
+                            st.write(record.notes)
+
+                        # 显示事件历史
+                        events = get_cultivation_events(record_id)
+                        if events:
+                            st.markdown("### 历史记录")
+                            event_data = []
+                            for event in events:
+                                event_data.append({
+                                    "日期": event.event_date,
+                                    "事件类型": event.event_type,
+                                    "描述": event.description or ""
+                                })
+
+                            st.table(pd.DataFrame(event_data))
+
+                        # 显示子分组记录
+                        subgroups = get_cultivation_subgroups(record_id)
+                        if subgroups:
+                            st.markdown("### 子分组记录")
+                            subgroup_data = []
+                            for subgroup in subgroups:
+                                subgroup_data.append({
+                                    "日期": subgroup.status_date,
+                                    "状态": subgroup.status,
+                                    "数量": subgroup.quantity,
+                                    "备注": subgroup.notes or ""
+                                })
+                            st.table(pd.DataFrame(subgroup_data))
+
+                        # 显示收获的种子批次
+                        harvested_seeds = get_harvested_seeds(record_id)
+                        if harvested_seeds:
+                            st.markdown("### 收获的种子批次")
+                            seed_data = []
+                            for seed in harvested_seeds:
+                                seed_data.append({
+                                    "批次编号": seed.batch_id,
+                                    "收获日期": seed.storage_date,
+                                    "数量": seed.quantity,
+                                    "存储位置": seed.storage_location
+                                })
+                            st.table(pd.DataFrame(seed_data))
+
+                        # 显示图片
+                        st.markdown("### 栽培图片")
+                        images = get_images("cultivation", record_id)
+
+                        if images:
+                            image_cols = st.columns(3)
+                            for i, image in enumerate(images):
+                                with image_cols[i % 3]:
+                                    show_image(image.file_path, caption=image.description,
+                                               width=250)
+
+                        break
+        elif status_filter != "全部" or location_filter or taxonomic_filter:
+            st.info("未找到匹配的记录")
+        else:
+            st.info("目前没有栽培记录")
+
+    elif current_tab == 4:
+        # Call the statistics function
+        show_cultivation_statistics()
+
+
+# 获取所有属和科的函数
+def get_all_families_from_collections():
+    """从采集记录中获取所有科"""
+    return get_all_families()
+
+
+def get_all_genera_from_collections():
+    """从采集记录中获取所有属"""
+    return get_all_genera()
@@ -0,0 +1,393 @@
+"""
+发芽实验管理页面
+"""
+
+import streamlit as st
+import pandas as pd
+import datetime
+from matplotlib.ticker import PercentFormatter
+from database import (
+    add_germination_record, add_germination_event, complete_germination_record, save_image,
+    get_images, get_germination_record_by_id, get_germination_events,
+    get_seed_batch_inventory, get_seed_batch_by_id, get_germination_records_page
+)
+import germination_stats
+from views.common import show_image, show_chart, paged_records, record_picker, section_tabs
+
+
+def draw_germination_curve(ax, data):
+    germination_id, points = data
+    ax.plot([date for date, _ in points], [rate for _, rate in points], 'o-', linewidth=2)
+    ax.set_xlabel('日期')
+    ax.set_ylabel('累计发芽率')
+    ax.set_title(f'发芽曲线 - {germination_id}')
+    ax.grid(True)
+
+    # 设置y轴范围
+    ax.set_ylim(0, 1.0)
+
+    # 格式化y轴为百分比
+    ax.yaxis.set_major_formatter(PercentFormatter(1.0, decimals=0))
+
+
+def draw_rate_histogram(ax, histogram):
+    bin_width = 1.0 / len(histogram)
+    ax.bar(histogram["下限"], histogram["数量"], width=bin_width, align='edge', edgecolor='black')
+    ax.set_xlabel('发芽率')
+    ax.set_ylabel('频率')
+    ax.set_title('发芽率分布直方图')
+
+    # 设置x轴范围
+    ax.set_xlim(0, 1.0)
+
+    # 格式化x轴为百分比
+    ax.xaxis.set_major_formatter(PercentFormatter(1.0, decimals=0))
+
+
+def draw_treatment_rates(ax, treatment_rates):
+    ax.bar([treatment for treatment, _ in treatment_rates], [rate for _, rate in treatment_rates])
+    ax.set_xlabel('处理方式')
+    ax.set_ylabel('平均发芽率')
+    ax.set_title('不同处理方式的平均发芽率')
+
+    # 设置y轴范围
+    ax.set_ylim(0, 1.0)
+
+    # 格式化y轴为百分比
+    ax.yaxis.set_major_formatter(PercentFormatter(1.0, decimals=0))
+
+    # 旋转x轴标签，防止重叠
+    ax.tick_params(axis='x', labelrotation=45)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment('right')
+
+
+def show_germination_curve(record, events):
+    """显示发芽实验的累计发芽率曲线"""
+    points = [(event.event_date, event.cumulative_count / record.quantity_used) for event in events]
+    show_chart(draw_germination_curve, (record.germination_id, points), figsize=(10, 5))
+
+
+# 辅助函数，显示发芽记录详情
+def show_germination_record_details(record):
+    st.subheader(f"发芽记录详情: {record.germination_id}")
+
+    # 获取种子批次信息
+    batch = get_seed_batch_by_id(record.seed_batch_id)
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.write("**基本信息**")
+        st.write(f"记录ID: {record.germination_id}")
+        st.write(f"种子批次: {batch.batch_id if batch else '未知'}")
+        st.write(f"种子名称: {getattr(batch, 'species_chinese', '未知') if batch else '未知'}")
+        st.write(f"开始日期: {record.start_date}")
+        st.write(f"种子数量: {record.quantity_used}")
+
+    with col2:
+        st.write("**发芽情况**")
+        st.write(f"状态: {record.status}")
+        st.write(f"已发芽数量: {record.germinated_count or 0}")
+        st.write(f"发芽率: {record.germination_rate * 100:.1f}%" if record.germination_rate is not None else "0.0%")
+
+    # 处理方法和备注
+    st.write("**处理方法**")
+    st.write(record.treatment or "无")
+
+    st.write("**备注**")
+    st.write(record.notes or "无")
+
+    # 获取并显示发芽事件
+    events = get_germination_events(record.id)
+
+    if events:
+        st.write("**发芽事件记录**")
+        events_data = []
+        for event in events:
+            events_data.append({
+                "日期": event.event_date,
+                "新增发芽": event.count,
+                "累计发芽": event.cumulative_count,
+                "备注": event.notes or ""
+            })
+
+        st.dataframe(events_data, hide_index=True)
+
+    # 添加新事件表单
+    if record.status == "进行中":
+        st.write("**添加发芽事件**")
+
+        with st.form("add_germination_event_form"):
+            event_date = st.date_input("日期", value=datetime.datetime.now())
+            count = st.number_input("新增发芽数量", min_value=0, max_value=record.quantity_used)
+            event_notes = st.text_area("备注")
+
+            submitted = st.form_submit_button("保存事件")
+
+            if submitted:
+                # 添加发芽事件
+                event_id = add_germination_event(
+                    germination_record_id=record.id,
+                    event_date=event_date,
+                    count=count,
+                    notes=event_notes
+                )
+
+                if event_id:
+                    st.success("发芽事件添加成功")
+                    st.rerun()
+                else:
+                    st.error("添加发芽事件失败")
+
+        # 完成发芽记录按钮
+        if st.button("完成发芽记录", key=f"complete_germination_{record.id}"):
+            complete_germination_record(record.id)
+            st.success("发芽记录已标记为完成")
+            st.rerun()
+
+
+def show_germination_management():
+    st.subheader("发芽实验管理")
+
+    current_tab = section_tabs("germination", ["新建发芽实验", "记录发芽情况", "发芽实验列表", "发芽率统计"])
+
+    if current_tab == 0:
+        st.subheader("新建发芽实验")
+
+        # 选择种子批次
+        selected_batch = record_picker(
+            "选择种子批次", "seed_batch", "new_germination_batch",
+            lambda b: f"{b.batch_id} - {b.species_chinese or '未命名'} "
+                      f"(可用: {b.available_quantity})",
+            empty_message="目前没有可用的种子批次，请先添加种子批次", available_only=True)
+        if selected_batch:
+            batch_id = selected_batch.id
+            selected_batch_obj = get_seed_batch_inventory(batch_id)
+
+            if selected_batch_obj:
+                st.write(f"可用种子数量: {selected_batch_obj.available_quantity}")
+
+                start_date = st.date_input("开始日期", datetime.datetime.now())
+                treatment = st.text_input("处理方式")
+                quantity_used = st.number_input("使用种子数量", min_value=1,
+                                                max_value=selected_batch_obj.available_quantity, step=1)
+                notes = st.text_area("备注")
+
+                if st.button("创建发芽实验"):
+                    record_id = add_germination_record(
+                        seed_batch_id=batch_id,
+                        start_date=start_date,
+                        treatment=treatment,
+                        quantity_used=quantity_used,
+                        notes=notes
+                    )
+
+                    if record_id:
+                        st.success(f"发芽实验创建成功！")
+                        st.rerun()
+                    else:
+                        st.error("创建发芽实验失败")
+
+    elif current_tab == 1:
+        st.subheader("记录发芽情况")
+
+        # 只检索状态为"进行中"的实验
+        selected_record = record_picker(
+            "选择发芽实验", "germination", "active_germination_select",
+            lambda r: f"{r.germination_id} - {r.start_date}",
+            empty_message="目前没有进行中的发芽实验，请先创建实验", status="进行中")
+        if selected_record:
+            record_id = selected_record.id
+
+            # 查询该实验的详细信息
+            record = get_germination_record_by_id(record_id)
+            if record:
+                st.markdown(f"### 实验编号: {record.germination_id}")
+                st.write(f"开始日期: {record.start_date}")
+                st.write(f"处理方式: {record.treatment}")
+                st.write(f"使用种子数量: {record.quantity_used}")
+                st.write(f"当前发芽数量: {record.germinated_count}")
+                st.write(f"当前发芽率: {record.germination_rate:.2%}")
+
+                # 显示历史记录
+                events = get_germination_events(record_id)
+                if events:
+                    st.markdown("### 历史记录")
+                    event_data = []
+                    for event in events:
+                        event_data.append({
+                            "日期": event.event_date,
+                            "新发芽数量": event.count,
+                            "累计发芽数量": event.cumulative_count,
+                            "备注": event.notes or ""
+                        })
+
+                    st.table(pd.DataFrame(event_data))
+
+                # 添加新记录
+                st.markdown("### 添加新记录")
+                event_date = st.date_input("记录日期", datetime.datetime.now())
+                new_count = st.number_input("新发芽数量", min_value=0, step=1)
+                event_notes = st.text_area("备注", key=f"event_notes_{record_id}")
+
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    if st.button("添加记录"):
+                        event_id = add_germination_event(
+                            germination_record_id=record_id,
+                            event_date=event_date,
+                            count=new_count,
+                            notes=event_notes
+                        )
+
+                        if event_id:
+                            st.success("记录添加成功！")
+                            st.rerun()
+                        else:
+                            st.error("添加记录失败")
+
+                with col2:
+                    if st.button("完成实验"):
+                        result = complete_germination_record(record_id)
+                        if result:
+                            st.success("发芽实验已标记为完成！")
+                            st.rerun()
+                        else:
+                            st.error("标记实验完成失败")
+
+                    # 上传图片
+                st.markdown("### 上传发芽图片")
+                uploaded_file = st.file_uploader("选择图片", type=["jpg", "jpeg", "png"],
+                                                 key=f"germination_{record_id}",accept_multiple_files=True)
+                image_description = st.text_input("图片描述", key=f"germ_desc_{record_id}")
+
+                if uploaded_file is not None:
+                    if st.button("上传图片", key=f"upload_germ_{record_id}"):
+                        image_id = save_image(uploaded_file, "germination", record_id, image_description)
+                        if image_id:
+                            st.success("图片上传成功！")
+                            st.rerun()
+                        else:
+                            st.error("图片上传失败")
+
+                # 显示图片
+                st.markdown("### 发芽图片")
+                images = get_images("germination", record_id)
+
+                if images:
+                    image_cols = st.columns(3)
+                    for i, image in enumerate(images):
+                        with image_cols[i % 3]:
+                            show_image(image.file_path, caption=image.description, width=250)
+
+    elif current_tab == 2:
+        st.subheader("发芽实验列表")
+
+        page = paged_records("germination_experiment_list",
+                             lambda page_size, after: get_germination_records_page(page_size, after))
+        germination_records = page.items
+        if germination_records:
+            st.write(f"共有 {page.total} 条发芽实验记录")
+
+            # 创建数据表格
+            record_data = []
+            for record in germination_records:
+                record_data.append({
+                    "实验编号": record.germination_id,
+                    "开始日期": record.start_date,
+                    "种子批次": record.seed_batch_code or "未知",
+                    "处理方式": record.treatment,
+                    "使用数量": record.quantity_used,
+                    "发芽数量": record.germinated_count,
+                    "发芽率": f"{record.germination_rate:.2%}",
+                    "状态": record.status
+                })
+
+            st.dataframe(pd.DataFrame(record_data))
+
+            # 选择查看详情
+            selected_record = record_picker(
+                "选择发芽实验查看详情", "germination", "germination_detail_select",
+                lambda r: f"{r.germination_id} - {r.start_date}")
+
+            if selected_record:
+                record_id = selected_record.id
+
+                # 查询该实验的详细信息
+                record = get_germination_record_by_id(record_id)
+                if record:
+                    st.markdown(f"### 实验编号: {record.germination_id}")
+                    st.write(f"开始日期: {record.start_date}")
+                    st.write(f"处理方式: {record.treatment}")
+                    st.write(f"使用种子数量: {record.quantity_used}")
+                    st.write(f"当前发芽数量: {record.germinated_count}")
+                    st.write(f"当前发芽率: {record.germination_rate:.2%}")
+                    st.write(f"状态: {record.status}")
+                    st.write(f"备注: {record.notes}")
+
+                    # 显示历史记录
+                    events = get_germination_events(record_id)
+                    if events:
+                        st.markdown("### 历史记录")
+                        event_data = []
+                        for event in events:
+                            event_data.append({
+                                "日期": event.event_date,
+                                "新发芽数量": event.count,
+                                "累计发芽数量": event.cumulative_count,
+                                "备注": event.notes or ""
+                            })
+
+                        st.table(pd.DataFrame(event_data))
+
+                        # 绘制发芽曲线
+                        st.markdown("### 发芽曲线")
+                        show_germination_curve(record, events)
+
+                    # 显示图片
+                    st.markdown("### 发芽图片")
+                    images = get_images("germination", record_id)
+
+                    if images:
+                        image_cols = st.columns(3)
+                        for i, image in enumerate(images):
+                            with image_cols[i % 3]:
+                                show_image(image.file_path, caption=image.description, width=250)
+        else:
+            st.info("目前没有发芽实验记录")
+
+    elif current_tab == 3:
+        st.subheader("发芽率统计")
+
+        summary = germination_stats.rate_summary()
+        if summary["total"]:
+            # 计算总体统计
+            if summary["completed"]:
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("平均发芽率", f"{summary['avg_rate']:.2%}")
+                with col2:
+                    st.metric("最高发芽率", f"{summary['max_rate']:.2%}")
+                with col3:
+                    st.metric("最低发芽率", f"{summary['min_rate']:.2%}")
+
+                # 绘制发芽率分布直方图
+                st.markdown("### 发芽率分布")
+                show_chart(draw_rate_histogram, germination_stats.rate_histogram(), figsize=(10, 5))
+
+                # 按处理方式分组的发芽率
+                st.markdown("### 不同处理方式的发芽率比较")
+
+                treatment_rates = germination_stats.treatment_rates()
+                if len(treatment_rates) > 1:
+                    # 绘制条形图
+                    show_chart(draw_treatment_rates, list(treatment_rates.itertuples(index=False, name=None)),
+                               figsize=(10, 5))
+                else:
+                    st.info("目前只有一种处理方式，无法进行比较")
+            else:
+                st.info("目前没有已完成的发芽实验")
+        else:
+            st.info("目前没有发芽实验记录")
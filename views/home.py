@@ -0,0 +1,91 @@
+"""
+首页
+"""
+
+import streamlit as st
+import numpy as np
+from dashboard_stats import get_dashboard_stats
+from views.common import show_chart
+
+
+def draw_rate_bins(ax, rate_bins):
+    bin_edges = np.linspace(0, 1, len(rate_bins) + 1)
+    ax.hist(bin_edges[:-1], bins=bin_edges, weights=rate_bins)
+    ax.set_xlabel('发芽率')
+    ax.set_ylabel('频率')
+    ax.set_title('发芽率分布')
+
+
+def draw_family_counts(ax, family_counts):
+    ax.barh([name for name, _ in family_counts], [n for _, n in family_counts])
+    ax.set_xlabel('数量')
+    ax.set_ylabel('科')
+    ax.set_title('植物科分布 (Top 10)')
+
+
+def show_home():
+    st.subheader("系统概况")
+
+    # 统计计数由触发器随写入更新，这里只读取计数表
+    stats = get_dashboard_stats()
+    counts = stats["counts"]
+
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        st.info(f"🧪 采集记录: {counts['collections']}")
+    with col2:
+        st.info(f"🌱 种子批次: {counts['seed_batches']}")
+    with col3:
+        st.info(f"🌿 发芽实验: {counts['germination_records']}")
+    with col4:
+        st.info(f"🌳 栽培记录: {counts['cultivation_records']}")
+    with col5:
+        st.warning(f"❓ 待鉴定: {counts['unidentified']}")
+
+    # 修改以下统计图表部分
+    st.markdown("---")
+
+    # 显示一些统计图表
+    st.subheader("数据统计")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        # 发芽率分布（分组计数在 SQL 中完成）
+        if counts["germination_records"]:
+            rate_bins = stats["germination_rate_bins"]
+
+            if sum(rate_bins):
+                show_chart(draw_rate_bins, rate_bins)
+            else:
+                st.write("暂无发芽率数据")
+        else:
+            st.write("暂无发芽记录")
+
+    with col2:
+        # 科属分布统计（Top 10）
+        if counts["collections"]:
+            family_counts = stats["family_counts"]
+
+            if family_counts:
+                show_chart(draw_family_counts, family_counts)
+            else:
+                st.write("暂无科属分布数据")
+        else:
+            st.write("暂无采集记录")
+
+    st.markdown("---")
+    st.subheader("系统介绍")
+    st.markdown("""
+    本系统是植物保育全流程管理系统，涵盖以下主要功能：
+
+    1. **野外采集管理**：记录野外采集的植物信息，包括采集地点、日期、采集人及植物分类信息等
+    2. **种子管理**：管理从野外采集或其他来源的种子批次
+    3. **发芽实验**：跟踪种子的发芽情况，记录发芽率
+    4. **温室栽培**：管理幼苗的栽培过程，记录开花、结果、生长状态等
+    5. **数据查询**：查询并分析各类数据
+    6. **图片管理**：管理各阶段的植物图片
+    7. **标签生成**：生成二维码或条形码标签，用于实物标记
+
+    系统支持移动端访问，方便在温室等环境中使用。
+    """)
@@ -0,0 +1,95 @@
+"""
+图片管理页面
+"""
+
+import streamlit as st
+from database import save_image, get_images, update_image_description, delete_image
+from views.common import show_image, record_picker
+
+
+def show_image_management():
+    st.subheader("图片管理")
+
+    image_type = st.selectbox("图片类型", ["采集", "种子", "发芽", "栽培"])
+
+    if image_type == "采集":
+        table_type = "collection"
+        format_record = lambda r: f"{r.collection_id} - {r.location} ({r.collection_date})"
+
+    elif image_type == "种子":
+        table_type = "seed"
+        format_record = lambda r: f"{r.batch_id} - {r.storage_location} ({r.storage_date})"
+
+    elif image_type == "发芽":
+        table_type = "germination"
+        format_record = lambda r: f"{r.germination_id} - {r.start_date}"
+
+    elif image_type == "栽培":
+        table_type = "cultivation"
+        format_record = lambda r: f"{r.cultivation_id} - {r.location} ({r.start_date})"
+
+    # 图片表中种子批次的类型为 seed，选择器中为 seed_batch
+    picker_kind = "seed_batch" if table_type == "seed" else table_type
+    selected_record = record_picker(f"选择{image_type}记录", picker_kind, f"image_{table_type}_select",
+                                    format_record, empty_message=f"目前没有{image_type}记录")
+
+    if selected_record:
+        record_id = selected_record.id
+
+        # 获取该记录的所有图片
+        images = get_images(table_type, record_id)
+
+        if images:
+            st.write(f"共有 {len(images)} 张图片")
+
+            # 显示图片
+            for i, image in enumerate(images):
+                col1, col2 = st.columns([3, 1])
+
+                with col1:
+                    show_image(image.file_path, caption=f"图片 #{i + 1}: {image.description}",
+                               width=500)
+
+                with col2:
+                    st.write(f"上传日期: {getattr(image, 'upload_date', getattr(image, 'image_date', '未知'))}")
+
+                    # 编辑描述
+                    new_description = st.text_input("图片描述", image.description or "",
+                                                    key=f"desc_{image.id}")
+
+                    if st.button("更新描述", key=f"update_{image.id}"):
+                        result = update_image_description(image.id, new_description)
+                        if result:
+                            st.success("描述更新成功！")
+                            st.rerun()
+                        else:
+                            st.error("更新描述失败")
+
+                    if st.button("删除图片", key=f"delete_{image.id}"):
+                        result = delete_image(image.id)
+                        if result:
+                            st.success("图片删除成功！")
+                            st.rerun()
+                        else:
+                            st.error("删除图片失败")
+
+                st.markdown("---")
+        else:
+            st.info(f"该{image_type}记录还没有图片")
+
+        # 上传新图片
+        st.subheader(f"上传新{image_type}图片")
+        uploaded_file = st.file_uploader("选择图片", type=["jpg", "jpeg", "png"],
+                                         key=f"new_{table_type}_{record_id}", accept_multiple_files=True)
+        image_description = st.text_input(f"图片描述",
+                                          key=f"new_desc_{table_type}_{record_id}")
+
+        if uploaded_file:
+            if st.button(f"上传图片", key=f"upload_new_{table_type}_{record_id}"):
+                image_id = save_image(uploaded_file, table_type, record_id,
+                                      image_description)
+                if image_id:
+                    st.success("图片上传成功！")
+                    st.rerun()
+                else:
+                    st.error("图片上传失败")
@@ -0,0 +1,76 @@
+"""
+标签生成页面
+"""
+
+import streamlit as st
+import os
+from database import generate_qrcode, generate_barcode
+from views.common import record_picker
+
+
+def show_label_generator():
+    """显示标签生成页面"""
+    st.subheader("标签生成")
+
+    label_type = st.selectbox(
+        "标签类型",
+        ["二维码", "条形码"]
+    )
+
+    record_type = st.selectbox(
+        "记录类型",
+        ["采集", "种子批次", "发芽实验", "栽培记录"]
+    )
+
+    # 根据选择的记录类型检索相应的记录，标签内容为记录编号
+    if record_type == "采集":
+        picker_kind, code_field = "collection", "collection_id"
+        format_record = lambda r: f"{r.collection_id} - {r.location} ({r.collection_date})"
+    elif record_type == "种子批次":
+        picker_kind, code_field = "seed_batch", "batch_id"
+        format_record = lambda r: f"{r.batch_id} - {r.storage_location} ({r.storage_date})"
+    elif record_type == "发芽实验":
+        picker_kind, code_field = "germination", "germination_id"
+        format_record = lambda r: f"{r.germination_id} - {r.start_date}"
+    elif record_type == "栽培记录":
+        picker_kind, code_field = "cultivation", "cultivation_id"
+        format_record = lambda r: f"{r.cultivation_id} - {r.location} ({r.start_date})"
+
+    selected_record = record_picker(f"选择{record_type}", picker_kind, f"label_{picker_kind}_select",
+                                    format_record, empty_message=f"目前没有{record_type}记录")
+    if selected_record:
+        record_id = getattr(selected_record, code_field)
+
+        # 额外信息
+        additional_info = st.text_input("额外信息 (可选)")
+
+        # 生成标签数据
+        data = f"{record_id}"
+        if additional_info:
+            data += f" - {additional_info}"
+
+        if st.button("生成标签"):
+            if label_type == "二维码":
+                img_path = generate_qrcode(data, record_id, record_type)
+                st.success("二维码生成成功!")
+                st.image(img_path, caption=f"{record_type} {record_id} 的二维码")
+
+                with open(img_path, "rb") as file:
+                    st.download_button(
+                        label="下载二维码",
+                        data=file,
+                        file_name=os.path.basename(img_path),
+                        mime="image/png"
+                    )
+            else:
+                img_path = generate_barcode(data, record_id, record_type)
+                st.success("条形码生成成功!")
+                st.image(img_path, caption=f"{record_type} {record_id} 的条形码")
+
+                with open(img_path, "rb") as file:
+                    st.download_button(
+                        label="下载条形码",
+                        data=file,
+                        file_name=os.path.basename(img_path),
+                        mime="image/png"
+                    )
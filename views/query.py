@@ -0,0 +1,503 @@
+"""
+数据查询页面
+"""
+
+import streamlit as st
+import pandas as pd
+import datetime
+from database import (
+    get_images, get_collection_by_id, get_germination_records_by_batch, get_germination_events,
+    get_cultivation_records_by_batch, get_cultivation_events, search_seed_batches, search_collections,
+    get_seed_batch_by_id, search_collections_by_taxonomy, search_cultivation_records
+)
+from views.common import show_image
+from views.collection import show_collection_details
+from views.germination import show_germination_curve
+
+
+def show_data_query():
+    st.subheader("数据查询")
+    query_option = st.selectbox(
+        "查询类型",
+        ["植物分类查询", "采集记录查询", "种子批次查询", "发芽实验查询", "栽培记录查询"]
+    )
+    if query_option == "植物分类查询":
+        st.subheader("植物分类查询")
+        # 筛选选项
+        col1, col2 = st.columns(2)
+        with col1:
+            family_filter = st.text_input("科（包含）")
+        with col2:
+            genus_filter = st.text_input("属（包含）")
+        # 搜索框
+        species_latin_filter = st.text_input("拉丁学名（包含）")
+        species_chinese_filter = st.text_input("中文名（包含）")
+        # 查询按钮
+        if st.button("查询"):
+            collections = search_collections_by_taxonomy(
+                family=family_filter if family_filter else None,
+                genus=genus_filter if genus_filter else None,
+                species_latin=species_latin_filter if species_latin_filter else None,
+                species_chinese=species_chinese_filter if species_chinese_filter else None
+            )
+            if collections:
+                st.write(f"共找到 {len(collections)} 条记录")
+                # 创建数据表格
+                collection_data = []
+                for collection in collections:
+                    collection_data.append({
+                        "采集编号": collection.collection_id,
+                        "采集日期": collection.collection_date,
+                        "采集地点": collection.location,
+                        "中文名": collection.species_chinese or "",
+                        "拉丁学名": collection.species_latin or "",
+                        "科": collection.family or "",
+                        "属": collection.genus or "",
+                        "鉴定状态": "已鉴定" if collection.identified else "未鉴定"
+                    })
+                st.dataframe(pd.DataFrame(collection_data))
+                # 选择查看详情
+                collection_options = {
+                    f"{collection.collection_id} - {collection.location} ({collection.collection_date})": collection.id
+                    for collection in collections}
+                selected_collection = st.selectbox("选择采集记录查看详情", list(collection_options.keys()))
+                if selected_collection:
+                    collection_id = collection_options[selected_collection]
+                    show_collection_details(collection_id)
+            else:
+                st.info("未找到匹配的记录")
+
+                # 查询该植物的详细信息
+        else:
+            st.info("未找到匹配的记录")
+
+    elif query_option == "采集记录查询":
+        st.subheader("采集记录查询")
+
+        # 筛选选项
+        col1, col2 = st.columns(2)
+
+        with col1:
+            start_date = st.date_input("开始日期",
+                                       datetime.datetime.now() - datetime.timedelta(days=365))
+        with col2:
+            end_date = st.date_input("结束日期", datetime.datetime.now())
+
+        location_filter = st.text_input("采集地点（包含）")
+        collector_filter = st.text_input("采集人（包含）")
+
+        # 查询按钮
+        if st.button("查询"):
+            collections = search_collections(
+                start_date=start_date,
+                end_date=end_date,
+                location=location_filter if location_filter else None,
+                collector=collector_filter if collector_filter else None
+            )
+
+            if collections:
+                st.write(f"共找到 {len(collections)} 条记录")
+
+                # 创建数据表格
+                collection_data = []
+                for collection in collections:
+
+                    collection_data.append({
+                        "采集编号": collection.collection_id,
+                        "采集日期": collection.collection_date,
+                        "采集地点": collection.location,
+                        "采集人": collection.collector
+                    })
+
+                st.dataframe(pd.DataFrame(collection_data))
+
+                # 选择查看详情
+                collection_options = {
+                    f"{collection.collection_id} - {collection.location} ({collection.collection_date})": collection.id
+                    for collection in collections}
+                selected_collection = st.selectbox("选择采集记录查看详情",
+                                                   list(collection_options.keys()))
+
+                if selected_collection:
+                    collection_id = collection_options[selected_collection]
+
+                    # 查询该采集记录的详细信息
+                    for collection in collections:
+                        if collection.id == collection_id:
+                            st.markdown(f"### 采集编号: {collection.collection_id}")
+                            st.write(f"采集日期: {collection.collection_date}")
+                            st.write(f"采集地点: {collection.location}")
+                            st.write(f"经纬度: {collection.latitude}, {collection.longitude}")
+                            st.write(f"海拔: {collection.altitude}米")
+                            st.write(f"采集人: {collection.collector}")
+                            st.write(f"生境描述: {collection.habitat}")
+                            st.write(f"备注: {collection.notes}")
+
+
+
+                            # 显示图片
+                            st.markdown("### 采集图片")
+                            images = get_images("collection", collection_id)
+
+                            if images:
+                                image_cols = st.columns(3)
+                                for i, image in enumerate(images):
+                                    with image_cols[i % 3]:
+                                        show_image(image.file_path, caption=image.description,
+                                                   width=250)
+
+                            break
+            else:
+                st.info("未找到匹配的记录")
+
+    elif query_option == "种子批次查询":
+        st.subheader("种子批次查询")
+
+        # 筛选选项
+        col1, col2 = st.columns(2)
+
+        with col1:
+            start_date = st.date_input("开始日期",
+                                       datetime.datetime.now() - datetime.timedelta(days=365))
+        with col2:
+            end_date = st.date_input("结束日期", datetime.datetime.now())
+
+        location_filter = st.text_input("存储位置（包含）")
+
+        # 查询按钮
+        if st.button("查询"):
+            seed_batches = search_seed_batches(
+                start_date=start_date,
+                end_date=end_date,
+                storage_location=location_filter if location_filter else None
+            )
+
+            if seed_batches:
+                st.write(f"共找到 {len(seed_batches)} 条记录")
+
+                # 创建数据表格
+                batch_data = []
+                for batch in seed_batches:
+                    # 查找关联的采集记录
+                    collection_info = "未关联"
+                    if batch.collection_id:
+                        collection = get_collection_by_id(batch.collection_id)
+                        if collection:
+                            collection_info = f"{collection.collection_id} - {collection.location}"
+                    else:
+                        collection_info = batch.source or "未记录来源"
+
+                    batch_data.append({
+                        "批次编号": batch.batch_id,
+                        "入库日期": batch.storage_date,
+                        "存储位置": batch.storage_location,
+                        "种子数量": batch.quantity,
+                        "可用数量": batch.available_quantity,
+                        "来源": collection_info
+                    })
+
+                st.dataframe(pd.DataFrame(batch_data))
+
+                # 选择查看详情
+                batch_options = {
+                    f"{batch.batch_id} - {batch.storage_location} ({batch.storage_date})": batch.id
+                    for batch in seed_batches}
+                selected_batch = st.selectbox("选择种子批次查看详情", list(batch_options.keys()))
+
+                if selected_batch:
+                    batch_id = batch_options[selected_batch]
+
+                    # 查询该种子批次的详细信息
+                    for batch in seed_batches:
+                        if batch.id == batch_id:
+                            st.markdown(f"### 批次编号: {batch.batch_id}")
+                            st.write(f"存储位置: {batch.storage_location}")
+                            st.write(f"入库日期: {batch.storage_date}")
+                            st.write(f"种子数量: {batch.quantity}")
+                            st.write(f"可用数量: {batch.available_quantity}")
+                            st.write(f"预估发芽率: {batch.viability:.2%}")
+
+                            if batch.collection_id:
+                                # 查询关联的采集记录
+                                collection = get_collection_by_id(batch.collection_id)
+                                if collection:
+                                    st.write(
+                                        f"关联采集记录: {collection.collection_id} - {collection.location} ({collection.collection_date})")
+                            else:
+                                st.write(f"种子来源: {batch.source}")
+
+                            st.write(f"备注: {batch.notes}")
+
+                            # 显示图片
+                            st.markdown("### 种子图片")
+                            images = get_images("seed", batch_id)
+
+                            if images:
+                                image_cols = st.columns(3)
+                                for i, image in enumerate(images):
+                                    with image_cols[i % 3]:
+                                        show_image(image.file_path, caption=image.description,
+                                                   width=250)
+
+                            # 显示关联的发芽实验
+                            related_records = get_germination_records_by_batch(batch_id)
+
+                            if related_records:
+                                st.markdown("### 关联的发芽实验")
+
+                                record_data = []
+                                for record in related_records:
+                                    record_data.append({
+                                        "实验编号": record.germination_id,
+                                        "开始日期": record.start_date,
+                                        "处理方式": record.treatment,
+                                        "使用数量": record.quantity_used,
+                                        "发芽数量": record.germinated_count,
+                                        "发芽率": f"{record.germination_rate:.2%}",
+                                        "状态": record.status
+                                    })
+
+                                st.table(pd.DataFrame(record_data))
+
+                            # 显示关联的栽培记录
+                            related_cultivations = get_cultivation_records_by_batch(batch_id)
+
+                            if related_cultivations:
+                                st.markdown("### 关联的栽培记录")
+
+                                cultivation_data = []
+                                for record in related_cultivations:
+                                    cultivation_data.append({
+                                        "栽培编号": record.cultivation_id,
+                                        "开始日期": record.start_date,
+                                        "栽培位置": record.location,
+                                        "栽培数量": record.quantity,
+                                        "状态": record.status
+                                    })
+
+                                st.table(pd.DataFrame(cultivation_data))
+
+                            break
+            else:
+                st.info("未找到匹配的记录")
+
+    elif query_option == "发芽实验查询":
+        st.subheader("发芽实验查询")
+
+        # 筛选选项
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            start_date = st.date_input("开始日期",
+                                       datetime.datetime.now() - datetime.timedelta(days=365))
+        with col2:
+            end_date = st.date_input("结束日期", datetime.datetime.now())
+        with col3:
+            status_filter = st.selectbox("状态", ["全部", "进行中", "已完成"])
+
+        treatment_filter = st.text_input("处理方式（包含）")
+
+        # 查询按钮
+        if st.button("查询"):
+            germination_records = search_germination_records(
+                start_date=start_date,
+                end_date=end_date,
+                status=None if status_filter == "全部" else status_filter,
+                treatment=treatment_filter if treatment_filter else None
+            )
+
+            if germination_records:
+                st.write(f"共找到 {len(germination_records)} 条记录")
+
+                # 创建数据表格
+                record_data = []
+                for record in germination_records:
+                    # 获取种子批次信息
+                    seed_batch = get_seed_batch_by_id(record.seed_batch_id) if record.seed_batch_id else None
+
+                    record_data.append({
+                        "实验编号": record.germination_id,
+                        "开始日期": record.start_date,
+                        "种子批次": seed_batch.batch_id if seed_batch else "未知",
+                        "处理方式": record.treatment,
+                        "使用数量": record.quantity_used,
+                        "发芽数量": record.germinated_count,
+                        "发芽率": f"{record.germination_rate:.2%}",
+                        "状态": record.status
+                    })
+
+                st.dataframe(pd.DataFrame(record_data))
+
+                # 选择查看详情
+                record_options = {f"{record.germination_id} - {record.start_date}": record.id for
+                                  record in germination_records}
+                selected_record = st.selectbox("选择发芽实验查看详情", list(record_options.keys()))
+
+                if selected_record:
+                    record_id = record_options[selected_record]
+
+                    # 查询该实验的详细信息
+                    for record in germination_records:
+                        if record.id == record_id:
+                            st.markdown(f"### 实验编号: {record.germination_id}")
+                            st.write(f"开始日期: {record.start_date}")
+                            st.write(f"处理方式: {record.treatment}")
+                            st.write(f"使用种子数量: {record.quantity_used}")
+                            st.write(f"当前发芽数量: {record.germinated_count}")
+                            st.write(f"当前发芽率: {record.germination_rate:.2%}")
+                            st.write(f"状态: {record.status}")
+                            st.write(f"备注: {record.notes}")
+
+                            # 关联的种子批次
+                            seed_batch = get_seed_batch_by_id(record.seed_batch_id) if record.seed_batch_id else None
+
+                            if seed_batch:
+                                st.write(
+                                    f"关联种子批次: {seed_batch.batch_id} - {seed_batch.storage_location}")
+
+                            # 显示历史记录
+                            events = get_germination_events(record_id)
+                            if events:
+                                st.markdown("### 历史记录")
+                                event_data = []
+                                for event in events:
+                                    event_data.append({
+                                        "日期": event.event_date,
+                                        "新发芽数量": event.count,
+                                        "累计发芽数量": event.cumulative_count,
+                                        "备注": event.notes or ""
+                                    })
+
+                                st.table(pd.DataFrame(event_data))
+
+                                # 绘制发芽曲线
+                                st.markdown("### 发芽曲线")
+                                show_germination_curve(record, events)
+
+                            # 显示图片
+                            st.markdown("### 发芽图片")
+                            images = get_images("germination", record_id)
+
+                            if images:
+                                image_cols = st.columns(3)
+                                for i, image in enumerate(images):
+                                    with image_cols[i % 3]:
+                                        show_image(image.file_path, caption=image.description,
+                                                   width=250)
+
+                            break
+            else:
+                st.info("未找到匹配的记录")
+
+    elif query_option == "栽培记录查询":
+        st.subheader("栽培记录查询")
+
+        # 筛选选项
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            start_date = st.date_input("开始日期",
+                                       datetime.datetime.now() - datetime.timedelta(days=365))
+        with col2:
+            end_date = st.date_input("结束日期", datetime.datetime.now())
+        with col3:
+            status_filter = st.selectbox("状态", ["全部", "活", "死亡"])
+
+        location_filter = st.text_input("栽培位置（包含）")
+
+        # 查询按钮
+        if st.button("查询"):
+            cultivation_records = search_cultivation_records(
+                start_date=start_date,
+                end_date=end_date,
+                status=None if status_filter == "全部" else status_filter,
+                location=location_filter if location_filter else None
+            )
+
+            if cultivation_records:
+                st.write(f"共找到 {len(cultivation_records)} 条记录")
+
+                # 创建数据表格
+                record_data = []
+                for record in cultivation_records:
+                    # 获取种子批次信息
+                    seed_batch = get_seed_batch_by_id(record.seed_batch_id) if record.seed_batch_id else None
+
+                    record_data.append({
+                        "栽培编号": record.cultivation_id,
+                        "开始日期": record.start_date,
+                        "种子批次": seed_batch.batch_id if seed_batch else "未知",
+                        "栽培位置": record.location,
+                        "栽培数量": record.quantity,
+                        "开花": "是" if record.flowering else "否",
+                        "结果": "是" if record.fruiting else "否",
+                        "状态": record.status
+                    })
+
+                st.dataframe(pd.DataFrame(record_data))
+
+                # 选择查看详情
+                record_options = {
+                    f"{record.cultivation_id} - {record.location} ({record.start_date})": record.id
+                    for record in cultivation_records}
+                selected_record = st.selectbox("选择栽培记录查看详情", list(record_options.keys()))
+
+                if selected_record:
+                    record_id = record_options[selected_record]
+
+                    # 查询该记录的详细信息
+                    for record in cultivation_records:
+                        if record.id == record_id:
+                            st.markdown(f"### 栽培编号: {record.cultivation_id}")
+                            st.write(f"开始日期: {record.start_date}")
+                            st.write(f"栽培位置: {record.location}")
+                            st.write(f"栽培数量: {record.quantity}")
+                            st.write(f"当前状态: {record.status}")
+
+                            if record.flowering:
+                                st.write(f"开花日期: {record.flowering_date}")
+
+                            if record.fruiting:
+                                st.write(f"结果日期: {record.fruiting_date}")
+
+                            if record.status == "死亡":
+                                st.write(f"死亡日期: {record.death_date}")
+                                st.write(f"死亡原因: {record.death_reason}")
+
+                            st.write(f"备注: {record.notes}")
+
+                            # 关联的种子批次
+                            seed_batch = get_seed_batch_by_id(record.seed_batch_id) if record.seed_batch_id else None
+
+                            if seed_batch:
+                                st.write(
+                                    f"关联种子批次: {seed_batch.batch_id} - {seed_batch.storage_location}")
+
+                            # 显示事件历史
+                            events = get_cultivation_events(record_id)
+                            if events:
+                                st.markdown("### 历史记录")
+                                event_data = []
+                                for event in events:
+                                    event_data.append({
+                                        "日期": event.event_date,
+                                        "事件类型": event.event_type,
+                                        "描述": event.description or ""
+                                    })
+
+                                st.table(pd.DataFrame(event_data))
+
+                            # 显示图片
+                            st.markdown("### 栽培图片")
+                            images = get_images("cultivation", record_id)
+
+                            if images:
+                                image_cols = st.columns(3)
+                                for i, image in enumerate(images):
+                                    with image_cols[i % 3]:
+                                        show_image(image.file_path, caption=image.description,
+                                                   width=250)
+
+                            break
+            else:
+                st.info("未找到匹配的记录")
@@ -0,0 +1,69 @@
+"""
+扫码查询页面
+"""
+
+import streamlit as st
+import pandas as pd
+from database import get_cultivation_events, get_seed_batch_inventory, resolve_identifier
+from views.collection import show_collection_details
+from views.germination import show_germination_record_details
+
+
+def show_scan_lookup():
+    """扫码查询：根据标签上的编号显示对应的记录"""
+    st.title("扫码查询")
+
+    code = st.session_state.get("scan_code")
+    if not code:
+        st.info("在左侧“扫码查询”框中扫描标签或输入编号")
+        return
+
+    result = resolve_identifier(code)
+    if result is None:
+        st.error(f"未找到编号 {code} 对应的记录")
+        return
+
+    entity_type, record = result
+    if entity_type == "collection":
+        show_collection_details(record.id)
+    elif entity_type == "seed_batch":
+        st.subheader(f"种子批次: {record.batch_id}")
+        inventory = get_seed_batch_inventory(record.id)
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write(f"**种子名称:** {record.species_chinese or '未记录'}")
+            st.write(f"**拉丁学名:** {record.species_latin or '未记录'}")
+            st.write(f"**存储日期:** {record.storage_date}")
+            st.write(f"**存储位置:** {record.storage_location or '未记录'}")
+        with col2:
+            st.write(f"**种子数量:** {record.quantity}")
+            st.write(f"**可用数量:** {inventory.available_quantity if inventory else '未知'}")
+            st.write(f"**活力:** {record.viability or '未记录'}")
+        if record.notes:
+            st.write("**备注:**")
+            st.write(record.notes)
+    elif entity_type == "germination":
+        show_germination_record_details(record)
+    elif entity_type == "cultivation":
+        st.subheader(f"栽培记录: {record.cultivation_id}")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write(f"**物种名称:** {record.species_chinese or '未记录'}")
+            st.write(f"**拉丁学名:** {record.species_latin or '未记录'}")
+            st.write(f"**开始日期:** {record.start_date}")
+        with col2:
+            st.write(f"**栽培地点:** {record.location or '未记录'}")
+            st.write(f"**数量:** {record.quantity}")
+            st.write(f"**状态:** {record.status}")
+        if record.notes:
+            st.write("**备注:**")
+            st.write(record.notes)
+
+        events = get_cultivation_events(record.id)
+        if events:
+            st.markdown("### 栽培事件")
+            st.dataframe(pd.DataFrame([{
+                "日期": event.event_date,
+                "事件类型": event.event_type,
+                "描述": event.description
+            } for event in events]))
@@ -0,0 +1,535 @@
+"""
+种子批次管理页面
+"""
+
+import streamlit as st
+import datetime
+from database import (
+    add_seed_batch, add_germination_record, get_collection_by_id,
+    get_seed_batch_inventory, update_seed_batch, get_germination_records_by_batch,
+    get_seed_batch_by_id, get_seed_batches_page,
+    get_germination_records_page
+)
+from views.common import (
+    paged_records, record_picker, record_multi_picker, clear_record_multi_picker, section_tabs
+)
+from views.germination import show_germination_record_details
+
+
+def show_seed_management():
+    st.header("种子批次管理")
+    current_tab = section_tabs("seed", ["添加种子批次", "查看种子批次", "编辑种子批次", "种子发芽记录", "批量发芽实验"])
+
+    if current_tab == 0:
+        st.subheader("添加种子批次")
+
+        # 基本信息布局优化 - 使用三列布局
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            # 批次编号在保存时按存储日期自动生成（SEED-日期-随机码）
+            st.markdown("### 批次编号: 保存时自动生成")
+
+            seed_id = st.text_input("种子编号", key="add_seed_id", help="请输入您的种子编号")
+        with col2:
+            storage_date = st.date_input("存储日期", value=datetime.datetime.now(), key="add_seed_storage_date")
+            weight = st.number_input("重量 (g)", min_value=0.0, format="%.2f", key="add_seed_weight")
+        with col3:
+            storage_location = st.text_input("存储位置", key="add_seed_storage_location")
+            estimated_count = st.number_input("估计数量", min_value=0, key="add_seed_estimated_count")
+
+        # 质量检测结果单独放置
+        testing_quality = st.number_input("质量检测结果 (%)", min_value=0.0, max_value=100.0, format="%.1f",
+                                          key="add_seed_testing_quality")
+
+        # 种子来源选项
+        source_option = st.radio("种子来源", ["野外采集", "其他来源"], key="add_seed_source_radio", horizontal=True)
+        collection_id = None
+
+        if source_option == "野外采集":
+            selected_collection = record_picker(
+                "选择采集记录", "collection", "add_seed_collection_select",
+                lambda c: f"{c.collection_id} - {c.location} ({c.collection_date}) - {c.species_chinese or c.species_latin or '未命名'}",
+                empty_message="目前没有采集记录，请先添加采集记录或选择其他来源")
+            if selected_collection:
+                collection_id = selected_collection.id
+
+                # 获取选中的采集记录，显示其植物信息
+                selected_collection_obj = get_collection_by_id(collection_id)
+                if selected_collection_obj and (
+                        selected_collection_obj.species_chinese or selected_collection_obj.species_latin):
+                    st.info(
+                        f"植物信息: {selected_collection_obj.species_chinese or ''} {selected_collection_obj.species_latin or ''} "
+                        f"{selected_collection_obj.family or ''} {selected_collection_obj.genus or ''}")
+
+        # 如果是其他来源，需要手动输入种子名称 - 使用两列布局
+        species_chinese = ""
+        species_latin = ""
+        if source_option == "其他来源":
+            col1, col2 = st.columns(2)
+            with col1:
+                species_chinese = st.text_input("种子名称", key="add_seed_species_chinese")
+            with col2:
+                species_latin = st.text_input("拉丁学名", key="add_seed_species_latin")
+
+        # 描述单独放置
+        description = st.text_area("描述", key="add_seed_description")
+
+        if st.button("保存种子批次", key="save_seed_batch_btn"):
+            if source_option == "野外采集" and not collection_id:
+                st.error("请选择采集记录")
+            else:
+                # 使用add_seed_batch函数添加种子批次
+                viability = testing_quality / 100 if testing_quality else None
+                # 将额外信息添加到notes中
+                notes_text = f"重量(g): {weight}\n{description}"
+                seed_batch_id = add_seed_batch(
+                    collection_id=collection_id,
+                    quantity=estimated_count,
+                    storage_location=storage_location,
+                    storage_date=storage_date,
+                    viability=viability,
+                    notes=notes_text,
+                    source="野外采集" if collection_id else "其他来源",
+                    seed_id=seed_id  # 添加种子编号
+                )
+                if seed_batch_id:
+                    # 尝试更新种子批次的额外信息
+                    if seed_batch_id and collection_id:
+                        collection = get_collection_by_id(collection_id)
+                        if collection:
+                            update_seed_batch(
+                                batch_id=seed_batch_id,
+                                species_chinese=collection.species_chinese,
+                                species_latin=collection.species_latin
+                            )
+                    try:
+                        # 如果是野外采集，从采集记录获取植物信息
+                        if source_option == "野外采集" and selected_collection_obj:
+                            species_chinese = selected_collection_obj.species_chinese or ""
+                            species_latin = selected_collection_obj.species_latin or ""
+
+                        update_seed_batch(
+                            batch_id=seed_batch_id,
+                            species_chinese=species_chinese,
+                            species_latin=species_latin,
+                            weight=weight
+                        )
+                    except Exception as e:
+                        st.warning(f"添加额外信息失败，但基本信息已保存：{e}")
+                    st.success("种子批次已成功添加")
+                    # 清空表单
+                    st.rerun()
+                else:
+                    st.error("添加种子批次失败")
+
+    elif current_tab == 1:
+        st.subheader("查看种子批次")
+
+        # 搜索框
+        filter_species = st.text_input("按种子名称搜索", key="search_seed_species")
+
+        # 分页获取种子批次
+        page = paged_records(
+            "seed_batch_list",
+            lambda page_size, after: get_seed_batches_page(page_size, after, filter_species or None,
+                                                           with_usage=True),
+            (filter_species,)
+        )
+        seed_batches = page.items
+
+        if not seed_batches:
+            st.info("没有找到种子批次记录")
+        else:
+            # 显示批次总数
+            st.write(f"共找到 {page.total} 个种子批次")
+
+            # 创建一个展开栏来显示每个批次的详细信息
+            for batch in seed_batches:
+                with st.expander(f"批次 {batch.batch_id} - {getattr(batch, 'species_chinese', '未命名')}"):
+                    # 使用三列布局显示批次信息
+                    col1, col2, col3 = st.columns(3)
+
+                    with col1:
+                        st.write("**基本信息**")
+                        st.write(f"批次ID: {batch.batch_id}")
+                        if hasattr(batch, 'seed_id') and batch.seed_id:
+                            st.write(f"种子编号: {batch.seed_id}")
+                        st.write(f"种子名称: {getattr(batch, 'species_chinese', '未记录')}")
+                        st.write(f"拉丁名: {getattr(batch, 'species_latin', '未记录')}")
+                        st.write(f"来源: {batch.source or '未记录'}")
+
+                        if batch.collection_id:
+                            collection = get_collection_by_id(batch.collection_id)
+                            if collection:
+                                st.write(f"采集地点: {collection.location}")
+                                st.write(f"采集日期: {collection.collection_date}")
+
+                    with col2:
+                        st.write("**存储信息**")
+                        st.write(f"存储位置: {batch.storage_location or '未记录'}")
+                        st.write(f"存储日期: {batch.storage_date}")
+                        st.write(f"数量: {batch.quantity or '未记录'}")
+                        st.write(f"重量: {getattr(batch, 'weight', '未记录')} g")
+                        st.write(
+                            f"活力: {f'{batch.viability * 100:.1f}%' if batch.viability is not None else '未记录'}")
+
+                    with col3:
+                        st.write("**使用情况**")
+                        # 已用数量和剩余数量由库存查询一次性算出
+                        remaining = batch.available_quantity if batch.quantity else "未知"
+
+                        st.write(f"发芽实验使用: {batch.used_for_germination}")
+                        st.write(f"栽培使用: {batch.used_for_cultivation}")
+                        st.write(f"剩余数量: {remaining}")
+
+                    # 显示备注
+                    if batch.notes:
+                        st.write("**备注**")
+                        st.write(batch.notes)
+
+                    # 显示发芽记录
+                    germination_records = get_germination_records_by_batch(batch.id) if batch.used_for_germination else []
+                    if germination_records:
+                        st.write("**发芽记录**")
+                        for record in germination_records:
+                            st.write(f"{record.start_date} - 使用{record.quantity_used}粒 - " +
+                                     f"发芽率: {record.germination_rate * 100:.1f}% ({record.germinated_count}/{record.quantity_used})")
+
+                    # 操作按钮 - 使用两列布局
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        if st.button(f"编辑", key=f"edit_batch_{batch.id}"):
+                            st.session_state['edit_seed_batch_id'] = batch.id
+                            st.session_state['active_tab'] = 2  # 切换到编辑标签页
+                            st.rerun()
+
+                    with col2:
+                        if st.button(f"添加发芽记录", key=f"add_germination_{batch.id}"):
+                            st.session_state['new_germination_batch_id'] = batch.id
+                            st.session_state['active_tab'] = 3  # 切换到发芽记录标签页
+                            st.rerun()
+
+    elif current_tab == 2:
+        st.subheader("编辑种子批次")
+
+        # 检查是否有选定的种子批次ID
+        edit_seed_batch_id = st.session_state.get('edit_seed_batch_id', None)
+
+        if edit_seed_batch_id:
+            # 获取要编辑的种子批次
+            batch = get_seed_batch_by_id(edit_seed_batch_id)
+
+            if batch:
+                st.write(f"正在编辑批次 {batch.batch_id}")
+
+                # 提取当前值，如果属性不存在则使用默认值
+                current_seed_id = getattr(batch, 'seed_id', '')
+                current_species_chinese = getattr(batch, 'species_chinese', '')
+                current_species_latin = getattr(batch, 'species_latin', '')
+                current_storage_location = batch.storage_location or ''
+                current_quantity = batch.quantity or 0
+                current_viability = batch.viability * 100 if batch.viability is not None else 0
+                current_weight = getattr(batch, 'weight', 0.0)
+                current_notes = batch.notes or ''
+
+                # 编辑表单 - 使用三列布局
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    seed_id = st.text_input("种子编号", value=current_seed_id, key="edit_seed_id")
+                    storage_location = st.text_input("存储位置", value=current_storage_location,
+                                                     key="edit_seed_storage_location")
+                with col2:
+                    species_chinese = st.text_input("种子名称", value=current_species_chinese, key="edit_seed_species_chinese")
+                    quantity = st.number_input("数量", value=current_quantity, min_value=0, key="edit_seed_quantity")
+                with col3:
+                    species_latin = st.text_input("拉丁学名", value=current_species_latin,
+                                                  key="edit_seed_species_latin")
+                    viability = st.number_input("活力 (%)", value=float(current_viability), min_value=0.0, max_value=100.0,
+                                                format="%.1f", key="edit_seed_viability")
+
+                # 重量单独放置
+                weight = st.number_input("重量 (g)", value=current_weight, min_value=0.0, format="%.2f",
+                                         key="edit_seed_weight")
+
+                # 备注单独放置
+                notes = st.text_area("备注", value=current_notes, key="edit_seed_notes")
+
+                # 使用两列布局放置按钮
+                col1, col2 = st.columns(2)
+                with col1:
+                    if st.button("保存更改", key="save_seed_edit"):
+                        try:
+                            # 更新数据
+                            update_data = {
+                                'seed_id': seed_id,
+                                'storage_location': storage_location,
+                                'quantity': quantity,
+                                'viability': viability / 100,
+                                'notes': notes
+                            }
+
+                            # 尝试更新额外字段
+                            try:
+                                update_data['species_chinese'] = species_chinese
+                                update_data['species_latin'] = species_latin
+                                update_data['weight'] = weight
+                            except Exception:
+                                # 如果额外字段更新失败，将它们添加到notes中
+                                if species_chinese != current_species_chinese or species_latin != current_species_latin or weight != current_weight:
+                                    update_data[
+                                        'notes'] = f"种子名称: {species_chinese}\n拉丁学名: {species_latin}\n重量(g): {weight}\n{notes}"
+
+                            # 更新种子批次；数量少于已预留和已消耗的种子时不修改
+                            if update_seed_batch(edit_seed_batch_id, **update_data):
+                                st.success("种子批次更新成功")
+                                # 清除编辑状态
+                                st.session_state.pop('edit_seed_batch_id', None)
+                                st.rerun()
+                            else:
+                                st.error("更新失败：数量不能少于已消耗与已预留的种子数之和")
+                        except Exception as e:
+                            st.error(f"更新失败: {e}")
+
+                with col2:
+                    if st.button("取消", key="cancel_seed_edit"):
+                        st.session_state.pop('edit_seed_batch_id', None)
+                        st.rerun()
+
+                if st.button("从采集记录更新物种信息"):
+                    if batch.collection_id:
+                        collection = get_collection_by_id(batch.collection_id)
+                        if collection:
+                            # 直接更新数据库
+                            update_data = {
+                                'species_chinese': collection.species_chinese,
+                                'species_latin': collection.species_latin
+                            }
+                            update_seed_batch(edit_seed_batch_id, **update_data)
+                            st.success("已从采集记录更新物种信息")
+                            st.rerun()
+            else:
+                st.error("未找到指定的种子批次")
+        else:
+            st.info("请在查看种子批次页面选择一个批次进行编辑")
+
+    elif current_tab == 3:
+        st.subheader("种子发芽记录")
+
+        # 检查是否有选定的种子批次来添加发芽记录
+        new_germination_batch_id = st.session_state.get('new_germination_batch_id', None)
+
+        # 添加新发芽记录表单
+        with st.expander("添加新发芽记录", expanded=new_germination_batch_id is not None):
+            # 如果已经选择了批次，直接使用它；否则显示下拉选择框
+            if new_germination_batch_id:
+                selected_batch = get_seed_batch_by_id(new_germination_batch_id)
+                if selected_batch:
+                    st.write(
+                        f"为批次 {selected_batch.batch_id} - {getattr(selected_batch, 'species_chinese', '未命名')} 添加发芽记录")
+                    seed_batch_id = selected_batch.id
+                else:
+                    st.error("未找到指定的种子批次")
+                    seed_batch_id = None
+            else:
+                # 检索可用于发芽的种子批次
+                selected_batch = record_picker(
+                    "选择种子批次", "seed_batch", "select_germination_batch",
+                    lambda b: f"{b.batch_id} - {b.species_chinese or '未命名'} "
+                              f"(可用: {b.available_quantity})",
+                    empty_message="没有可用的种子批次，请先添加种子批次", available_only=True)
+                seed_batch_id = selected_batch.id if selected_batch else None
+
+            if seed_batch_id:
+                # 发芽记录表单 - 使用三列布局
+                col1, col2 = st.columns(2)
+                with col1:
+                    start_date = st.date_input("开始日期", value=datetime.datetime.now(), key="germination_start_date")
+
+                with col2:
+                    # 获取选定批次的可用种子数量并确保是整数
+                    selected_batch = get_seed_batch_inventory(seed_batch_id)
+                    max_seeds = getattr(selected_batch, 'available_quantity', None)
+
+                    # 确保max_seeds是有效的整数
+                    if max_seeds is None or not isinstance(max_seeds, int) or max_seeds <= 0:
+                        max_seeds = 1000  # 默认值
+
+                    # 计算默认值，确保不会超过最大值
+                    default_quantity = min(50, max_seeds)
+
+                    quantity_used = st.number_input("使用种子数量", min_value=1, max_value=max_seeds,
+                                                    value=default_quantity, key="germination_quantity")
+
+                # 处理方法和备注单独放置
+                treatment = st.text_area("处理方法", key="germination_treatment")
+                notes = st.text_area("备注", key="germination_notes")
+
+                if st.button("保存发芽记录", key="save_germination_record"):
+                    # 添加发芽记录
+                    record_id = add_germination_record(
+                        seed_batch_id=seed_batch_id,
+                        start_date=start_date,
+                        treatment=treatment,
+                        quantity_used=quantity_used,
+                        notes=notes
+                    )
+
+                    if record_id:
+                        st.success("发芽记录添加成功")
+                        # 清除选定的批次ID
+                        st.session_state.pop('new_germination_batch_id', None)
+                        st.rerun()
+                    else:
+                        st.error("添加发芽记录失败")
+
+        # 显示现有发芽记录
+        filter_germination_species = st.text_input("按种子名称搜索发芽记录", key="search_germination_species")
+
+        page = paged_records(
+            "germination_list",
+            lambda page_size, after: get_germination_records_page(page_size, after,
+                                                                   filter_germination_species or None),
+            (filter_germination_species,)
+        )
+        germination_records = page.items
+
+        if not germination_records:
+            st.info("没有找到发芽记录")
+        else:
+            st.write(f"共找到 {page.total} 条发芽记录")
+
+            # 创建表格显示发芽记录
+            records_data = []
+            for record in germination_records:
+                species_chinese = record.seed_species_chinese or '未知'
+
+                # 格式化状态和发芽率
+                status = record.status
+                germination_rate = f"{record.germination_rate * 100:.1f}%" if record.germination_rate is not None else "0.0%"
+                germinated_count = record.germinated_count or 0
+
+                records_data.append({
+                    "ID": record.germination_id,
+                    "种子名称": species_chinese,
+                    "开始日期": record.start_date,
+                    "种子数量": record.quantity_used,
+                    "已发芽": germinated_count,
+                    "发芽率": germination_rate,
+                    "状态": status,
+                    "处理方法": record.treatment if len(record.treatment or '') < 30 else record.treatment[:30] + "...",
+                    "详情": "查看"
+                })
+
+            # 创建DataEditor或DataFrame进行显示
+            if hasattr(st, 'data_editor'):
+                # Streamlit 1.16.0+
+                st.data_editor(
+                    records_data,
+                    hide_index=True,
+                    key="germination_records_table"
+                )
+
+                # 添加选择和查看详情按钮
+                selected_idx = st.selectbox(
+                    "选择记录查看详情",
+                    range(len(records_data)),
+                    format_func=lambda i: f"{records_data[i]['ID']} - {records_data[i]['种子名称']}"
+                )
+
+                if st.button("查看详情", key="view_details_button"):
+                    selected_id = records_data[selected_idx]["ID"]
+                    for record in germination_records:
+                        if record.germination_id == selected_id:
+                            show_germination_record_details(record)
+                            break
+            else:
+                # 旧版Streamlit，使用DataFrame
+                st.dataframe(records_data)
+
+                # 选择记录查看详情
+                record_options = {
+                    f"{record.germination_id} - {record.seed_species_chinese or '未知'}": record.id
+                    for record in germination_records
+                }
+                selected_record = st.selectbox("选择记录查看详情", list(record_options.keys()),
+                                               key="select_germination_record")
+                if selected_record:
+                    record_id = record_options[selected_record]
+                    record = next((r for r in germination_records if r.id == record_id), None)
+                    if record:
+                        show_germination_record_details(record)
+
+    elif current_tab == 4:
+        st.subheader("批量发芽实验")
+        st.write("选择多个种子批次进行统一的发芽实验")
+
+        # 检索选择种子批次：每次只列出匹配的前若干个有可用种子的批次
+        st.write("### 选择种子批次")
+        selected_batches = record_multi_picker(
+            "种子批次", "seed_batch", key="batch_germination_batches",
+            format_func=lambda b: f"{b.batch_id} - {b.species_chinese or '未命名'} (可用: {b.available_quantity})",
+            empty_message="目前没有可用的种子批次", available_only=True)
+
+        if selected_batches:
+            st.write(f"已选择 {len(selected_batches)} 个种子批次")
+
+            # 批量发芽实验参数 - 使用两列布局
+            st.markdown("### 发芽实验参数")
+            col1, col2 = st.columns(2)
+            with col1:
+                start_date = st.date_input("开始日期", datetime.datetime.now(), key="batch_germination_start_date")
+            with col2:
+                treatment = st.text_input("处理方法", key="batch_germination_treatment")
+
+            # 为每个选中的批次设置用量 - 使用列布局
+            st.markdown("### 设置各批次用量")
+            batch_quantities = {}
+
+            # 每行2个批次设置
+            selected_count = len(selected_batches)
+            batches_per_setting_row = 2
+            setting_rows = (selected_count + batches_per_setting_row - 1) // batches_per_setting_row
+
+            for setting_row in range(setting_rows):
+                setting_cols = st.columns(batches_per_setting_row)
+                for setting_col_idx in range(batches_per_setting_row):
+                    batch_idx = setting_row * batches_per_setting_row + setting_col_idx
+                    if batch_idx < selected_count:
+                        batch = selected_batches[batch_idx]
+                        with setting_cols[setting_col_idx]:
+                            max_seeds = batch.available_quantity
+                            display_name = f"{batch.batch_id} - {batch.species_chinese or '未命名'}"
+                            quantity = st.number_input(
+                                f"{display_name} 用量",
+                                min_value=1,
+                                max_value=max_seeds,
+                                value=min(50, max_seeds),
+                                key=f"batch_quantity_{batch.id}"
+                            )
+                            batch_quantities[batch.id] = quantity
+
+            # 备注单独放置
+            notes = st.text_area("备注", key="batch_germination_notes")
+
+            if st.button("创建批量发芽实验", key="create_batch_germination"):
+                success_count = 0
+                for batch in selected_batches:
+                    try:
+                        germination_id = add_germination_record(
+                            seed_batch_id=batch.id,
+                            start_date=start_date,
+                            treatment=treatment,
+                            quantity_used=batch_quantities[batch.id],
+                            notes=notes
+                        )
+                        if germination_id:
+                            success_count += 1
+                    except Exception as e:
+                        st.error(f"批次 {batch.batch_id} 创建发芽实验失败: {e}")
+
+                if success_count > 0:
+                    st.success(f"成功创建 {success_count} 个发芽实验记录")
+                    clear_record_multi_picker("batch_germination_batches")
+                    st.rerun()
+                else:
+                    st.error("批量创建发芽实验失败")
@@ -0,0 +1,78 @@
+"""
+系统设置页面
+"""
+
+import streamlit as st
+import pandas as pd
+import os
+from bootstrap import bootstrap, get_settings, save_settings
+import views
+
+
+def show_settings():
+    st.subheader("系统设置")
+
+    settings = get_settings()
+
+    # 应用基本设置
+    st.markdown("### 基本设置")
+    organization_name = st.text_input("组织名称", settings.get("organization_name",
+                                                               "植物资源库"))
+
+    # 图片存储设置
+    st.markdown("### 图片存储设置")
+    image_storage_path = st.text_input("图片存储路径",
+                                       settings.get("image_storage_path",
+                                                    "./images"))
+
+    # 系统配置
+    st.markdown("### 系统配置")
+    auto_backup = st.checkbox("启用自动备份", settings.get("auto_backup", True))
+
+    backup_interval_days = st.number_input(
+        "自动备份间隔（天）",
+        min_value=1,
+        max_value=30,
+        value=settings.get("backup_interval_days", 7)
+    )
+
+    max_backups = st.number_input(
+        "保留备份数量",
+        min_value=1,
+        max_value=30,
+        value=settings.get("max_backups", 10)
+    )
+
+    # 保存设置
+    if st.button("保存设置"):
+        new_settings = {
+            "organization_name": organization_name,
+            "image_storage_path": image_storage_path,
+            "auto_backup": auto_backup,
+            "backup_interval_days": backup_interval_days,
+            "max_backups": max_backups
+        }
+
+        result = save_settings(new_settings)
+        if result:
+            st.success("设置保存成功！")
+            # 检查图片存储路径是否改变，如果改变则尝试创建新目录
+            if image_storage_path != settings.get("image_storage_path"):
+                try:
+                    os.makedirs(image_storage_path, exist_ok=True)
+                    st.info(f"已创建新的图片存储目录: {image_storage_path}")
+                except Exception as e:
+                    st.warning(f"无法创建图片存储目录: {str(e)}")
+        else:
+            st.error("设置保存失败")
+
+    # 进程启动时各初始化步骤的耗时
+    with st.expander("启动耗时"):
+        timings = bootstrap()
+        st.dataframe(pd.DataFrame([{"步骤": name, "耗时 (ms)": round(seconds * 1000, 1)}
+                                   for name, seconds in timings]), hide_index=True)
+        st.caption(f"合计 {sum(seconds for _, seconds in timings) * 1000:.0f} ms，每个进程只执行一次")
+
+        # 模块首次导入耗时：app 为启动时导入的核心模块，其余为第一次打开页面时导入的页面模块
+        st.dataframe(pd.DataFrame([{"模块": name, "导入耗时 (ms)": round(seconds * 1000, 1)}
+                                   for name, seconds in views.import_times.items()]), hide_index=True)